@@ -0,0 +1,185 @@
+import argparse
+import logging
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from ..storage import get_storage_backend
+from ..utils.change_events import publish_change
+
+WINDOWS = (3, 5)
+
+
+def new_trend_state(defense_team_id: int, position: str) -> Dict[str, Any]:
+    return {
+        'defense_team_id': defense_team_id,
+        'position': position,
+        'last_week': None,
+        'games': 0,
+        'season_points': 0.0,
+        'sum_3': 0.0,
+        'sum_5': 0.0,
+        # most recent game first, at most max(WINDOWS) entries
+        'recent_points': [],
+    }
+
+
+def add_game(state: Dict[str, Any], week: int, points: float) -> None:
+    """Advance one defense/position state by a game: O(1) regardless of how far into the season."""
+    recent = state['recent_points']
+    for window in WINDOWS:
+        dropped = recent[window - 1] if len(recent) >= window else 0.0
+        state[f'sum_{window}'] = round(state[f'sum_{window}'] + points - dropped, 2)
+
+    state['recent_points'] = [points] + recent[:max(WINDOWS) - 1]
+    state['season_points'] = round(state['season_points'] + points, 2)
+    state['games'] += 1
+    state['last_week'] = week
+
+
+def season_standings(states: Iterable[Dict[str, Any]]) -> Dict[Tuple[int, str], Tuple[int, float]]:
+    """
+    Season-to-date rank and z-score of every defense within its position.
+
+    Rank 1 allows the fewest fantasy points per game; ties share a rank.
+    """
+    by_position: Dict[str, List[Dict[str, Any]]] = {}
+    for state in states:
+        if state['games']:
+            by_position.setdefault(state['position'], []).append(state)
+
+    standings = {}
+    for position, position_states in by_position.items():
+        averages = {state['defense_team_id']: state['season_points'] / state['games'] for state in position_states}
+        mean = sum(averages.values()) / len(averages)
+        std = math.sqrt(sum((avg - mean) ** 2 for avg in averages.values()) / len(averages))
+
+        ordered = sorted(averages.values())
+        for defense_team_id, avg in averages.items():
+            rank = ordered.index(avg) + 1
+            z_score = (avg - mean) / std if std else 0.0
+            standings[(defense_team_id, position)] = (rank, round(z_score, 3))
+    return standings
+
+
+class DefenseTrends:
+    """
+    Rolling fantasy-points-allowed metrics per defense and skill position.
+
+    Each (defense, position, season) keeps a small state row with running
+    window sums and the last few game totals, so ingesting a week only
+    touches the defenses that played in it. Ranks and z-scores are then
+    recomputed across the ~32 season states for each position. Results go
+    to stats.def_vs_pos_trends, one row per defense, position and week.
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage or get_storage_backend()
+        self.logger = logging.getLogger(__name__)
+
+
+    def update_weeks(self, conn, season_year: int, weeks: Iterable[int]) -> Set[int]:
+        """Apply a season's newly ingested weeks and return the defense team ids whose trends changed."""
+        weeks = sorted(set(weeks))
+        if not weeks:
+            return set()
+        states = self.storage.get_defense_trend_state(conn, season_year)
+
+        # Windows can only move forward; re-ingested weeks replay the season once, from the earliest
+        last_week = max((state['last_week'] for state in states.values()), default=None)
+        if last_week is not None and weeks[0] <= last_week:
+            self.logger.info(f"Week {weeks[0]} is not after last trended week {last_week}, rebuilding season {season_year} from it")
+            return self.rebuild_season(conn, season_year, from_week=weeks[0], through_week=max(weeks[-1], last_week))
+
+        changed = set()
+        for week in weeks:
+            changed |= self.apply_week(conn, season_year, week, states)
+        return changed
+
+
+    def rebuild_season(self, conn, season_year: int, from_week: Optional[int] = None, through_week: Optional[int] = None) -> Set[int]:
+        """
+        Recompute a season's trends, or only its weeks from from_week on.
+
+        Weeks before from_week are left in place, and their stored game
+        totals seed the window states the later weeks start from.
+        """
+        previous = self.storage.get_season_defense_trends(conn, season_year)
+        states = {}
+        for row in sorted(previous, key=lambda row: row['dvp_week_number']):
+            if from_week is not None and row['dvp_week_number'] < from_week:
+                key = (row['dvp_defense_team_id'], row['dvp_position'])
+                state = states.setdefault(key, new_trend_state(*key))
+                add_game(state, row['dvp_week_number'], float(row['dvp_fantasy_points']))
+
+        self.storage.delete_defense_trends(conn, season_year, from_week)
+        if states:
+            self.storage.save_defense_trend_state(conn, season_year, list(states.values()))
+
+        changed = {row['dvp_defense_team_id'] for row in previous if row['dvp_week_number'] >= (from_week or 0)}
+        weeks = sorted({game['week'] for game in self.storage.get_games(conn, season_year)})
+        for week in weeks:
+            if from_week is not None and week < from_week:
+                continue
+            if through_week is not None and week > through_week:
+                break
+            changed |= self.apply_week(conn, season_year, week, states)
+        return changed
+
+
+    def apply_week(self, conn, season_year: int, week: int, states: Dict[Tuple[int, str], Dict[str, Any]]) -> Set[int]:
+        points_allowed = self.storage.get_fantasy_points_allowed(conn, season_year, week)
+        if not points_allowed:
+            self.logger.info(f"No fantasy points allowed found for season {season_year}, week {week}")
+            return set()
+
+        played = []
+        for defense_team_id, position, points in points_allowed:
+            key = (defense_team_id, position)
+            state = states.setdefault(key, new_trend_state(defense_team_id, position))
+            add_game(state, week, round(float(points), 2))
+            played.append(key)
+
+        standings = season_standings(states.values())
+
+        trend_rows = []
+        for key in played:
+            state = states[key]
+            rank, z_score = standings[key]
+            trend_rows.append({
+                'dvp_defense_team_id': state['defense_team_id'],
+                'dvp_position': state['position'],
+                'dvp_season_year': season_year,
+                'dvp_week_number': week,
+                'dvp_fantasy_points': state['recent_points'][0],
+                'dvp_avg_3': round(state['sum_3'] / min(state['games'], 3), 2),
+                'dvp_avg_5': round(state['sum_5'] / min(state['games'], 5), 2),
+                'dvp_season_avg': round(state['season_points'] / state['games'], 2),
+                'dvp_games': state['games'],
+                'dvp_season_rank': rank,
+                'dvp_season_z': z_score,
+            })
+
+        self.storage.save_defense_trend_state(conn, season_year, [states[key] for key in played])
+        self.storage.insert_defense_trends(conn, trend_rows)
+        self.logger.info(f"Updated defense trends for {len(trend_rows)} defense/position pairs in season {season_year}, week {week}")
+        return {defense_team_id for defense_team_id, _ in played}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Update rolling defense-vs-position trend metrics')
+    parser.add_argument('--year', type=int, required=True, help='Season year')
+    parser.add_argument('--week-num', type=int, help='Week to add (default: rebuild the whole season)')
+    args = parser.parse_args()
+
+    trends = DefenseTrends()
+    with trends.storage.connection() as conn:
+        if args.week_num is None:
+            changed = trends.rebuild_season(conn, args.year)
+        else:
+            changed = trends.update_weeks(conn, args.year, [args.week_num])
+        conn.commit()
+        publish_change(trends.storage, conn, 'stats.def_vs_pos_trends', args.year, None, changed)
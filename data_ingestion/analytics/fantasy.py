@@ -0,0 +1,58 @@
+from typing import Dict
+from ..ingestors.player_stats_ingestor import STAT_TABLES
+
+SKILL_POSITIONS = ('QB', 'RB', 'WR', 'TE')
+
+# Full-PPR points per unit of each stored stat column
+FANTASY_SCORING: Dict[str, Dict[str, float]] = {
+    'player_stats_weekly_passing': {
+        'psw_pass_yards': 0.04,
+        'psw_pass_touchdowns': 4,
+        'psw_pass_interceptions': -2,
+    },
+    'player_stats_weekly_rushing': {
+        'psw_rush_yards': 0.1,
+        'psw_rush_touchdowns': 6,
+        'psw_rush_fumbles_lost': -2,
+    },
+    'player_stats_weekly_receiving': {
+        'psw_rec_receptions': 1,
+        'psw_rec_yards': 0.1,
+        'psw_rec_touchdowns': 6,
+    },
+}
+
+
+def fantasy_points_allowed_query(placeholder: str) -> str:
+    """
+    Fantasy points each defense allowed to each skill position in one week.
+
+    Expects (season, week) once per scored table followed by SKILL_POSITIONS.
+    placeholder is the backend's parameter marker ('%s' or '?').
+    """
+    scored = []
+    for table_name, weights in FANTASY_SCORING.items():
+        config = STAT_TABLES[table_name]
+        prefix = config['opp_team_column'][:-len('_opp_team_id')]
+        points = ' + '.join(f"coalesce({col}, 0) * {weight}" for col, weight in weights.items())
+        scored.append(f"""
+            select {config['opp_team_column']} as defense_team_id,
+                   {prefix}_player_id as player_id,
+                   {points} as points
+            from stats.{table_name}
+            where {prefix}_season_year = {placeholder}
+            and {prefix}_week_number = {placeholder}
+        """)
+
+    return f"""
+        select s.defense_team_id, p.player_position, sum(s.points)
+        from ({' union all '.join(scored)}) s
+        join refdata.player p on p.player_id = s.player_id
+        where s.defense_team_id is not null
+        and p.player_position in ({', '.join([placeholder] * len(SKILL_POSITIONS))})
+        group by s.defense_team_id, p.player_position
+    """
+
+
+def fantasy_points_allowed_params(season_year: int, week: int) -> tuple:
+    return (season_year, week) * len(FANTASY_SCORING) + SKILL_POSITIONS
@@ -0,0 +1,230 @@
+import argparse
+import json
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, local
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import requests
+from ..analytics.fantasy import SKILL_POSITIONS
+from ..config.settings import settings
+from ..service.defense_vs_position import DefenseVsPositionService
+from ..service.season_cube import SeasonCubes
+from ..storage import get_storage_backend
+from ..utils.time import get_current_nfl_season_year
+
+logger = logging.getLogger(__name__)
+
+# Share of site traffic per position; the app's dropdown lists QB and RB first
+POSITION_WEIGHTS = {'QB': 0.35, 'RB': 0.35, 'WR': 0.2, 'TE': 0.1}
+
+# The app's route reads these database functions directly, for QB and RB only
+STATS_FUNCTIONS = {
+    'QB': 'stats.get_def_vs_qb_fantasy_points',
+    'RB': 'stats.get_def_vs_rb_fantasy_points',
+}
+
+
+def request_mix(
+    team_ids: List[int],
+    seasons: List[int],
+    positions: List[str],
+    count: int,
+    seed: int = 0
+) -> List[Tuple[int, str, int]]:
+    """
+    (defense team id, position, season) requests in a skewed, site-like mix.
+
+    Most requests are for the latest season, with each earlier season half
+    as likely as the next; a few defenses draw much more interest than the
+    rest (Zipf-like weights over a shuffled team order).
+    """
+    rng = random.Random(seed)
+    seasons = sorted(seasons, reverse=True)
+    season_weights = [0.5 ** age for age in range(len(seasons))]
+    teams = list(team_ids)
+    rng.shuffle(teams)
+    team_weights = [1 / rank for rank in range(1, len(teams) + 1)]
+    position_weights = [POSITION_WEIGHTS.get(position, 0.1) for position in positions]
+
+    return [
+        (rng.choices(teams, team_weights)[0], rng.choices(positions, position_weights)[0], rng.choices(seasons, season_weights)[0])
+        for _ in range(count)
+    ]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_level(target: Callable[[int, str, int], Any], requests_mix: List[Tuple[int, str, int]], concurrency: int) -> Dict[str, Any]:
+    """Replay the mix with concurrency threads issuing requests back to back."""
+    latencies = []
+    errors = []
+    lock = Lock()
+    position = iter(requests_mix)
+
+    def worker():
+        while True:
+            with lock:
+                request = next(position, None)
+            if request is None:
+                return
+            started = time.perf_counter()
+            try:
+                target(*request)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    if errors:
+        logger.warning(f"{len(errors)} failed requests at concurrency {concurrency}, first: {errors[0]}")
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": round(wall, 3),
+        "throughput": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def functions_target(storage) -> Callable[[int, str, int], Any]:
+    """The app's query: select * from the per-position stats function (the functions take no season)."""
+    def call(team_id, position, season_year):
+        with storage.connection() as conn, conn.cursor() as cur:
+            cur.execute(f"select * from {STATS_FUNCTIONS[position]}(%s)", (team_id,))
+            return cur.fetchall()
+    return call
+
+
+def trends_target(storage) -> Callable[[int, str, int], Any]:
+    """Uncached stats.def_vs_pos_trends reads, as the read service issues on a miss."""
+    def call(team_id, position, season_year):
+        with storage.connection() as conn:
+            return storage.get_defense_trends(conn, season_year, team_id, position)
+    return call
+
+
+def service_target(storage) -> Callable[[int, str, int], Any]:
+    """DefenseVsPositionService in this process, cache included."""
+    service = DefenseVsPositionService(storage)
+    return lambda team_id, position, season_year: service.query(team_id, position, season_year)
+
+
+def cube_target(root: Optional[str] = None) -> Callable[[int, str, int], Any]:
+    """Rows sliced from the exported season cubes (see service.season_cube)."""
+    cubes = SeasonCubes(root)
+
+    def call(team_id, position, season_year):
+        cube = cubes.get(season_year)
+        if cube is None:
+            raise LookupError(f"No season cube for {season_year} in {cubes.root}")
+        return cube.rows(team_id, position)
+    return call
+
+
+def http_target(url: str) -> Callable[[int, str, int], Any]:
+    """GET url?defTeamId=&skillPos=&season=, e.g. the app's /api/get-stats or the read service's /def-vs-pos."""
+    sessions = local()
+
+    def call(team_id, position, season_year):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        response = sessions.session.get(url, params={"defTeamId": team_id, "skillPos": position, "season": season_year})
+        response.raise_for_status()
+        return response.content
+    return call
+
+
+def print_results(target_name: str, results: List[Dict[str, Any]]) -> None:
+    print(f"\n{target_name}")
+    print(f"{'conc':>5} {'reqs':>7} {'errs':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for result in results:
+        print(
+            f"{result['concurrency']:>5} {result['requests']:>7} {result['errors']:>5} {result['throughput']:>9} "
+            f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9} {result['max_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Measure defense-vs-position read latency and throughput under concurrent load')
+    parser.add_argument('--target', choices=['functions', 'trends', 'service', 'cube', 'http'], default='trends',
+                        help='functions (the app\'s stats.get_def_vs_*_fantasy_points calls), trends (uncached '
+                             'def_vs_pos_trends reads), service (in-process cached read service), cube '
+                             '(memory-mapped season cubes), http (--url)')
+    parser.add_argument('--url', help='Endpoint for --target http, e.g. http://localhost:5173/api/get-stats '
+                                      f'or http://localhost:{settings.READ_SERVICE_PORT}/def-vs-pos')
+    parser.add_argument('--seasons', type=int, nargs='+', help='Seasons in the mix (default: the current season)')
+    parser.add_argument('--positions', nargs='+', choices=list(SKILL_POSITIONS),
+                        help='Positions in the mix (default: all; QB and RB for --target functions)')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32],
+                        help='Concurrency levels to step through')
+    parser.add_argument('--warmup', type=int, default=100, help='Requests sent before measuring')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the request mix')
+    parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    if args.target == 'http' and not args.url:
+        parser.error("--target http needs --url")
+    if args.target == 'functions' and set(args.positions or []) - set(STATS_FUNCTIONS):
+        parser.error("--target functions only has QB and RB")
+
+    storage = get_storage_backend()
+    with storage.connection() as conn:
+        team_ids = sorted(storage.get_team_map(conn).values())
+    positions = args.positions or (list(STATS_FUNCTIONS) if args.target == 'functions' else list(SKILL_POSITIONS))
+    seasons = args.seasons or [get_current_nfl_season_year()]
+
+    if args.target == 'functions':
+        target = functions_target(storage)
+    elif args.target == 'trends':
+        target = trends_target(storage)
+    elif args.target == 'service':
+        target = service_target(storage)
+    elif args.target == 'cube':
+        target = cube_target()
+    else:
+        target = http_target(args.url)
+
+    if args.target not in ('cube', 'http') and storage.name == 'postgres' and max(args.concurrency) > settings.DB_POOL_MAX_SIZE:
+        logger.warning(f"Concurrency above DB_POOL_MAX_SIZE={settings.DB_POOL_MAX_SIZE} queues on the connection pool")
+
+    mix = request_mix(team_ids, seasons, positions, args.requests, args.seed)
+    run_level(target, request_mix(team_ids, seasons, positions, args.warmup, args.seed + 1), max(args.concurrency))
+
+    results = []
+    for concurrency in args.concurrency:
+        result = run_level(target, mix, concurrency)
+        logger.info(f"Concurrency {concurrency}: {result['throughput']} req/s, p95 {result['p95_ms']} ms")
+        results.append(result)
+
+    print_results(f"{args.target} ({len(team_ids)} teams, seasons {', '.join(map(str, seasons))}, {', '.join(positions)})", results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"target": args.target, "seasons": seasons, "positions": positions, "results": results}, f, indent=2)
@@ -0,0 +1,227 @@
+import argparse
+import datetime
+import logging
+import os
+import random
+import uuid
+from typing import Any, Dict, List, Optional
+from ..ingestors.stats_reprocessor import StatsReprocessor
+from ..storage import get_storage_backend
+from ..utils.raw_archive import RawArchive
+
+logger = logging.getLogger(__name__)
+
+# Offensive players per team by position, in depth order, plus the kicker and a defensive rotation
+ROSTER = [('QB', 2), ('RB', 3), ('WR', 5), ('TE', 2), ('K', 1), ('LB', 4), ('CB', 3), ('S', 2)]
+
+REGULAR_SEASON_WEEKS = 18
+
+
+class SyntheticLeague:
+    """
+    A made-up league whose seasons are shaped like Sportradar payloads.
+
+    Teams and rosters are fixed per seed; each team also gets an offense
+    and a defense rating, so the fantasy points a defense allows differ
+    between teams the way they do in real data. Every season is a full
+    regular season in which each team plays every week.
+    """
+
+    def __init__(self, seed: int = 0, teams: int = 32):
+        self.random = random.Random(seed)
+        self.teams = [
+            {"id": self.uuid(), "name": f"Team {number:02d}", "market": f"City {number:02d}", "alias": f"T{number:02d}"}
+            for number in range(1, teams + 1)
+        ]
+        self.rosters = {
+            team["id"]: {
+                position: [
+                    {"id": self.uuid(), "name": f"{team['alias']} {position}{depth}", "position": position, "jersey": str(self.random.randint(1, 99))}
+                    for depth in range(1, count + 1)
+                ]
+                for position, count in ROSTER
+            }
+            for team in self.teams
+        }
+        self.offense = {team["id"]: self.random.uniform(0.8, 1.2) for team in self.teams}
+        self.defense = {team["id"]: self.random.uniform(0.8, 1.2) for team in self.teams}
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.random.getrandbits(128)))
+
+    def schedule(self, season_year: int) -> Dict[str, Any]:
+        kickoff = datetime.datetime(season_year, 9, 7, 17, 0, tzinfo=datetime.timezone.utc)
+        weeks = []
+        for week in range(1, REGULAR_SEASON_WEEKS + 1):
+            teams = list(self.teams)
+            self.random.shuffle(teams)
+            scheduled = (kickoff + datetime.timedelta(weeks=week - 1)).isoformat().replace("+00:00", "Z")
+            weeks.append({
+                "id": self.uuid(),
+                "sequence": week,
+                "games": [
+                    {"id": self.uuid(), "scheduled": scheduled, "status": "closed", "home": {"id": home["id"]}, "away": {"id": away["id"]}}
+                    for home, away in zip(teams[0::2], teams[1::2])
+                ]
+            })
+        return {"year": season_year, "type": "REG", "weeks": weeks}
+
+    def count(self, mean: float) -> int:
+        return max(0, int(round(self.random.gauss(mean, mean * 0.35))))
+
+    def side(self, team_id: str, opponent_id: str) -> Dict[str, Any]:
+        """One team's statistics block, scaled by its offense against the opponent's defense."""
+        roster = self.rosters[team_id]
+        factor = self.offense[team_id] * self.defense[opponent_id]
+
+        pass_attempts = self.count(34)
+        completions = min(pass_attempts, self.count(22))
+        pass_yards = self.count(230 * factor)
+        pass_touchdowns = self.count(1.6 * factor)
+        passing = [dict(roster['QB'][0], attempts=pass_attempts, completions=completions, yards=pass_yards,
+                        avg_yards=round(pass_yards / pass_attempts, 1) if pass_attempts else 0.0,
+                        touchdowns=pass_touchdowns, interceptions=self.count(0.8), sacks=self.count(2.3))]
+
+        carriers = roster['RB'] + roster['QB'][:1]
+        rushing = []
+        for share, player in zip((0.55, 0.25, 0.1, 0.1), carriers):
+            attempts = self.count(27 * share)
+            yards = self.count(120 * share * factor)
+            rushing.append(dict(player, attempts=attempts, yards=yards, touchdowns=self.count(0.9 * share * factor),
+                                avg_yards=round(yards / attempts, 1) if attempts else 0.0))
+
+        # Receptions follow the completions, split over the targets by depth
+        targets = roster['WR'] + roster['TE'] + roster['RB'][:2]
+        weights = [0.24, 0.18, 0.1, 0.05, 0.03, 0.14, 0.06, 0.12, 0.08]
+        receiving = []
+        for weight, player in zip(weights, targets):
+            receptions = min(completions, self.count(completions * weight))
+            receiving.append(dict(player, targets=receptions + self.count(1.5), receptions=receptions,
+                                  yards=self.count(pass_yards * weight),
+                                  touchdowns=min(pass_touchdowns, self.count(pass_touchdowns * weight))))
+
+        kicker = roster['K'][0]
+        fg_attempts, xp_attempts = self.count(1.8), self.count(2.4)
+        defenders = roster['LB'] + roster['CB'] + roster['S']
+        fumbler = self.random.choice(carriers)
+        lost = self.count(0.3)
+
+        return {
+            "id": team_id,
+            "summary": {"play_count": self.count(62), "total_yards": pass_yards + sum(row['yards'] for row in rushing),
+                        "turnovers": passing[0]['interceptions'] + lost, "penalties": self.count(6),
+                        "penalty_yards": self.count(50), "possession_time": f"{self.random.randint(25, 35)}:{self.random.randint(0, 59):02d}"},
+            "first_downs": {"total": self.count(20), "pass": self.count(11), "rush": self.count(7), "penalty": self.count(1.5)},
+            "efficiency": {"thirddown": {"attempts": self.count(13), "successes": self.count(5)},
+                           "redzone": {"attempts": self.count(3.3), "successes": self.count(1.9)}},
+            "touchdowns": {"total": pass_touchdowns + sum(row['touchdowns'] for row in rushing)},
+            "passing": {"totals": {"attempts": pass_attempts, "completions": completions, "yards": pass_yards}, "players": passing},
+            "rushing": {"players": rushing},
+            "receiving": {"players": receiving},
+            "field_goals": {"players": [dict(kicker, attempts=fg_attempts, made=min(fg_attempts, self.count(1.5)))]},
+            "extra_points": {"players": [dict(kicker, attempts=xp_attempts, made=min(xp_attempts, self.count(2.3)))]},
+            "defense": {"players": [dict(player, tackles=self.count(4), sacks=self.count(0.3)) for player in defenders]},
+            "fumbles": {"players": [dict(fumbler, fumbles=lost + self.count(0.2), lost_fumbles=lost)] if lost else []},
+        }
+
+    def game_statistics(self, game: Dict[str, Any]) -> Dict[str, Any]:
+        home_id, away_id = game["home"]["id"], game["away"]["id"]
+        home, away = self.side(home_id, away_id), self.side(away_id, home_id)
+        home_points = 7 * home["touchdowns"]["total"] + 3 * home["field_goals"]["players"][0]["made"]
+        away_points = 7 * away["touchdowns"]["total"] + 3 * away["field_goals"]["players"][0]["made"]
+        game["scoring"] = {"home_points": home_points, "away_points": away_points}
+        return {
+            "id": game["id"],
+            "status": "closed",
+            "summary": {"home": {"points": home_points}, "away": {"points": away_points}},
+            "statistics": {"home": home, "away": away},
+        }
+
+
+def generate(storage, seasons: List[int], archive_root: str, seed: int = 0, workers: Optional[int] = None) -> int:
+    """
+    Load synthetic seasons through the same path as archived API data.
+
+    Teams, weeks and games go into refdata; every game's statistics payload
+    is appended to a raw archive at archive_root, and StatsReprocessor then
+    builds the stats tables and defense trends from it. The archive can
+    also be replayed by service.mock_sportradar. Returns the number of games.
+    """
+    league = SyntheticLeague(seed)
+    archive = RawArchive(archive_root)
+    archive.append("teams", {"teams": league.teams})
+
+    games = 0
+    with storage.connection() as conn:
+        storage.insert_teams(conn, league.teams)
+        conn.commit()
+        team_map = storage.get_team_map(conn)
+
+        for season_year in seasons:
+            schedule = league.schedule(season_year)
+            payloads = [
+                (week["sequence"], league.game_statistics(game))
+                for week in schedule["weeks"]
+                for game in week["games"]
+            ]
+
+            storage.insert_weeks(conn, [
+                {
+                    "week_sr_uuid": week["id"],
+                    "week_season_year": season_year,
+                    "week_season_type": schedule["type"],
+                    "week_number": week["sequence"],
+                    "week_start_date": datetime.datetime.fromisoformat(week["games"][0]["scheduled"].replace("Z", "+00:00")),
+                    "week_end_date": datetime.datetime.fromisoformat(week["games"][0]["scheduled"].replace("Z", "+00:00")),
+                }
+                for week in schedule["weeks"]
+            ])
+            week_ids = storage.get_week_ids(conn, [week["id"] for week in schedule["weeks"]])
+            storage.insert_games(conn, [
+                {
+                    "game_week": week["sequence"],
+                    "game_season_year": season_year,
+                    "game_home_team_id": team_map[game["home"]["id"]],
+                    "game_away_team_id": team_map[game["away"]["id"]],
+                    "game_date": datetime.datetime.fromisoformat(game["scheduled"].replace("Z", "+00:00")),
+                    "game_home_score": game["scoring"]["home_points"],
+                    "game_away_score": game["scoring"]["away_points"],
+                    "game_sr_uuid": game["id"],
+                    "game_week_id": week_ids[week["id"]],
+                    "game_status": game["status"],
+                }
+                for week in schedule["weeks"]
+                for game in week["games"]
+            ])
+            conn.commit()
+
+            archive.append("games", schedule, season=season_year)
+            for week, payload in payloads:
+                archive.append("game_stats", payload, season=season_year, week=week, game_uuid=payload["id"])
+            games += len(payloads)
+            logger.info(f"Generated {len(payloads)} games for season {season_year}")
+
+    reprocessor = StatsReprocessor(seasons=[str(season_year) for season_year in seasons], workers=workers)
+    reprocessor.raw_archive = archive
+    reprocessor.run()
+    return games
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Fill the database with synthetic seasons of stats for scaling tests')
+    parser.add_argument('--seasons', type=int, default=1, help='Number of seasons to generate')
+    parser.add_argument('--first-season', type=int, default=2010, help='Year of the first generated season')
+    parser.add_argument('--archive-root', default=os.path.join('.data', 'synthetic'),
+                        help='Raw archive the generated payloads are written to')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for teams, rosters and stat lines')
+    parser.add_argument('--workers', type=int, help='Worker processes for the stats transform (default: CPU count)')
+    args = parser.parse_args()
+
+    seasons = list(range(args.first_season, args.first_season + args.seasons))
+    games = generate(get_storage_backend(), seasons, args.archive_root, args.seed, args.workers)
+    logging.info(f"Generated {games} games over seasons {seasons[0]}-{seasons[-1]} into {args.archive_root}")
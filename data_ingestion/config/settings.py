@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 ENVIRONMENT = os.getenv("ENVIRONMENT", "DEV").upper()
@@ -6,12 +7,35 @@ root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
 env_file = os.path.join(root_dir, ".env.prod" if ENVIRONMENT == "PROD" else ".env.dev")
 
 class Settings(BaseSettings):
-    DB_HOST = os.environ.get("DB_HOST")
-    DB_PORT = int(os.environ.get("DB_PORT", 5432))
-    DB_NAME = os.environ.get("DB_NAME")
-    DB_USER = os.environ.get("DB_USER")
-    DB_PASSWORD = os.environ.get("DB_PASSWORD")
-    ENVIRONMENT = os.environ.get("ENVIRONMENT", "dev")
+    DB_HOST: Optional[str] = os.environ.get("DB_HOST")
+    DB_PORT: int = int(os.environ.get("DB_PORT", 5432))
+    DB_NAME: Optional[str] = os.environ.get("DB_NAME")
+    DB_USER: Optional[str] = os.environ.get("DB_USER")
+    DB_PASSWORD: Optional[str] = os.environ.get("DB_PASSWORD")
+    DB_POOL_MIN_SIZE: int = int(os.environ.get("DB_POOL_MIN_SIZE", 1))
+    DB_POOL_MAX_SIZE: int = int(os.environ.get("DB_POOL_MAX_SIZE", 4))
+    DB_SYNCHRONOUS_COMMIT: str = os.environ.get("DB_SYNCHRONOUS_COMMIT", "on")
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 0))
+    ENVIRONMENT: str = os.environ.get("ENVIRONMENT", "dev")
+    ALLOW_PROD: bool = os.environ.get("ALLOW_PROD", "false").lower() == "true"
+    READ_CACHE_MAX_ENTRIES: int = int(os.environ.get("READ_CACHE_MAX_ENTRIES", 4096))
+    READ_SERVICE_PORT: int = int(os.environ.get("READ_SERVICE_PORT", 8081))
+    SCHEDULER_STATUS_PORT: int = int(os.environ.get("SCHEDULER_STATUS_PORT", 8082))
+    SCHEDULER_TICK_SECONDS: int = int(os.environ.get("SCHEDULER_TICK_SECONDS", 60))
+    MOCK_API_PORT: int = int(os.environ.get("MOCK_API_PORT", 8083))
+    SEASON_CUBE_DIR: str = os.environ.get("SEASON_CUBE_DIR", os.path.join(".data", "cubes"))
+    EXPORT_DIR: str = os.environ.get("EXPORT_DIR", os.path.join(".data", "exports"))
+    EXPORT_OVERLAP_SECONDS: int = int(os.environ.get("EXPORT_OVERLAP_SECONDS", 3600))
+    API_RATE_PER_SECOND: float = float(os.environ.get("API_RATE_PER_SECOND", 1.0))
+    API_RATE_BURST: int = int(os.environ.get("API_RATE_BURST", 1))
+    WORKER_HEARTBEAT_SECONDS: int = int(os.environ.get("WORKER_HEARTBEAT_SECONDS", 15))
+    WORKER_STALE_SECONDS: int = int(os.environ.get("WORKER_STALE_SECONDS", 120))
+    WORKER_IDLE_SECONDS: int = int(os.environ.get("WORKER_IDLE_SECONDS", 5))
+    WORKER_MAX_ATTEMPTS: int = int(os.environ.get("WORKER_MAX_ATTEMPTS", 3))
+    STATS_WEEK_PARTITIONS: bool = os.environ.get("STATS_WEEK_PARTITIONS", "false").lower() == "true"
+    PIPELINE_FETCH_WORKERS: int = int(os.environ.get("PIPELINE_FETCH_WORKERS", 4))
+    PIPELINE_TRANSFORM_WORKERS: int = int(os.environ.get("PIPELINE_TRANSFORM_WORKERS", 1))
+    PIPELINE_QUEUE_SIZE: int = int(os.environ.get("PIPELINE_QUEUE_SIZE", 8))
 
     model_config = SettingsConfigDict(env_file=env_file, env_file_encoding="utf-8", extra="allow")
 
@@ -0,0 +1,206 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import shutil
+from typing import Dict, List, Optional
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from ..config.settings import settings
+from ..ingestors.player_stats_ingestor import STAT_TABLES, TEAM_STATS_TABLE
+from ..storage import get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "_export_state.json"
+
+FORMATS = {
+    "parquet": ("parquet", lambda table, path: pq.write_table(table, path, compression="zstd")),
+    "arrow": ("arrow", lambda table, path: feather.write_feather(table, path, compression="zstd")),
+}
+
+
+# Postgres type name -> Arrow type; numerics use their declared precision and scale
+ARROW_TYPES = {
+    "int2": pa.int16(),
+    "int4": pa.int32(),
+    "int8": pa.int64(),
+    "float4": pa.float32(),
+    "float8": pa.float64(),
+    "bool": pa.bool_(),
+    "text": pa.string(),
+    "varchar": pa.string(),
+    "date": pa.date32(),
+    "timestamp": pa.timestamp("us"),
+    "timestamptz": pa.timestamp("us", tz="UTC"),
+}
+
+
+def arrow_type(column: Dict) -> pa.DataType:
+    if column["type"] == "numeric":
+        if column["precision"]:
+            return pa.decimal128(column["precision"], column["scale"] or 0)
+        return pa.float64()
+    return ARROW_TYPES.get(column["type"], pa.string())
+
+
+def stats_export_table(config: Dict) -> tuple:
+    season_column = next(col for col in config['key_columns'] if col.endswith('_season_year'))
+    prefix = season_column[:-len('_season_year')]
+    return (f"stats.{config['table_name']}", season_column, f"{prefix}_week_number", f"{prefix}_updated_at")
+
+
+# (table, season column, week column, updated-at column)
+EXPORT_TABLES = [stats_export_table(config) for config in STAT_TABLES.values()] + [
+    stats_export_table(TEAM_STATS_TABLE),
+    ("stats.def_vs_pos_trends", "dvp_season_year", "dvp_week_number", "dvp_updated_at"),
+    ("refdata.game", "game_season_year", "game_week", "game_updated_at"),
+    ("refdata.depth_chart_weekly", "dc_season_year", "dc_week", "dc_updated_at"),
+    ("refdata.depth_chart_change", "dcc_season_year", "dcc_week", "dcc_updated_at"),
+    ("refdata.injury_weekly", "inj_season_year", "inj_week_number", "inj_updated_at"),
+]
+
+
+class ParquetExporter:
+    """
+    Incremental columnar export of the stats and refdata tables.
+
+    Each table is written as one file per season and week,
+    <root>/<schema>.<table>/season=<year>/week=<week>/part-0.<ext>, the
+    hive layout that pyarrow.dataset, DuckDB and Spark read as partition
+    columns. A run rewrites only the partitions with rows updated or
+    deleted since the previous run's watermark (kept per table in
+    <root>/_export_state.json), less overlap_seconds for transactions that
+    committed after it; a partition left with no rows has its file removed. Files
+    are written beside the old one and renamed over it, so a reader never
+    sees a half-written partition.
+    """
+
+    def __init__(self, root: Optional[str] = None, storage=None, file_format: str = "parquet", overlap_seconds: Optional[int] = None):
+        self.root = root or settings.EXPORT_DIR
+        self.storage = storage or get_storage_backend()
+        if self.storage.name != "postgres":
+            raise ValueError("Exports read the ingestion timestamps kept in Postgres; set STORAGE_BACKEND=postgres")
+        self.extension, self.writer = FORMATS[file_format]
+        self.overlap = datetime.timedelta(seconds=settings.EXPORT_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds)
+        self.state_path = os.path.join(self.root, STATE_FILE)
+
+
+    def load_state(self) -> Dict[str, str]:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+
+    def save_state(self, state: Dict[str, str]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(f"{self.state_path}.tmp", "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(f"{self.state_path}.tmp", self.state_path)
+
+
+    def partition_path(self, table: str, season_year: int, week: int) -> str:
+        return os.path.join(self.root, table, f"season={season_year}", f"week={week}", f"part-0.{self.extension}")
+
+
+    def write_partition(self, conn, table: str, season_column: str, week_column: str, season_year: int, week: int) -> int:
+        columns, rows = self.storage.get_week_rows(conn, table, season_column, week_column, season_year, week)
+        path = self.partition_path(table, season_year, week)
+        if not rows:
+            # Every row of the week was deleted since the last export
+            if os.path.exists(path):
+                os.remove(path)
+            return 0
+
+        # season and week are already in the path, as hive partition keys
+        kept = [i for i, column in enumerate(columns) if column["name"] not in (season_column, week_column)]
+        schema = pa.schema([(columns[i]["name"], arrow_type(columns[i])) for i in kept])
+        arrays = []
+        for i, field in zip(kept, schema):
+            values = [row[i] for row in rows]
+            if pa.types.is_string(field.type) and columns[i]["type"] not in ("text", "varchar"):
+                # Types without an Arrow mapping (json, uuid, ...) are exported as their text form
+                values = [None if value is None else str(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        arrow_table = pa.Table.from_arrays(arrays, schema=schema)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.writer(arrow_table, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        return len(rows)
+
+
+    def export_table(self, conn, table: str, season_column: str, week_column: str, updated_column: str, since: Optional[datetime.datetime]) -> int:
+        weeks = self.storage.get_changed_weeks(conn, table, season_column, week_column, updated_column, since)
+        conn.commit()
+
+        rows = 0
+        for season_year, week in weeks:
+            rows += self.write_partition(conn, table, season_column, week_column, season_year, week)
+            # One short read per partition rather than one snapshot held across the export
+            conn.commit()
+
+        logger.info(f"Exported {table}: {len(weeks)} partitions, {rows} rows" + ("" if since else " (full)"))
+        return len(weeks)
+
+
+    def run(self, tables: Optional[List[str]] = None, full: bool = False) -> int:
+        state = self.load_state()
+        exported = 0
+
+        with self.storage.connection() as conn:
+            for table, season_column, week_column, updated_column in EXPORT_TABLES:
+                if tables and table not in tables:
+                    continue
+                if full:
+                    shutil.rmtree(os.path.join(self.root, table), ignore_errors=True)
+                    state.pop(table, None)
+
+                # Taken before reading, so rows written during the export are picked up next time
+                watermark = self.storage.get_database_time(conn)
+                previous = state.get(table)
+                since = datetime.datetime.fromisoformat(previous) - self.overlap if previous else None
+
+                exported += self.export_table(conn, table, season_column, week_column, updated_column, since)
+                state[table] = watermark.isoformat()
+                self.save_state(state)
+
+        return exported
+
+
+if __name__ == "__main__":
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.logs')
+    os.makedirs(logs_dir, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_filename = os.path.join(logs_dir, f'parquet_export_{timestamp}.log')
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_filename),
+            logging.StreamHandler()
+        ]
+    )
+
+    logging.info(f"Logging to file: {log_filename}")
+
+    parser = argparse.ArgumentParser(
+        description='Export stats and refdata tables to Parquet or Arrow files partitioned by season and week, '
+                    'rewriting only partitions changed since the last export'
+    )
+    parser.add_argument('--root', default=settings.EXPORT_DIR, help='Export directory')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='parquet', help='File format')
+    parser.add_argument('--tables', nargs='+', choices=[table for table, *_ in EXPORT_TABLES],
+                        help='Tables to export (default: all)')
+    parser.add_argument('--full', action='store_true', help='Discard earlier exports of these tables and rewrite every partition')
+    parser.add_argument('--overlap-seconds', type=int,
+                        help=f'Re-check rows updated this long before the last watermark (default: {settings.EXPORT_OVERLAP_SECONDS})')
+    args = parser.parse_args()
+
+    exporter = ParquetExporter(args.root, file_format=args.format, overlap_seconds=args.overlap_seconds)
+    exported = exporter.run(args.tables, full=args.full)
+    logging.info(f"Export complete: {exported} partitions written to {args.root}")
@@ -1,11 +1,14 @@
-import json
 import os
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 import requests
 from dotenv import load_dotenv
 from data_ingestion.config.settings import Settings
-from ..utils.time import utc_now
+from ..storage import get_storage_backend
+from ..utils.change_events import publish_change
+from ..utils.profiling import profile_stage
+from ..utils.raw_archive import RawArchive
 
 class BaseIngestor:
     def __init__(self):
@@ -14,105 +17,83 @@ class BaseIngestor:
         self.base_url = os.getenv("NFL_BASE_API_URL")
         self.api_key = os.getenv("NFL_API_KEY")
         self.settings = Settings()
+        self.storage = get_storage_backend()
+        self.raw_archive = RawArchive()
         self.headers = {
             "accept": "application/json",
             "x-api-key": self.api_key
         }
+        # Keep-alive across requests; a long-lived process can hand every ingestor the same session
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Set by long-lived processes to reuse id lookups across runs (see utils.id_cache)
+        self.id_cache = None
+        # Set by workers sharing one API quota across processes (see utils.rate_budget)
+        self.rate_budget = None
+        # Set by --profile to time each pipeline stage (see utils.profiling)
+        self.profiler = None
 
         if os.getenv("ENVIRONMENT", "PROD").upper() == "PROD":
-            confirm = input(
-                "You are about to run against PROD."
-                "Type 'yes' to continue: "
-            )
-            if confirm.lower() != "yes":
-                print("Aborted.")
-                sys.exit(1)     
+            if os.getenv("ALLOW_PROD", "false").lower() != "true":
+                print("Refusing to run against PROD. Set ALLOW_PROD=true to authorize.")
+                sys.exit(1)
     
+    def stage(self, name):
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
     def fetch_data(self, url: str) -> dict:
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        with self.stage("fetch"):
+            if self.rate_budget is not None:
+                self.rate_budget.acquire()
+            response = self.session.get(url)
+            response.raise_for_status()
+        with self.stage("decode"):
+            return response.json()
         
-    def save_raw_json(self, data, folder_name):
-        folder = os.path.join(".data", folder_name)
-        os.makedirs(folder, exist_ok=True)
-        timestamp = utc_now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(folder, f"{folder_name}_{timestamp}.json")
-
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
+    @profile_stage("archive")
+    def save_raw_json(self, data, folder_name, season=None, week=None, game_uuid=None):
+        segment_path, offset = self.raw_archive.append(
+            folder_name, data, season=season, week=week, game_uuid=game_uuid
+        )
+        print(f"Archived raw data to {segment_path} at offset {offset}")
 
-        print(f"Saved raw data to {filename}")   
+    def publish_change(self, conn, table, season, week=None, team_ids=()):
+        # call after conn.commit(); subscribers may read the new rows straight away
+        return publish_change(self.storage, conn, table, season, week, team_ids)
 
+    @profile_stage("resolve")
     def insert_player(self, conn, player_data):
-        query = """
-            insert into refdata.player 
-            (
-                player_name, 
-                player_first_name, 
-                player_last_name, 
-                player_team_id, 
-                player_position, 
-                player_sr_uuid, 
-                player_number
-            )
-            values (%s, %s, %s, %s, %s, %s, %s)
-            on conflict (player_sr_uuid) do update set
-                player_name = excluded.player_name,
-                player_first_name = excluded.player_first_name,
-                player_last_name = excluded.player_last_name,
-                player_team_id = coalesce(excluded.player_team_id, refdata.player.player_team_id),
-                player_position = coalesce(excluded.player_position, refdata.player.player_position),
-                player_number = coalesce(excluded.player_number, refdata.player.player_number)
-            returning player_id;
-        """
-
-        name_parts = player_data["name"].split(' ', 1)
-        first_name = name_parts[0]
-        last_name = name_parts[1] if len(name_parts) > 1 else ''
-        
+        if self.id_cache is not None:
+            self.id_cache.mark_inserted([player_data["player_sr_uuid"]])
         team_id = None
         if player_data.get("team_id"):
-            with conn.cursor() as cur:
-                cur.execute("""
-                    select team_id from refdata.team where team_sr_uuid = %s
-                """, (player_data["team_id"],))
-                team_row = cur.fetchone()
-                team_id = team_row[0] if team_row else None
+            team_id = self.storage.get_team_id(conn, player_data["team_id"])
         
-        with conn.cursor() as cur:
-            cur.execute(
-                query,
-                (
-                    player_data["name"],
-                    first_name,
-                    last_name,
-                    team_id,
-                    player_data.get("position"),
-                    player_data["player_sr_uuid"],
-                    player_data.get("jersey")
-                ),
-            )
-            result = cur.fetchone()
-            return result[0] if result else None
+        return self.storage.insert_player(conn, player_data, team_id)
             
+    @profile_stage("resolve")
+    def insert_players(self, conn, players, team_map):
+        players = list(players)
+        if self.id_cache is not None:
+            self.id_cache.mark_inserted(player["player_sr_uuid"] for player in players)
+        self.storage.insert_players(conn, players, team_map)
             
+    @profile_stage("resolve")
     def get_player_id(self, conn, player_uuid):
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                select player_id
-                from refdata.player
-                where player_sr_uuid = %s
-                """, (player_uuid,))
-            player_row = cur.fetchone()
-            return player_row[0] if player_row else None
+        if self.id_cache is not None:
+            return self.get_player_ids(conn, [player_uuid]).get(player_uuid)
+        return self.storage.get_player_id(conn, player_uuid)
+    
+    
+    @profile_stage("resolve")
+    def get_player_ids(self, conn, player_uuids):
+        if self.id_cache is not None:
+            return self.id_cache.get_player_ids(player_uuids, lambda missing: self.storage.get_player_ids(conn, missing))
+        return self.storage.get_player_ids(conn, player_uuids)
     
     
+    @profile_stage("resolve")
     def get_team_map(self, conn):
-        team_map = {}
-        with conn.cursor() as cur:
-            cur.execute("select team_id, team_sr_uuid from refdata.team")
-            for row in cur.fetchall():
-                team_map[row[1]] = row[0]
-        return team_map
+        if self.id_cache is not None:
+            return self.id_cache.get_team_map(lambda: self.storage.get_team_map(conn))
+        return self.storage.get_team_map(conn)
@@ -1,104 +1,250 @@
 import os
+import argparse
 import datetime
 import logging
-from ..utils.db import safe_connection
+from contextlib import nullcontext
+from ..config.settings import settings
+from ..utils.pipeline import Pipeline
+from ..utils.profiling import StageProfiler, add_profile_arguments, profile_dir, profile_stage
+from ..utils.task_queue import TaskQueue, make_task
 from .base_ingestor import BaseIngestor
 
+
+def depth_chart_entries(depth_chart_rows):
+    """Index dc_ rows as {team_id: {(player_id, position, alignment): rank}}; the first row for an entry wins."""
+    entries = {}
+    for row in depth_chart_rows:
+        key = (row["dc_player_id"], row["dc_player_position"], row["dc_player_position_alignment"])
+        entries.setdefault(row["dc_team_id"], {}).setdefault(key, row["dc_rank"])
+    return entries
+
+
+def depth_chart_changes(previous, current, season_year, week):
+    """
+    Change rows that turn the previous charts into the current ones.
+
+    Only teams in current are compared, so a team missing from a week's
+    feed keeps its last known chart. A removed entry gets a null rank.
+    """
+    changes = []
+    for team_id, entries in current.items():
+        before = previous.get(team_id, {})
+        changed = [(key, rank) for key, rank in entries.items() if key not in before or before[key] != rank]
+        changed += [(key, None) for key in before if key not in entries]
+
+        for (player_id, position, alignment), rank in changed:
+            changes.append({
+                "dcc_team_id": team_id,
+                "dcc_season_year": season_year,
+                "dcc_week": week,
+                "dcc_player_id": player_id,
+                "dcc_player_position": position,
+                "dcc_player_position_alignment": alignment,
+                "dcc_rank": rank
+            })
+    return changes
+
+
 class DepthChartIngestor(BaseIngestor):
-    def __init__(self):
+    def __init__(self, delta=False):
         super().__init__()
         self.endpoint_template = "seasons/{year}/REG/{week:02d}/depth_charts.json"
+        self.delta = delta
+        self.depth_charts = None
+        self.resume = False
+        self.tasks = TaskQueue(self.storage, "depth_charts")
         self.logger = logging.getLogger(__name__)
 
-    def insert_depth_chart(self, conn, player_row):
-        query = """
-            insert into refdata.depth_chart_weekly
-            (
-                dc_team_id, 
-                dc_season_year, 
-                dc_week, 
-                dc_player_id,
-                dc_player_position, 
-                dc_player_position_alignment,
-                dc_rank
-             )
-             values(%s, %s, %s, %s, %s, %s, %s)
-             on conflict (dc_team_id, dc_season_year, dc_week, dc_player_id, 
-                dc_player_position, dc_player_position_alignment) do nothing
-        """
+    def depth_chart_rows(self, player_rows, team_map, player_ids):
+        return [
+            {
+                "dc_team_id": team_map.get(player_row["team_id"]),
+                "dc_season_year": player_row["year"],
+                "dc_week": player_row["week"],
+                "dc_player_id": player_ids.get(player_row["player_sr_uuid"]),
+                "dc_player_position": player_row["position"],
+                "dc_player_position_alignment": player_row["position_alignment"],
+                "dc_rank": player_row["rank"]
+            }
+            for player_row in player_rows
+        ]
+
+    @profile_stage("write")
+    def insert_depth_charts(self, conn, player_rows, team_map, player_ids):
+        self.storage.insert_depth_charts(conn, self.depth_chart_rows(player_rows, team_map, player_ids))
+
+    @profile_stage("write")
+    def insert_depth_chart_changes(self, conn, player_rows, team_map, player_ids, year, week):
+        if self.depth_charts is None:
+            # Diff against whatever was stored before this run's first week
+            self.depth_charts = depth_chart_entries(self.storage.get_depth_chart(conn, year, week - 1))
+
+        rows = [
+            row for row in self.depth_chart_rows(player_rows, team_map, player_ids)
+            if row["dc_team_id"] is not None and row["dc_player_id"] is not None
+        ]
+        current = depth_chart_entries(rows)
+        changes = depth_chart_changes(self.depth_charts, current, year, week)
+
+        self.storage.replace_depth_chart_changes(conn, year, week, current.keys(), changes)
+        self.depth_charts.update(current)
+        return len(changes)
+
+    def fetch_week(self, year, week):
+        endpoint = self.endpoint_template.format(year=year, week=week)
+        url = f"{self.base_url}{endpoint}"
+        data = self.fetch_data(url)
         
-        with conn.cursor() as cur:
-            team_map = self.get_team_map(conn)
-            db_team_id = team_map.get(player_row["team_id"])
-            
-            db_player_id = self.get_player_id(conn, player_row["player_sr_uuid"])
-            
-            cur.execute(
-                query,
-                (
-                    db_team_id,
-                    player_row["year"],
-                    player_row["week"],
-                    db_player_id,
-                    player_row["position"],
-                    player_row["position_alignment"],
-                    player_row["rank"]
-                )
-            )
+        if os.getenv("ENVIRONMENT", "DEV").upper() == "DEV":
+            self.save_raw_json(data, "depth_charts", season=year, week=week)
+        return data
+
+    @profile_stage("transform")
+    def depth_chart_players(self, data):
+        return [
+            {
+                "team_id": team["id"],
+                "player_sr_uuid": player["id"],
+                "name": player["name"],
+                "position": player["position"], # e.g., WR, RB, etc.
+                "position_alignment": pos["position"].get("name"),  # e.g., LWR, WR, RWR
+                "rank": player.get("depth") if player.get("depth") is not None else -1,
+                "jersey": player.get("jersey"),
+                "year": data["season"]["year"] if "season" in data 
+                    and "year" in data["season"] else None,
+                "week": data["week"]["sequence"] if "week" in data 
+                    and "sequence" in data["week"] else None
+            }
+            for team in data["teams"]
+            for group in ["offense", "defense", "special_teams"]
+            for pos in team.get(group, [])
+            if "position" in pos and "players" in pos["position"]
+            for player in pos["position"]["players"]
+        ]
+
+    def ingest_week(self, conn, task, year, week, team_map):
+        """Fetch and write one week's depth charts, committing them with its task."""
+        try:
+            data = self.fetch_week(year, week)
+        except Exception as e:
+            self.logger.error(f"Error fetching depth charts for week {week}: {e}")
+            self.fail_week(conn, task, e)
+            raise
+        
+        self.write_week(conn, task, year, week, team_map, self.depth_chart_players(data))
+
+    def write_week(self, conn, task, year, week, team_map, players):
+        """Write one week's depth chart rows, committing them with its task."""
+        self.logger.info(f"Found {len(players)} players to process")
+        
+        try:
+            self.insert_players(conn, players, team_map)
+            self.logger.info(f"Successfully upserted {len(players)} players")
+        except Exception as e:
+            self.logger.error(f"Error upserting players for week {week}: {e}")
+            self.fail_week(conn, task, e)
+            raise
+        
+        player_ids = self.get_player_ids(conn, {player_row["player_sr_uuid"] for player_row in players})
+        
+        for player_row in players:
+            if player_row["rank"] == -1:
+                self.logger.warning(f"Warning: No rank for player {player_row['name']} ({player_row['player_sr_uuid']}) - using default -1")
+        
+        try:
+            if self.delta:
+                written = self.insert_depth_chart_changes(conn, players, team_map, player_ids, year, week)
+                self.logger.info(f"Successfully inserted {written} changes for {len(players)} depth chart rows into refdata.depth_chart_change")
+            else:
+                self.insert_depth_charts(conn, players, team_map, player_ids)
+                self.logger.info(f"Successfully inserted {len(players)} rows into refdata.depth_chart_weekly")
+        except Exception as e:
+            self.logger.error(f"Error inserting depth chart for week {week}: {e}")
+            self.fail_week(conn, task, e)
+            raise
+        
+        # Each week is committed with its task, so a crash loses at most the week in progress
+        self.tasks.done(conn, task)
+        conn.commit()
+        table = 'refdata.depth_chart_change' if self.delta else 'refdata.depth_chart_weekly'
+        self.publish_change(conn, table, year, week, {team_map.get(player_row["team_id"]) for player_row in players})
+
 
     def run(self):
-        with safe_connection() as conn:
-            year = 2024 
+        """
+        Ingest the season's weeks through a fetch, transform and write pipeline.
+
+        Later weeks are fetched while earlier ones are written, but the
+        writes run one at a time in week order, as delta mode's
+        week-to-week diff needs.
+        """
+        # Rebuilt from storage at the first week, in case the instance is reused between runs
+        self.depth_charts = None
+        year = 2024 
+        with self.storage.connection() as conn:
+            team_map = self.get_team_map(conn)
+            tasks = self.tasks.plan(conn, [make_task(year, i) for i in range(1, 19)], resume=self.resume)
+
+        def fetch(item):
+            week, task = item
+            if task["status"] == "done":
+                return week, task, None, None
+            try:
+                return week, task, self.fetch_week(year, week), None
+            except Exception as e:
+                # Recorded on the task by the writer, which holds the connection
+                return week, task, None, e
+
+        def transform(item):
+            week, task, data, error = item
+            return week, task, None if data is None else self.depth_chart_players(data), error
+
+        def write(conn, item):
+            week, task, players, error = item
+            if self.tasks.skip(task):
+                # The next delta is diffed against stored charts, not ones built in this run
+                self.depth_charts = None
+                return
             
-            for i in range(1, 19):
-                endpoint = self.endpoint_template.format(year=year, week=i)
-                url = f"{self.base_url}{endpoint}"
-                data = self.fetch_data(url)
-                
-                if os.getenv("ENVIRONMENT", "DEV").upper() == "DEV":
-                    self.save_raw_json(data, "depth_charts")
-                    
-                players = [
-                    {
-                        "team_id": team["id"],
-                        "player_sr_uuid": player["id"],
-                        "name": player["name"],
-                        "position": player["position"], # e.g., WR, RB, etc.
-                        "position_alignment": pos["position"].get("name"),  # e.g., LWR, WR, RWR
-                        "rank": player.get("depth") if player.get("depth") is not None else -1,
-                        "jersey": player.get("jersey"),
-                        "year": data["season"]["year"] if "season" in data 
-                            and "year" in data["season"] else None,
-                        "week": data["week"]["sequence"] if "week" in data 
-                            and "sequence" in data["week"] else None
-                    }
-                    for team in data["teams"]
-                    for group in ["offense", "defense", "special_teams"]
-                    for pos in team.get(group, [])
-                    if "position" in pos and "players" in pos["position"]
-                    for player in pos["position"]["players"]
-                ]
-                
-                self.logger.info(f"Found {len(players)} players to process")
-                
-                for player_row in players:
-                    try:
-                        self.insert_player(conn, player_row)
-                        self.logger.info(f"Successfully inserted player {player_row['name']} - {player_row['player_sr_uuid']}")
-                    except Exception as e:
-                        self.logger.error(f"Error inserting player {player_row['name']} - {player_row['player_sr_uuid']} {e}")
-                
-                for player_row in players:
-                    if player_row["rank"] == -1:
-                        self.logger.warning(f"Warning: No rank for player {player_row['name']} ({player_row['player_sr_uuid']}) - using default -1")
-                    
-                    try:
-                        self.insert_depth_chart(conn, player_row)
-                        self.logger.info(f"Successfully inserted {player_row['name']} into refdata.depth_chart_weekly")
-                    except Exception as e:
-                        self.logger.error(f"Error inserting depth chart for player {player_row['name']}: {e}")
-            conn.commit()
-            self.logger.info(f"Successfully finished depth chart ingestion")
+            self.tasks.start(conn, task)
+            if error is not None:
+                self.logger.error(f"Error fetching depth charts for week {week}: {error}")
+                self.fail_week(conn, task, error)
+                raise error
+            self.write_week(conn, task, year, week, team_map, players)
+
+        pipeline = Pipeline("depth_charts")
+        pipeline.stage("fetch", fetch, workers=settings.PIPELINE_FETCH_WORKERS)
+        pipeline.stage("transform", transform, workers=settings.PIPELINE_TRANSFORM_WORKERS)
+        pipeline.stage("write", write, context=self.storage.connection, ordered=True)
+        pipeline.run(enumerate(tasks, start=1))
+        
+        self.tasks.log_summary()
+        self.logger.info(f"Successfully finished depth chart ingestion")
+
+
+    def run_task(self, conn, task):
+        """
+        Ingest the week behind a claimed task (see ingestors.worker).
+
+        Delta mode needs the weeks in order, which workers running side by
+        side cannot promise, so worker tasks always write snapshots.
+        """
+        if self.delta:
+            raise ValueError("Depth chart worker tasks write weekly snapshots; delta mode needs a sequential run")
+        try:
+            self.ingest_week(conn, task, task['season_year'], task['week'], self.get_team_map(conn))
+        except Exception:
+            # already logged and recorded on the task
+            return False
+        return True
+
+
+    def fail_week(self, conn, task, error):
+        conn.rollback()
+        # Rows built in memory for the rolled back week no longer match storage
+        self.depth_charts = None
+        self.tasks.failed(conn, task, error)
 
 if __name__ == "__main__":
     logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.logs')
@@ -117,8 +263,20 @@ if __name__ == "__main__":
     
     logging.info(f"Logging to file: {log_filename}")
     
-    ingestor = DepthChartIngestor()
-    ingestor.run()
+    parser = argparse.ArgumentParser(description='Ingest weekly NFL depth charts')
+    parser.add_argument('--delta', action='store_true',
+                       help='Store only week-to-week changes in refdata.depth_chart_change instead of full weekly snapshots')
+    parser.add_argument('--resume', action='store_true',
+                       help='Skip weeks already committed by an earlier run that did not finish')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    ingestor = DepthChartIngestor(delta=args.delta)
+    ingestor.resume = args.resume
+    if args.profile:
+        ingestor.profiler = StageProfiler(profile_dir(log_filename), top=args.profile_top)
+    with ingestor.profiler or nullcontext():
+        ingestor.run()
     
     logging.info("Depth chart script execution completed")
     print(f"\nScript execution completed. Full logs saved to: {log_filename}")
\ No newline at end of file
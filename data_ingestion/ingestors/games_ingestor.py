@@ -1,7 +1,9 @@
 import os
 import logging
+import argparse
+from contextlib import nullcontext
 from datetime import datetime
-from ..utils.db import safe_connection
+from ..utils.profiling import StageProfiler, add_profile_arguments, profile_dir, profile_stage
 from .base_ingestor import BaseIngestor
 
 class GamesIngestor(BaseIngestor):
@@ -10,160 +12,116 @@ class GamesIngestor(BaseIngestor):
         self.endpoint_template = "games/{year}/REG/schedule.json"
         self.logger = logging.getLogger(__name__)
         
-    def insert_week(self, conn, week_row):
-        query = """
-            insert into refdata.week
-            (
-                week_sr_uuid, 
-                week_season_year, 
-                week_season_type, 
-                week_number,
-                week_start_date, 
-                week_end_date
-             )
-             values(%s, %s, %s, %s, %s, %s)
-             on conflict (week_season_year, week_season_type, week_number) do nothing
-        """
-        
-        with conn.cursor() as cur:
-            cur.execute(
-                query,
-                (
-                    week_row["week_sr_uuid"],
-                    week_row["week_season_year"],
-                    week_row["week_season_type"],
-                    week_row["week_number"],
-                    week_row["week_start_date"],
-                    week_row["week_end_date"]
-                )
-            )
+    @profile_stage("write")
+    def insert_weeks(self, conn, week_rows):
+        self.storage.insert_weeks(conn, week_rows)
+    
+    
+    @profile_stage("resolve")
+    def get_week_ids(self, conn, week_uuids):
+        return self.storage.get_week_ids(conn, week_uuids)
     
     
-    def insert_games(self, conn, game_row):
-        query = """
-            insert into refdata.game
-            (
-                game_week, 
-                game_season_year, 
-                game_home_team_id, 
-                game_away_team_id,
-                game_date, 
-                game_home_score,
-                game_away_score,
-                game_sr_uuid,
-                game_week_id
-             )
-             values(%s, %s, %s, %s, %s, %s, %s, %s, %s)
-             on conflict (game_week, game_season_year, game_home_team_id, game_away_team_id) do nothing
-        """
-        with conn.cursor() as cur:
-            cur.execute(
-                query,
-                (
-                    game_row["game_week"],
-                    game_row["game_season_year"],
-                    game_row["game_home_team_id"],
-                    game_row["game_away_team_id"],
-                    game_row["game_date"],
-                    game_row["game_home_score"],
-                    game_row["game_away_score"],
-                    game_row["game_sr_uuid"],
-                    game_row["game_week_id"]
-                )
-            )
+    @profile_stage("write")
+    def insert_games(self, conn, game_rows):
+        self.storage.insert_games(conn, game_rows)
     
     
     def run(self):
-        with safe_connection() as conn:
+        with self.storage.connection() as conn:
             year = 2024
             url = f"{self.base_url}/{self.endpoint_template.format(year=year)}"
             data = self.fetch_data(url)
             
             if os.getenv("ENVIRONMENT", "DEV").upper() == "DEV":
-                self.save_raw_json(data, "games")
+                self.save_raw_json(data, "games", season=year)
 
-            for week in data["weeks"]:
-                week_number = week["sequence"]
+            with self.stage("transform"):
+                week_rows = []
+                for week in data["weeks"]:
+                    week_number = week["sequence"]
                 
-                game_dates = [
-                    datetime.fromisoformat(g["scheduled"].replace("Z", "+00:00"))
-                    for g in week["games"]
-                    if "scheduled" in g
-                ]
+                    game_dates = [
+                        datetime.fromisoformat(g["scheduled"].replace("Z", "+00:00"))
+                        for g in week["games"]
+                        if "scheduled" in g
+                    ]
                 
-                if not game_dates:
-                    self.logger.warning(f"Warning: No valid game dates found for week {week_number}")
-                    continue
+                    if not game_dates:
+                        self.logger.warning(f"Warning: No valid game dates found for week {week_number}")
+                        continue
         
-                week_row = {
-                    "week_sr_uuid": week["id"],
-                    "week_season_year": year,
-                    "week_season_type": data["type"],
-                    "week_number": week_number,
-                    "week_start_date": min(game_dates),
-                    "week_end_date": max(game_dates)
-                }
-                
-                try:
-                    self.insert_week(conn, week_row)
-                    self.logger.info(f"Successfully inserted week {week_row['week_sr_uuid']}")
-                except Exception as e:
-                    self.logger.error(f"Error inserting week {week_row['week_sr_uuid']}: {e}")
-                    continue
-                        
-                with conn.cursor() as cur:
-                    cur.execute("""
-                                select week_id from refdata.week 
-                                where week_sr_uuid = %s""", (week["id"],))
-                    result = cur.fetchone()
-                    if not result:
+                    week_rows.append({
+                        "week_sr_uuid": week["id"],
+                        "week_season_year": year,
+                        "week_season_type": data["type"],
+                        "week_number": week_number,
+                        "week_start_date": min(game_dates),
+                        "week_end_date": max(game_dates)
+                    })
+            
+            try:
+                self.insert_weeks(conn, week_rows)
+                self.logger.info(f"Successfully inserted {len(week_rows)} weeks")
+            except Exception as e:
+                self.logger.error(f"Error inserting weeks: {e}")
+                conn.rollback()
+                return
+            
+            week_ids = self.get_week_ids(conn, [week_row["week_sr_uuid"] for week_row in week_rows])
+            team_map = self.get_team_map(conn)
+            
+            with self.stage("transform"):
+                games_to_insert = []
+                for week in data["weeks"]:
+                    week_number = week["sequence"]
+                    week_db_id = week_ids.get(week["id"])
+                    if not week_db_id:
                         self.logger.warning(f"Warning: Could not find week ID for week {week_number}")
                         continue
-                    week_db_id = result[0]
                 
-                team_map = {}
-                with conn.cursor() as cur:
-                    cur.execute("select team_sr_uuid, team_id from refdata.team")
-                    for row in cur.fetchall():
-                        team_map[row[0]] = row[1]
-                
-                games_to_insert = []
-                for game in week["games"]:
-                    home_team_id = team_map.get(game["home"].get("id"))
-                    away_team_id = team_map.get(game["away"].get("id"))
+                    for game in week["games"]:
+                        home_team_id = team_map.get(game["home"].get("id"))
+                        away_team_id = team_map.get(game["away"].get("id"))
                     
-                    if not home_team_id or not away_team_id:
-                        self.logger.warning(f"Warning: Missing team ID for game {game.get('id')}")
-                        continue
+                        if not home_team_id or not away_team_id:
+                            self.logger.warning(f"Warning: Missing team ID for game {game.get('id')}")
+                            continue
                     
-                    try:
-                        game_date = datetime.fromisoformat(game["scheduled"].replace("Z", "+00:00"))
-                    except (KeyError, ValueError) as e:
-                        self.logger.error(f"Error parsing game date for game {game.get('id')}: {e}")
-                        continue
+                        try:
+                            game_date = datetime.fromisoformat(game["scheduled"].replace("Z", "+00:00"))
+                        except (KeyError, ValueError) as e:
+                            self.logger.error(f"Error parsing game date for game {game.get('id')}: {e}")
+                            continue
                     
-                    game_row = {
-                        "game_week": week_number,
-                        "game_season_year": year,
-                        "game_home_team_id": home_team_id,
-                        "game_away_team_id": away_team_id,
-                        "game_date": game_date,
-                        "game_home_score": game.get("scoring", {}).get("home_points", 0),
-                        "game_away_score": game.get("scoring", {}).get("away_points", 0),
-                        "game_sr_uuid": game["id"],
-                        "game_week_id": week_db_id
-                    }
+                        game_row = {
+                            "game_week": week_number,
+                            "game_season_year": year,
+                            "game_home_team_id": home_team_id,
+                            "game_away_team_id": away_team_id,
+                            "game_date": game_date,
+                            "game_home_score": game.get("scoring", {}).get("home_points", 0),
+                            "game_away_score": game.get("scoring", {}).get("away_points", 0),
+                            "game_sr_uuid": game["id"],
+                            "game_week_id": week_db_id,
+                            "game_status": game.get("status")
+                        }
                     
-                    games_to_insert.append(game_row)
-                
-                for game_row in games_to_insert:
-                    try:
-                        self.insert_games(conn, game_row)
-                        self.logger.info(f"Successfully inserted game {game_row['game_sr_uuid']}")
-                    except Exception as e:
-                        self.logger.error(f"Error inserting game {game_row['game_sr_uuid']}: {e}")
+                        games_to_insert.append(game_row)
+            
+            try:
+                self.insert_games(conn, games_to_insert)
+                self.logger.info(f"Successfully inserted {len(games_to_insert)} games")
+            except Exception as e:
+                self.logger.error(f"Error inserting games: {e}")
+                conn.rollback()
+                return
                 
             conn.commit()
+            self.publish_change(conn, 'refdata.game', year, None, {
+                team_id for game_row in games_to_insert
+                for team_id in (game_row["game_home_team_id"], game_row["game_away_team_id"])
+            })
             
 if __name__ == "__main__":
     logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.logs')
@@ -181,7 +139,15 @@ if __name__ == "__main__":
     )
     
     logging.info(f"Logging to file: {log_filename}")
+    
+    parser = argparse.ArgumentParser(description='Ingest the NFL regular season schedule')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
     ingestor = GamesIngestor()
-    ingestor.run()
+    if args.profile:
+        ingestor.profiler = StageProfiler(profile_dir(log_filename), top=args.profile_top)
+    with ingestor.profiler or nullcontext():
+        ingestor.run()
     logging.info("Games script execution completed")
     print(f"\nScript execution completed. Full logs saved to: {log_filename}")
\ No newline at end of file
@@ -1,149 +1,163 @@
 import os
 import time
+import argparse
 import datetime
 import logging
 import requests
-from ..utils.db import safe_connection
+from contextlib import nullcontext
+from ..config.settings import settings
+from ..utils.pipeline import Pipeline
+from ..utils.profiling import StageProfiler, add_profile_arguments, profile_dir, profile_stage
 from .base_ingestor import BaseIngestor
 
+PRACTICE_STATUS_MAP = {
+    "Did Not Participate In Practice": "DNP",
+    "Limited Participation In Practice": "Limited",
+    "Full Participation In Practice": "Full"
+}
+
 class InjuriesIngestor(BaseIngestor):
     def __init__(self):
         super().__init__()
         self.endpoint_template = "seasons/{year}/REG/{week:02d}/injuries.json"
         self.logger = logging.getLogger(__name__)
         
-    def insert_injury(self, conn, inj):
-        query = """
-            insert into refdata.injury_weekly
-            (
-                inj_player_id, 
-                inj_team_id, 
-                inj_season_year, 
-                inj_week_number,
-                inj_status, 
-                inj_status_date,
-                inj_primary_injury,
-                inj_week_id,
-                inj_practice_participation
-             )
-             values(%s, %s, %s, %s, %s, %s, %s, %s, %s)
-             on conflict (inj_player_id, inj_season_year, inj_week_number) do nothing
+    @profile_stage("write")
+    def insert_injuries(self, conn, injuries):
+        self.storage.insert_injuries(conn, injuries)
+    
+    
+    def fetch_week(self, year, week):
+        while True:
+            try:
+                url = f"{self.base_url}{self.endpoint_template.format(year=year, week = week)}"
+                data = self.fetch_data(url)
+                break
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 429:
+                    print("Rate limit hit, sleeping...")
+                    time.sleep(5)
+        if os.getenv("ENVIRONMENT", "DEV").upper() == "DEV":
+            self.save_raw_json(data, "injuries", season=year, week=week)
+        return data
+    
+    
+    @profile_stage("transform")
+    def injury_rows(self, data, year, week, team_map):
+        """
+        The week's players and injury rows, read without touching the database.
+        
+        Injury rows hold the player's Sportradar UUID in inj_player_id and
+        have no inj_week_id yet; write_week fills both in.
         """
+        teams = []
+        for team in data["teams"]:
+            team_db_id = team_map.get(team.get("id"))
+            if team_db_id is None:
+                self.logger.error(f"Error: team not found in DB: SR UUID={team['id']}")
+                continue
+            teams.append((team, team_db_id))
+        
+        players = [
+            {
+                "name": player["name"],
+                "position": player["position"],
+                "player_sr_uuid": player["id"],
+                "jersey": player.get("jersey"),
+                "team_id": team.get("id")
+            }
+            for team, _ in teams
+            for player in team["players"]
+        ]
+        
+        injuries = [
+            {
+                "inj_player_id": player.get("id"),
+                "inj_team_id": team_db_id,
+                "inj_season_year": year,
+                "inj_week": week,
+                "inj_status": injury.get("status", "Healthy"),
+                "inj_status_date": datetime.datetime.fromisoformat(injury.get("status_date", "1970-01-01T00:00:00Z").replace("Z", "+00:00")),
+                "inj_primary_injury": injury.get("primary"),
+                "inj_practice_participation": PRACTICE_STATUS_MAP.get(injury["practice"]["status"], "Unknown")
+            }
+            for team, team_db_id in teams
+            for player in team["players"]
+            for injury in player.get("injuries", [])
+            if "practice" in injury and "status" in injury["practice"] and injury["practice"]["status"] in PRACTICE_STATUS_MAP
+        ]
         
-        with conn.cursor() as cur:
-            cur.execute(
-                query,
-                (
-                    inj["inj_player_id"],
-                    inj["inj_team_id"],
-                    inj["inj_season_year"],
-                    inj["inj_week"],
-                    inj["inj_status"],
-                    inj["inj_status_date"],
-                    inj["inj_primary_injury"],
-                    inj["inj_week_id"],
-                    inj["inj_practice_participation"]
-                )
-            )
+        return {
+            "week_uuid": data["week"].get("id"),
+            "team_ids": [team_db_id for _, team_db_id in teams],
+            "players": players,
+            "injuries": injuries
+        }
     
     
-    def run(self):
-        with safe_connection() as conn:
-            year = 2024
-            
-            for i in range(1, 19):
-                while True:
-                    try:
-                        url = f"{self.base_url}{self.endpoint_template.format(year=year, week = i)}"
-                        data = self.fetch_data(url)
-                        break
-                    except requests.exceptions.HTTPError as e:
-                        if e.response.status_code == 429:
-                            print("Rate limit hit, sleeping...")
-                            time.sleep(5)
-                if os.getenv("ENVIRONMENT", "DEV").upper() == "DEV":
-                        self.save_raw_json(data, "injuries")
-                
-                for team in data["teams"]:
-                    with conn.cursor() as cur:
-                        cur.execute("""
-                                    select week_id from refdata.week 
-                                    where week_sr_uuid = %s""", (data["week"].get("id"),))
-                        week_result = cur.fetchone()
-
-                        if week_result is not None:
-                            inj_week_db_id = week_result[0]
-                        else:
-                            self.logger.error(f"Error: week not found in DB: SR UUID={data['week'].get('id')}")
-                            continue
-                        
-                        status_map = {
-                            "Did Not Participate In Practice": "DNP",
-                            "Limited Participation In Practice": "Limited",
-                            "Full Participation In Practice": "Full"
-                        }
-                        
-                        team_db_id = None
-                        cur.execute("""
-                            select team_id from refdata.team 
-                            where team_sr_uuid = %s""", (team.get("id"),))
-                        result = cur.fetchone()
-                        if result is not None:
-                            team_db_id = result[0]
-                        else:
-                            self.logger.error(f"Error: team not found in DB: SR UUID={team['id']}")
-                            continue
-                    
-                    player_db_id = None
+    def write_week(self, conn, year, week, rows, team_map):
+        week_uuid = rows["week_uuid"]
+        inj_week_db_id = self.storage.get_week_ids(conn, [week_uuid]).get(week_uuid)
 
-                    for player in team["players"]:
-                        with conn.cursor() as cur:
-                            cur.execute("""
-                                select player_id from refdata.player 
-                                where player_sr_uuid = %s""", (player.get("id"),))
-                            result = cur.fetchone()
-                            
-                            if result is not None:
-                                player_db_id = result[0]
-                            else:
-                                player_row = {
-                                    "name": player["name"],
-                                    "position": player["position"],
-                                    "player_sr_uuid": player["id"],
-                                    "jersey": player["jersey"],
-                                    "team_id": team.get("id")
-                                }
-                                
-                                try:
-                                    player_db_id = self.insert_player(conn, player_row)
-                                    self.logger.info(f"Successfully inserted player {player['name']} with ID {player_db_id}")
-                                except Exception as e:
-                                     self.logger.error(f"Error inserting player {player['id']}: {e}")
-                        
-                        if player_db_id is not None:
-                            injuries = [
-                                {
-                                    "inj_player_id": player_db_id,
-                                    "inj_team_id": team_db_id,
-                                    "inj_season_year": year,
-                                    "inj_week": i,
-                                    "inj_status": injury.get("status", "Healthy"),
-                                    "inj_status_date": datetime.datetime.fromisoformat(injury.get("status_date", "1970-01-01T00:00:00Z").replace("Z", "+00:00")),
-                                    "inj_primary_injury": injury.get("primary"),
-                                    "inj_week_id": inj_week_db_id,
-                                    "inj_practice_participation": status_map.get(injury["practice"]["status"], "Unknown")
-                                }
-                                for injury in player.get("injuries", [])
-                                if "practice" in injury and "status" in injury["practice"] and injury["practice"]["status"] in status_map
-                            ]
-                            
-                            for inj in injuries:
-                                try:
-                                    self.insert_injury(conn, inj)
-                                    self.logger.info(f"Successfully inserted injury for player {player['name']} (ID: {player_db_id})")
-                                except Exception as e:
-                                    self.logger.error(f"Error inserting injury for player {player['name']} (ID: {player_db_id}): {e}")
-                conn.commit()
+        if inj_week_db_id is None:
+            self.logger.error(f"Error: week not found in DB: SR UUID={week_uuid}")
+            return
+        
+        player_ids = self.get_player_ids(conn, {player["player_sr_uuid"] for player in rows["players"]})
+        missing_players = [player for player in rows["players"] if player["player_sr_uuid"] not in player_ids]
+        
+        if missing_players:
+            try:
+                self.insert_players(conn, missing_players, team_map)
+                self.logger.info(f"Successfully inserted {len(missing_players)} players")
+            except Exception as e:
+                self.logger.error(f"Error inserting players for week {week}: {e}")
+                raise
+            player_ids.update(self.get_player_ids(conn, [p["player_sr_uuid"] for p in missing_players]))
+        
+        injuries = [
+            dict(injury, inj_player_id=player_ids[injury["inj_player_id"]], inj_week_id=inj_week_db_id)
+            for injury in rows["injuries"]
+            if injury["inj_player_id"] in player_ids
+        ]
+        
+        try:
+            self.insert_injuries(conn, injuries)
+            self.logger.info(f"Successfully inserted {len(injuries)} injuries for week {week}")
+        except Exception as e:
+            self.logger.error(f"Error inserting injuries for week {week}: {e}")
+            raise
+        conn.commit()
+        self.publish_change(conn, 'refdata.injury_weekly', year, week, rows["team_ids"])
+    
+    
+    def run(self):
+        """
+        Ingest the season's injury reports through a fetch, transform and write pipeline.
+        
+        Later weeks are fetched and transformed while earlier ones are
+        written, on a connection of the writer's own (see utils.pipeline).
+        """
+        year = 2024
+        with self.storage.connection() as conn:
+            team_map = self.get_team_map(conn)
+        
+        def fetch(week):
+            return week, self.fetch_week(year, week)
+        
+        def transform(item):
+            week, data = item
+            return week, self.injury_rows(data, year, week, team_map)
+        
+        def write(conn, item):
+            week, rows = item
+            self.write_week(conn, year, week, rows, team_map)
+        
+        pipeline = Pipeline("injuries")
+        pipeline.stage("fetch", fetch, workers=settings.PIPELINE_FETCH_WORKERS)
+        pipeline.stage("transform", transform, workers=settings.PIPELINE_TRANSFORM_WORKERS)
+        pipeline.stage("write", write, context=self.storage.connection)
+        pipeline.run(range(1, 19))
             
 if __name__ == "__main__":
     logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.logs')
@@ -161,8 +175,16 @@ if __name__ == "__main__":
     )
     
     logging.info(f"Logging to file: {log_filename}")
+    
+    parser = argparse.ArgumentParser(description='Ingest weekly NFL injury reports')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
     ingestor = InjuriesIngestor()
-    ingestor.run()
+    if args.profile:
+        ingestor.profiler = StageProfiler(profile_dir(log_filename), top=args.profile_top)
+    with ingestor.profiler or nullcontext():
+        ingestor.run()
     
     logging.info("Depth chart script execution completed")
     print(f"\nScript execution completed. Full logs saved to: {log_filename}")
\ No newline at end of file
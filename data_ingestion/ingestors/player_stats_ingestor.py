@@ -3,633 +3,757 @@ import datetime
 import logging
 import os
 import time
+from contextlib import nullcontext
 from typing import Any, Dict, List, Optional
 import requests
-from ..utils.db import safe_connection
+from ..analytics.defense_trends import DefenseTrends
+from ..config.settings import settings
+from ..utils.pipeline import Pipeline
+from ..utils.profiling import StageProfiler, add_profile_arguments, profile_dir, profile_stage
+from ..utils.task_queue import TaskQueue, make_task
 from ..utils.time import get_current_nfl_season_year
 from .base_ingestor import BaseIngestor
 
+STAT_CONFIGS = {
+    'passing': {
+        'table_name': 'player_stats_weekly_passing',
+        'response_key': 'passing',
+        'opp_team_column': 'psw_pass_opp_team_id',
+        'key_columns': ['psw_pass_player_id', 'psw_pass_team_id', 
+                        'psw_pass_game_id', 'psw_pass_season_year', 
+                        'psw_pass_week_number'],
+        'data_columns': [
+            'psw_pass_attempts', 'psw_pass_completions', 'psw_pass_yards', 
+            'psw_pass_avg_yards', 'psw_pass_air_yards', 'psw_pass_longest', 
+            'psw_pass_longest_touchdown', 'psw_pass_touchdowns', 
+            'psw_pass_interceptions', 'psw_pass_rz_attempts', 
+            'psw_pass_pick_sixes', 'psw_pass_throw_aways', 
+            'psw_pass_poor_throws', 'psw_pass_on_target_throws', 
+            'psw_pass_defended_passes', 'psw_pass_batted_passes',
+            'psw_pass_dropped_passes', 'psw_pass_spikes',
+            'psw_pass_blitzes', 'psw_pass_hurries',
+            'psw_pass_knockdowns', 'psw_pass_avg_pocket_time',
+            'psw_pass_net_yards', 'psw_pass_sacks',
+            'psw_pass_sack_yards'
+        ],
+        'field_map': {
+            'attempts': 'psw_pass_attempts',
+            'completions': 'psw_pass_completions',
+            'yards': 'psw_pass_yards',
+            'avg_yards': 'psw_pass_avg_yards',
+            'air_yards': 'psw_pass_air_yards',
+            'longest': 'psw_pass_longest',
+            'longest_touchdown': 'psw_pass_longest_touchdown',
+            'touchdowns': 'psw_pass_touchdowns',
+            'interceptions': 'psw_pass_interceptions',
+            'redzone_attempts': 'psw_pass_rz_attempts',
+            'int_touchdowns': 'psw_pass_pick_sixes',
+            'throw_aways': 'psw_pass_throw_aways',
+            'poor_throws': 'psw_pass_poor_throws',
+            'on_target_throws': 'psw_pass_on_target_throws',
+            'defended_passes': 'psw_pass_defended_passes',
+            'batted_passes': 'psw_pass_batted_passes',
+            'dropped_passes': 'psw_pass_dropped_passes',
+            'spikes': 'psw_pass_spikes',
+            'blitzes': 'psw_pass_blitzes',
+            'hurries': 'psw_pass_hurries',
+            'knockdowns': 'psw_pass_knockdowns',
+            'avg_pocket_time': 'psw_pass_avg_pocket_time',
+            'net_yards': 'psw_pass_net_yards',
+            'sacks': 'psw_pass_sacks',
+            'sack_yards': 'psw_pass_sack_yards'
+        }
+    },
+    'rushing': {
+        'table_name': 'player_stats_weekly_rushing',
+        'response_key': 'rushing',
+        'opp_team_column': 'psw_rush_opp_team_id',
+        'key_columns': ['psw_rush_player_id', 'psw_rush_team_id', 
+                        'psw_rush_game_id', 'psw_rush_season_year', 
+                        'psw_rush_week_number'],
+        'data_columns': [
+            'psw_rush_attempts', 'psw_rush_yards', 'psw_rush_avg_yards', 
+            'psw_rush_touchdowns', 'psw_rush_first_downs', 'psw_rush_longest',
+            'psw_rush_rz_attempts', 'psw_rush_tfl', 'psw_rush_tfl_yards',
+            'psw_rush_broken_tackles', 'psw_rush_yards_after_contact',
+            'psw_rush_kneel_downs', 'psw_rush_scrambles', 'psw_rush_fumbles',
+            'psw_rush_fumbles_lost'
+        ],
+        'field_map': {
+            'attempts': 'psw_rush_attempts',
+            'yards': 'psw_rush_yards',
+            'avg_yards': 'psw_rush_avg_yards',
+            'touchdowns': 'psw_rush_touchdowns',
+            'first_downs': 'psw_rush_first_downs',
+            'longest': 'psw_rush_longest',
+            'redzone_attempts': 'psw_rush_rz_attempts',
+            'tlost': 'psw_rush_tfl',
+            'tlost_yards': 'psw_rush_tfl_yards',
+            'broken_tackles': 'psw_rush_broken_tackles',
+            'yards_after_contact': 'psw_rush_yards_after_contact',
+            'kneel_downs': 'psw_rush_kneel_downs',
+            'scrambles': 'psw_rush_scrambles',
+            'fumbles': 'psw_rush_fumbles',
+            'lost_fumbles': 'psw_rush_fumbles_lost'
+        }
+    },
+     'receiving': {
+        'table_name': 'player_stats_weekly_receiving',
+        'response_key': 'receiving',
+        'opp_team_column': 'psw_rec_opp_team_id',
+        'key_columns': ['psw_rec_player_id', 'psw_rec_team_id', 'psw_rec_game_id', 'psw_rec_season_year', 'psw_rec_week_number'],
+        'data_columns': [
+            'psw_rec_receptions', 'psw_rec_yards', 'psw_rec_avg_yards',
+            'psw_rec_touchdowns', 'psw_rec_first_downs', 'psw_rec_longest',
+            'psw_rec_longest_touchdown', 'psw_rec_targets', 'psw_rec_rz_targets',
+            'psw_rec_tfl_yards', 'psw_rec_broken_tackles', 'psw_rec_yards_after_contact',
+            'psw_rec_yards_after_catch', 'psw_rec_air_yards', 'psw_rec_dropped_passes',
+            'psw_rec_catchable_passes'
+        ],
+        'field_map': {
+            'receptions': 'psw_rec_receptions',
+            'yards': 'psw_rec_yards',
+            'avg_yards': 'psw_rec_avg_yards',
+            'touchdowns': 'psw_rec_touchdowns',
+            'first_downs': 'psw_rec_first_downs',
+            'longest': 'psw_rec_longest',
+            'longest_touchdown': 'psw_rec_longest_touchdown',
+            'targets': 'psw_rec_targets',
+            'redzone_targets': 'psw_rec_rz_targets',
+            'broken_tackles': 'psw_rec_broken_tackles',
+            'yards_after_contact': 'psw_rec_yards_after_contact',
+            'yards_after_catch': 'psw_rec_yards_after_catch',
+            'air_yards': 'psw_rec_air_yards',
+            'dropped_passes': 'psw_rec_dropped_passes',
+            'catchable_passes': 'psw_rec_catchable_passes'
+        }
+    },
+    'punting': {
+        'table_name': 'player_stats_weekly_punting',
+        'response_key': 'punts',
+        'opp_team_column': 'psw_punt_opp_team_id',
+        'key_columns': ['psw_punt_player_id', 'psw_punt_team_id', 'psw_punt_game_id', 'psw_punt_season_year', 'psw_punt_week_number'],
+        'data_columns': [
+            'psw_punt_attempts', 'psw_punt_yards', 'psw_punt_avg_yards',
+            'psw_punt_net_yards', 'psw_punt_avg_net_yards', 'psw_punt_longest',
+            'psw_punt_hangtime', 'psw_punt_avg_hangtime', 'psw_punt_blocked',
+            'psw_punt_touchbacks', 'psw_punt_inside_20', 'psw_punt_return_yards'
+        ],
+        'field_map': {
+            'attempts': 'psw_punt_attempts',
+            'yards': 'psw_punt_yards',
+            'avg_yards': 'psw_punt_avg_yards',
+            'net_yards': 'psw_punt_net_yards',
+            'avg_net_yards': 'psw_punt_avg_net_yards',
+            'longest': 'psw_punt_longest',
+            'hang_time': 'psw_punt_hangtime',
+            'avg_hang_time': 'psw_punt_avg_hangtime',
+            'blocked': 'psw_punt_blocked',
+            'touchbacks': 'psw_punt_touchbacks',
+            'inside_20': 'psw_punt_inside_20',
+            'return_yards': 'psw_punt_return_yards'
+        }
+    },
+    'punt_returns': {
+        'table_name': 'player_stats_weekly_punt_returns',
+        'response_key': 'punt_returns',
+        'opp_team_column': 'psw_punt_ret_opp_team_id',
+        'key_columns': ['psw_punt_ret_player_id', 'psw_punt_ret_team_id', 'psw_punt_ret_game_id', 'psw_punt_ret_season_year', 'psw_punt_ret_week_number'],
+        'data_columns': [
+            'psw_punt_ret_attempts', 'psw_punt_ret_yards', 'psw_punt_ret_avg_yards',
+            'psw_punt_ret_touchdowns', 'psw_punt_ret_longest', 'psw_punt_ret_fair_catches'
+        ],
+        'field_map': {
+            'number': 'psw_punt_ret_attempts',
+            'yards': 'psw_punt_ret_yards',
+            'avg_yards': 'psw_punt_ret_avg_yards',
+            'touchdowns': 'psw_punt_ret_touchdowns',
+            'longest': 'psw_punt_ret_longest',
+            'faircatches': 'psw_punt_ret_fair_catches'
+        }
+    },
+    'field_goals': {
+        'table_name': 'player_stats_weekly_kicking',
+        'response_key': 'field_goals',
+        'opp_team_column': 'psw_kick_opp_team_id',
+        'key_columns': ['psw_kick_player_id', 'psw_kick_team_id', 'psw_kick_game_id', 'psw_kick_season_year', 'psw_kick_week_number'],
+        'data_columns': [
+            'psw_kick_fg_attempts', 'psw_kick_fg_made', 'psw_kick_fg_block',
+            'psw_kick_fg_yards', 'psw_kick_fg_avg_yards', 'psw_kick_fg_longest',
+            'psw_kick_fg_net_attempts', 'psw_kick_fg_missed', 'psw_kick_fg_pct',
+            'psw_kick_fg_attempts_19', 'psw_kick_fg_attempts_20_to_29', 'psw_kick_fg_attempts_30_to_39',
+            'psw_kick_fg_attempts_40_to_49', 'psw_kick_fg_attempts_50_or_more',
+            'psw_kick_fg_made_19', 'psw_kick_fg_made_20_to_29', 'psw_kick_fg_made_30_to_39',
+            'psw_kick_fg_made_40_to_49', 'psw_kick_fg_made_50_or_more'
+        ],
+        'field_map': {
+            'attempts': 'psw_kick_fg_attempts',
+            'made': 'psw_kick_fg_made',
+            'blocked': 'psw_kick_fg_block',
+            'yards': 'psw_kick_fg_yards',
+            'avg_yards': 'psw_kick_fg_avg_yards',
+            'longest': 'psw_kick_fg_longest',
+            'net_attempts': 'psw_kick_fg_net_attempts',
+            'missed': 'psw_kick_fg_missed',
+            'pct': 'psw_kick_fg_pct',
+            'attempts_1_19': 'psw_kick_fg_attempts_19',
+            'attempts_20_29': 'psw_kick_fg_attempts_20_to_29',
+            'attempts_30_39': 'psw_kick_fg_attempts_30_to_39',
+            'attempts_40_49': 'psw_kick_fg_attempts_40_to_49',
+            'attempts_50_plus': 'psw_kick_fg_attempts_50_or_more',
+            'made_1_19': 'psw_kick_fg_made_19',
+            'made_20_29': 'psw_kick_fg_made_20_to_29',
+            'made_30_39': 'psw_kick_fg_made_30_to_39',
+            'made_40_49': 'psw_kick_fg_made_40_to_49',
+            'made_50_plus': 'psw_kick_fg_made_50_or_more'
+        }
+    },
+    'extra_points': {
+        'table_name': 'player_stats_weekly_kicking',
+        'response_key': 'extra_points',
+        'opp_team_column': 'psw_kick_opp_team_id',
+        'key_columns': ['psw_kick_player_id', 'psw_kick_team_id', 'psw_kick_game_id', 'psw_kick_season_year', 'psw_kick_week_number'],
+        'data_columns': [
+            'psw_kick_xp_attempts', 'psw_kick_xp_made', 'psw_kick_xp_blocked',
+            'psw_kick_xp_missed', 'psw_kick_xp_pct'
+        ],
+        'field_map': {
+            'attempts': 'psw_kick_xp_attempts',
+            'made': 'psw_kick_xp_made',
+            'blocked': 'psw_kick_xp_blocked',
+            'missed': 'psw_kick_xp_missed',
+            'pct': 'psw_kick_xp_pct'
+        }
+    },
+    'kickoffs': {
+        'table_name': 'player_stats_weekly_kickoffs',
+        'response_key': 'kickoffs',
+        'opp_team_column': 'psw_kickoff_opp_team_id',
+        'key_columns': ['psw_kickoff_player_id', 'psw_kickoff_team_id', 'psw_kickoff_game_id', 'psw_kickoff_season_year', 'psw_kickoff_week_number'],
+        'data_columns': [
+            'psw_kickoff_attempts', 'psw_kickoff_yards', 'psw_kickoff_avg_yards',
+            'psw_kickoff_touchbacks', 'psw_kickoff_onside_attempts', 'psw_kickoff_onside_made',
+            'psw_kickoff_out_of_bounds'
+        ],
+        'field_map': {
+            'number': 'psw_kickoff_attempts',
+            'yards': 'psw_kickoff_yards',
+            'avg_yards': 'psw_kickoff_avg_yards',
+            'touchbacks': 'psw_kickoff_touchbacks',
+            'onside_attempts': 'psw_kickoff_onside_attempts',
+            'onside_successes': 'psw_kickoff_onside_made',
+            'out_of_bounds': 'psw_kickoff_out_of_bounds'
+        }
+    },
+    'kick_returns': {
+        'table_name': 'player_stats_weekly_kick_returns',
+        'response_key': 'kick_returns',
+        'opp_team_column': 'psw_kick_ret_opp_team_id',
+        'key_columns': ['psw_kick_ret_player_id', 'psw_kick_ret_team_id', 'psw_kick_ret_game_id', 'psw_kick_ret_season_year', 'psw_kick_ret_week_number'],
+        'data_columns': [
+            'psw_kick_ret_attempts', 'psw_kick_ret_yards', 'psw_kick_ret_avg_yards',
+            'psw_kick_ret_touchdowns', 'psw_kick_ret_longest', 'psw_kick_ret_fair_catches'
+        ],
+        'field_map': {
+            'number': 'psw_kick_ret_attempts',
+            'yards': 'psw_kick_ret_yards',
+            'avg_yards': 'psw_kick_ret_avg_yards',
+            'touchdowns': 'psw_kick_ret_touchdowns',
+            'longest': 'psw_kick_ret_longest',
+            'faircatches': 'psw_kick_ret_fair_catches'
+        }
+    },
+    'defense': {
+        'table_name': 'player_stats_weekly_defense',
+        'response_key': 'defense',
+        'opp_team_column': 'psw_def_opp_team_id',
+        'key_columns': ['psw_def_player_id', 'psw_def_team_id', 'psw_def_game_id', 'psw_def_season_year', 'psw_def_week_number'],
+        'data_columns': [
+            'psw_def_tackles', 'psw_def_assists', 'psw_def_combined', 
+            'psw_def_sacks', 'psw_def_sack_yards', 'psw_def_interceptions',
+            'psw_def_passes_defended', 'psw_def_forced_fumbles', 'psw_def_fumble_recoveries',
+            'psw_def_qb_hits', 'psw_def_tloss', 'psw_def_tloss_yards',
+            'psw_def_safeties', 'psw_def_sp_tackles', 'psw_def_sp_assists',
+            'psw_def_sp_forced_fumbles', 'psw_def_sp_fumble_recoveries', 'psw_def_sp_blocks',
+            'psw_def_misc_tackles', 'psw_def_misc_assists', 'psw_def_misc_forced_fumbles',
+            'psw_def_misc_fumble_recoveries', 'psw_def_sp_own_fumble_recoveries', 'psw_def_sp_opp_fumble_recoveries',
+            'psw_def_def_targets', 'psw_def_def_comps', 'psw_def_blitzes',
+            'psw_def_hurries', 'psw_def_knockdowns', 'psw_def_missed_tackles',
+            'psw_def_batted_passes'
+        ],
+        'field_map': {
+            'tackles': 'psw_def_tackles',
+            'assists': 'psw_def_assists',
+            'combined': 'psw_def_combined',
+            'sacks': 'psw_def_sacks',
+            'sack_yards': 'psw_def_sack_yards',
+            'interceptions': 'psw_def_interceptions',
+            'passes_defended': 'psw_def_passes_defended',
+            'forced_fumbles': 'psw_def_forced_fumbles',
+            'fumble_recoveries': 'psw_def_fumble_recoveries',
+            'qb_hits': 'psw_def_qb_hits',
+            'tloss': 'psw_def_tloss',
+            'tloss_yards': 'psw_def_tloss_yards',
+            'safeties': 'psw_def_safeties',
+            'sp_tackles': 'psw_def_sp_tackles',
+            'sp_assists': 'psw_def_sp_assists',
+            'sp_forced_fumbles': 'psw_def_sp_forced_fumbles',
+            'sp_fumble_recoveries': 'psw_def_sp_fumble_recoveries',
+            'sp_blocks': 'psw_def_sp_blocks',
+            'misc_tackles': 'psw_def_misc_tackles',
+            'misc_assists': 'psw_def_misc_assists',
+            'misc_forced_fumbles': 'psw_def_misc_forced_fumbles',
+            'misc_fumble_recoveries': 'psw_def_misc_fumble_recoveries',
+            'sp_own_fumble_recoveries': 'psw_def_sp_own_fumble_recoveries',
+            'sp_opp_fumble_recoveries': 'psw_def_sp_opp_fumble_recoveries',
+            'def_targets': 'psw_def_def_targets',
+            'def_comps': 'psw_def_def_comps',
+            'blitzes': 'psw_def_blitzes',
+            'hurries': 'psw_def_hurries',
+            'knockdowns': 'psw_def_knockdowns',
+            'missed_tackles': 'psw_def_missed_tackles',
+            'batted_passes': 'psw_def_batted_passes'
+        }
+    },
+    'fumbles': {
+        'table_name': 'player_stats_weekly_fumbles',
+        'response_key': 'fumbles',
+        'opp_team_column': 'psw_fum_opp_team_id',
+        'key_columns': ['psw_fum_player_id', 'psw_fum_team_id', 'psw_fum_game_id', 'psw_fum_season_year', 'psw_fum_week_number'],
+        'data_columns': [
+            'psw_fum_fumbles', 'psw_fum_lost_fumbles', 'psw_fum_own_rec',
+            'psw_fum_own_rec_yards', 'psw_fum_opp_rec', 'psw_fum_opp_rec_yards',
+            'psw_fum_forced_fumbles'
+        ],
+        'field_map': {
+            'fumbles': 'psw_fum_fumbles',
+            'lost_fumbles': 'psw_fum_lost_fumbles',
+            'own_rec': 'psw_fum_own_rec',
+            'own_rec_yards': 'psw_fum_own_rec_yards',
+            'opp_rec': 'psw_fum_opp_rec',
+            'opp_rec_yards': 'psw_fum_opp_rec_yards',
+            'forced_fumbles': 'psw_fum_forced_fumbles'
+        }
+    },
+}
+
+RUSHING_FUMBLE_COLUMNS = ('psw_rush_fumbles', 'psw_rush_fumbles_lost')
+
+# Team-level totals from the same statistics payload: column -> path within a team's statistics
+TEAM_STAT_FIELDS = {
+    'tsg_play_count': ('summary', 'play_count'),
+    'tsg_total_yards': ('summary', 'total_yards'),
+    'tsg_avg_gain': ('summary', 'avg_gain'),
+    'tsg_rush_plays': ('summary', 'rush_plays'),
+    'tsg_turnovers': ('summary', 'turnovers'),
+    'tsg_fumbles': ('summary', 'fumbles'),
+    'tsg_lost_fumbles': ('summary', 'lost_fumbles'),
+    'tsg_penalties': ('summary', 'penalties'),
+    'tsg_penalty_yards': ('summary', 'penalty_yards'),
+    'tsg_return_yards': ('summary', 'return_yards'),
+    'tsg_safeties': ('summary', 'safeties'),
+    'tsg_touchdowns': ('touchdowns', 'total'),
+    'tsg_first_downs': ('first_downs', 'total'),
+    'tsg_first_downs_pass': ('first_downs', 'pass'),
+    'tsg_first_downs_rush': ('first_downs', 'rush'),
+    'tsg_first_downs_penalty': ('first_downs', 'penalty'),
+    'tsg_third_down_attempts': ('efficiency', 'thirddown', 'attempts'),
+    'tsg_third_down_successes': ('efficiency', 'thirddown', 'successes'),
+    'tsg_fourth_down_attempts': ('efficiency', 'fourthdown', 'attempts'),
+    'tsg_fourth_down_successes': ('efficiency', 'fourthdown', 'successes'),
+    'tsg_redzone_attempts': ('efficiency', 'redzone', 'attempts'),
+    'tsg_redzone_successes': ('efficiency', 'redzone', 'successes'),
+    'tsg_pass_attempts': ('passing', 'totals', 'attempts'),
+    'tsg_pass_completions': ('passing', 'totals', 'completions'),
+    'tsg_pass_yards': ('passing', 'totals', 'yards'),
+    'tsg_pass_net_yards': ('passing', 'totals', 'net_yards'),
+    'tsg_pass_touchdowns': ('passing', 'totals', 'touchdowns'),
+    'tsg_pass_interceptions': ('passing', 'totals', 'interceptions'),
+    'tsg_pass_sacks': ('passing', 'totals', 'sacks'),
+    'tsg_pass_sack_yards': ('passing', 'totals', 'sack_yards'),
+    'tsg_rush_attempts': ('rushing', 'totals', 'attempts'),
+    'tsg_rush_yards': ('rushing', 'totals', 'yards'),
+    'tsg_rush_avg_yards': ('rushing', 'totals', 'avg_yards'),
+    'tsg_rush_touchdowns': ('rushing', 'totals', 'touchdowns'),
+    'tsg_def_tackles': ('defense', 'totals', 'tackles'),
+    'tsg_def_sacks': ('defense', 'totals', 'sacks'),
+    'tsg_def_interceptions': ('defense', 'totals', 'interceptions'),
+    'tsg_def_forced_fumbles': ('defense', 'totals', 'forced_fumbles'),
+    'tsg_def_fumble_recoveries': ('defense', 'totals', 'fumble_recoveries'),
+    'tsg_def_passes_defended': ('defense', 'totals', 'passes_defended'),
+    'tsg_def_qb_hits': ('defense', 'totals', 'qb_hits'),
+    'tsg_def_tloss': ('defense', 'totals', 'tloss'),
+}
+
+TEAM_STATS_TABLE = {
+    'table_name': 'team_stats_game',
+    'opp_team_column': 'tsg_opp_team_id',
+    'key_columns': ['tsg_team_id', 'tsg_game_id', 'tsg_season_year', 'tsg_week_number'],
+    'data_columns': ['tsg_points', 'tsg_possession_seconds'] + list(TEAM_STAT_FIELDS),
+}
+
+
+def key_column(config: Dict[str, Any], suffix: str) -> Optional[str]:
+    return next((col for col in config['key_columns'] if col.endswith(suffix)), None)
+
+
+def stored_data_columns(config: Dict[str, Any]) -> List[str]:
+    """Non-key columns written for a stat type: the opposing defense plus the stat columns."""
+    return [config['opp_team_column']] + config['data_columns']
+
+
+def stat_table_configs(stat_types: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Group stat types by target table, merging their data columns.
+
+    Sections that share a table (field_goals and extra_points both land in
+    player_stats_weekly_kicking) become one config, so each player's row
+    is written once with the fields of every section. Only the given stat
+    types contribute columns, so a partial run leaves the others alone.
+    """
+    tables = {}
+    for stat_type in stat_types or list(STAT_CONFIGS):
+        config = STAT_CONFIGS[stat_type]
+        table = tables.get(config['table_name'])
+        if table is None:
+            tables[config['table_name']] = {
+                'table_name': config['table_name'],
+                'stat_types': [stat_type],
+                'opp_team_column': config['opp_team_column'],
+                'key_columns': config['key_columns'],
+                'data_columns': list(config['data_columns'])
+            }
+            continue
+
+        if table['key_columns'] != config['key_columns']:
+            raise ValueError(f"{stat_type} key columns differ from other stat types in {config['table_name']}")
+        table['stat_types'].append(stat_type)
+        table['data_columns'] += [col for col in config['data_columns'] if col not in table['data_columns']]
+    return tables
+
+
+STAT_TABLES = stat_table_configs()
+
+
+def merge_section_rows(table_config: Dict[str, Any], rows_by_type: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Combine one table's rows from each of its sections into a single row per key."""
+    merged = {}
+    for stat_type in table_config['stat_types']:
+        for row in rows_by_type.get(stat_type) or []:
+            key = tuple(row.get(col) for col in table_config['key_columns'])
+            if key in merged:
+                merged[key].update((col, value) for col, value in row.items() if col != '_original_player_data')
+            else:
+                merged[key] = dict(row)
+    return list(merged.values())
+
+
+def opponent_team_ids(
+    statistics: Dict[str, Any],
+    team_map: Dict[str, int],
+    game_teams: Optional[tuple] = None
+) -> Dict[str, Optional[int]]:
+    """
+    Map 'home' and 'away' to the opposing team's id.
+
+    game_teams is the (home, away) pair from refdata.game when known;
+    otherwise the teams are taken from the statistics payload itself.
+    """
+    if game_teams:
+        home_team_id, away_team_id = game_teams
+    else:
+        home_team_id = team_map.get(statistics.get('home', {}).get('id'))
+        away_team_id = team_map.get(statistics.get('away', {}).get('id'))
+    return {'home': away_team_id, 'away': home_team_id}
+
+
+def transform_stat_items(
+    data: List[Dict[str, Any]],
+    stat_type: str,
+    team_map: Dict[str, int],
+    game_id: Optional[int],
+    season_year: int,
+    week: int,
+    opp_team_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Map one statistics section's player entries onto table columns.
+
+    Has no side effects: player id columns still hold the Sportradar UUID and
+    teams missing from team_map are left as None, so this can run in a worker
+    process without a database connection.
+    """
+    config = STAT_CONFIGS[stat_type]
+    player_id_col = key_column(config, 'player_id')
+    team_id_col = key_column(config, 'team_id')
+    season_col = key_column(config, 'season_year')
+    week_col = key_column(config, 'week_number')
+    game_id_col = key_column(config, 'game_id')
+
+    rows = []
+    for item in data:
+        if 'id' not in item:
+            continue
+
+        team_uuid = item.get('team', {}).get('id')
+        row = {
+            '_original_player_data': {
+                'name': item.get('name'),
+                'position': item.get('position'),
+                'jersey': item.get('jersey'),
+                'team_id': team_uuid
+            }
+        }
+
+        if player_id_col:
+            row[player_id_col] = item['id']
+        if team_id_col and team_uuid:
+            row[team_id_col] = team_map.get(team_uuid)
+        if season_col:
+            row[season_col] = season_year
+        if week_col:
+            row[week_col] = week
+        if game_id_col:
+            row[game_id_col] = game_id
+        row[config['opp_team_column']] = opp_team_id
+
+        for api_field, db_field in config['field_map'].items():
+            if db_field in RUSHING_FUMBLE_COLUMNS:
+                row[db_field] = int(item.get(api_field, 0) or 0)
+            elif api_field in item:
+                row[db_field] = item[api_field]
+
+        if any(k in row for k in config['data_columns']):
+            rows.append(row)
+
+    return rows
+
+
+def merge_fumbles_into_rushing(
+    rushing_rows: List[Dict[str, Any]],
+    team_data: Dict[str, Any],
+    team_map: Dict[str, int],
+    game_id: Optional[int],
+    season_year: int,
+    week: int,
+    opp_team_id: Optional[int] = None
+) -> None:
+    """Fold a team's fumbles section into its rushing rows, adding a row for players who fumbled without a carry."""
+    fumbles_players = team_data.get('fumbles', {}).get('players') or []
+    by_player = {row['psw_rush_player_id']: row for row in rushing_rows}
+    team = {'id': team_data.get('id'), 'name': team_data.get('name')}
+
+    for player in fumbles_players:
+        if not player.get('id'):
+            continue
+
+        fumbles = int(player.get('fumbles', 0) or 0)
+        lost_fumbles = int(player.get('lost_fumbles', 0) or 0)
+
+        if player['id'] in by_player:
+            by_player[player['id']]['psw_rush_fumbles'] = fumbles
+            by_player[player['id']]['psw_rush_fumbles_lost'] = lost_fumbles
+            continue
+
+        rushing_rows.extend(transform_stat_items([{
+            'id': player['id'],
+            'name': player.get('name', 'Unknown Player'),
+            'position': player.get('position', 'UNK'),
+            'jersey': player.get('jersey'),
+            'team': team,
+            'attempts': 0,
+            'yards': 0,
+            'touchdowns': 0,
+            'avg_yards': 0.0,
+            'longest': 0,
+            'fumbles': fumbles,
+            'lost_fumbles': lost_fumbles
+        }], 'rushing', team_map, game_id, season_year, week, opp_team_id))
+
+
+def possession_seconds(possession_time: Optional[str]) -> Optional[int]:
+    """'32:10' -> 1930."""
+    try:
+        minutes, seconds = possession_time.split(':')
+        return int(minutes) * 60 + int(seconds)
+    except (AttributeError, ValueError):
+        return None
+
+
+def transform_team_totals(
+    player_weekly_stats_response: Dict[str, Any],
+    team_map: Dict[str, int],
+    game_id: Optional[int],
+    season_year: int,
+    week: int,
+    game_teams: Optional[tuple] = None
+) -> List[Dict[str, Any]]:
+    """One team_stats_game row per side, read from the team-level blocks the player rows ignore."""
+    statistics = player_weekly_stats_response.get('statistics', {})
+    summary = player_weekly_stats_response.get('summary', {})
+    opponents = opponent_team_ids(statistics, team_map, game_teams)
+
+    rows = []
+    for team_type in ('home', 'away'):
+        team_data = statistics.get(team_type)
+        team_id = team_map.get((team_data or {}).get('id'))
+        if team_id is None:
+            continue
+
+        row = {
+            'tsg_team_id': team_id,
+            'tsg_game_id': game_id,
+            'tsg_season_year': season_year,
+            'tsg_week_number': week,
+            'tsg_opp_team_id': opponents[team_type],
+            'tsg_points': summary.get(team_type, {}).get('points'),
+            'tsg_possession_seconds': possession_seconds(team_data.get('summary', {}).get('possession_time')),
+        }
+        for column, path in TEAM_STAT_FIELDS.items():
+            value = team_data
+            for field in path:
+                value = value.get(field) if isinstance(value, dict) else None
+            row[column] = value
+        rows.append(row)
+
+    return rows
+
+
+def transform_game_stats(
+    player_weekly_stats_response: Dict[str, Any],
+    team_map: Dict[str, int],
+    game_id: Optional[int],
+    season_year: int,
+    week: int,
+    stat_types: Optional[List[str]] = None,
+    game_teams: Optional[tuple] = None,
+    team_totals: bool = False
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Transform a whole game statistics payload into rows per table.
+
+    Player tables get one row per player; with team_totals the
+    team_stats_game rows are included as well.
+    """
+    stat_types = stat_types or list(STAT_CONFIGS)
+    statistics = player_weekly_stats_response.get('statistics', {})
+    opponents = opponent_team_ids(statistics, team_map, game_teams)
+    rows_by_type = {stat_type: [] for stat_type in stat_types}
+
+    for team_type in ('home', 'away'):
+        team_data = statistics.get(team_type)
+        if not team_data:
+            continue
+
+        team = {'id': team_data.get('id'), 'name': team_data.get('name')}
+        team_rushing_rows = []
+
+        for stat_type in stat_types:
+            players = team_data.get(STAT_CONFIGS[stat_type]['response_key'], {}).get('players') or []
+            rows = transform_stat_items(
+                [dict(player, team=team) for player in players],
+                stat_type, team_map, game_id, season_year, week, opponents[team_type]
+            )
+            if stat_type == 'rushing':
+                team_rushing_rows = rows
+            else:
+                rows_by_type[stat_type].extend(rows)
+
+        if 'rushing' in rows_by_type:
+            merge_fumbles_into_rushing(team_rushing_rows, team_data, team_map, game_id, season_year, week, opponents[team_type])
+            rows_by_type['rushing'].extend(team_rushing_rows)
+
+    rows_by_table = {
+        table_name: merge_section_rows(table_config, rows_by_type)
+        for table_name, table_config in stat_table_configs(stat_types).items()
+    }
+    if team_totals:
+        rows_by_table[TEAM_STATS_TABLE['table_name']] = transform_team_totals(
+            player_weekly_stats_response, team_map, game_id, season_year, week, game_teams
+        )
+    return rows_by_table
+
+
 class PlayerStatsIngestor(BaseIngestor):
     def __init__(self):
         super().__init__() 
         self.endpoint_template = "games/{game_id}/statistics.json"
-        self.week_mode = True 
-        self.season_mode = False 
+        self.mode = 'week'
         self.week = 1
         self.year = 2024 
+        self.poll_interval = 60
+        self.live_lookback_hours = 8
+        self.live_lookahead_hours = 4
+        self.live_snapshots = {}
+        self.game_teams = {}
+        self.changed_tables = set()
+        self.skip_unchanged = False
+        self.rows_written = 0
+        self.rows_unchanged = 0
+        self.resume = False
+        self.tasks = TaskQueue(self.storage, "player_stats")
         self.logger = logging.getLogger(__name__)
         
-        self.STAT_CONFIGS = {
-            'passing': {
-                'table_name': 'player_stats_weekly_passing',
-                'response_key': 'passing',
-                'key_columns': ['psw_pass_player_id', 'psw_pass_team_id', 
-                                'psw_pass_game_id', 'psw_pass_season_year', 
-                                'psw_pass_week_number'],
-                'data_columns': [
-                    'psw_pass_attempts', 'psw_pass_completions', 'psw_pass_yards', 
-                    'psw_pass_avg_yards', 'psw_pass_air_yards', 'psw_pass_longest', 
-                    'psw_pass_longest_touchdown', 'psw_pass_touchdowns', 
-                    'psw_pass_interceptions', 'psw_pass_rz_attempts', 
-                    'psw_pass_pick_sixes', 'psw_pass_throw_aways', 
-                    'psw_pass_poor_throws', 'psw_pass_on_target_throws', 
-                    'psw_pass_defended_passes', 'psw_pass_batted_passes',
-                    'psw_pass_dropped_passes', 'psw_pass_spikes',
-                    'psw_pass_blitzes', 'psw_pass_hurries',
-                    'psw_pass_knockdowns', 'psw_pass_avg_pocket_time',
-                    'psw_pass_net_yards', 'psw_pass_sacks',
-                    'psw_pass_sack_yards'
-                ],
-                'field_map': {
-                    'attempts': 'psw_pass_attempts',
-                    'completions': 'psw_pass_completions',
-                    'yards': 'psw_pass_yards',
-                    'avg_yards': 'psw_pass_avg_yards',
-                    'air_yards': 'psw_pass_air_yards',
-                    'longest': 'psw_pass_longest',
-                    'longest_touchdown': 'psw_pass_longest_touchdown',
-                    'touchdowns': 'psw_pass_touchdowns',
-                    'interceptions': 'psw_pass_interceptions',
-                    'redzone_attempts': 'psw_pass_rz_attempts',
-                    'int_touchdowns': 'psw_pass_pick_sixes',
-                    'throw_aways': 'psw_pass_throw_aways',
-                    'poor_throws': 'psw_pass_poor_throws',
-                    'on_target_throws': 'psw_pass_on_target_throws',
-                    'defended_passes': 'psw_pass_defended_passes',
-                    'batted_passes': 'psw_pass_batted_passes',
-                    'dropped_passes': 'psw_pass_dropped_passes',
-                    'spikes': 'psw_pass_spikes',
-                    'blitzes': 'psw_pass_blitzes',
-                    'hurries': 'psw_pass_hurries',
-                    'knockdowns': 'psw_pass_knockdowns',
-                    'avg_pocket_time': 'psw_pass_avg_pocket_time',
-                    'net_yards': 'psw_pass_net_yards',
-                    'sacks': 'psw_pass_sacks',
-                    'sack_yards': 'psw_pass_sack_yards'
-                }
-            },
-            'rushing': {
-                'table_name': 'player_stats_weekly_rushing',
-                'response_key': 'rushing',
-                'key_columns': ['psw_rush_player_id', 'psw_rush_team_id', 
-                                'psw_rush_game_id', 'psw_rush_season_year', 
-                                'psw_rush_week_number'],
-                'data_columns': [
-                    'psw_rush_attempts', 'psw_rush_yards', 'psw_rush_avg_yards', 
-                    'psw_rush_touchdowns', 'psw_rush_first_downs', 'psw_rush_longest',
-                    'psw_rush_rz_attempts', 'psw_rush_tfl', 'psw_rush_tfl_yards',
-                    'psw_rush_broken_tackles', 'psw_rush_yards_after_contact',
-                    'psw_rush_kneel_downs', 'psw_rush_scrambles', 'psw_rush_fumbles',
-                    'psw_rush_fumbles_lost'
-                ],
-                'field_map': {
-                    'attempts': 'psw_rush_attempts',
-                    'yards': 'psw_rush_yards',
-                    'avg_yards': 'psw_rush_avg_yards',
-                    'touchdowns': 'psw_rush_touchdowns',
-                    'first_downs': 'psw_rush_first_downs',
-                    'longest': 'psw_rush_longest',
-                    'redzone_attempts': 'psw_rush_rz_attempts',
-                    'tlost': 'psw_rush_tfl',
-                    'tlost_yards': 'psw_rush_tfl_yards',
-                    'broken_tackles': 'psw_rush_broken_tackles',
-                    'yards_after_contact': 'psw_rush_yards_after_contact',
-                    'kneel_downs': 'psw_rush_kneel_downs',
-                    'scrambles': 'psw_rush_scrambles',
-                    'fumbles': 'psw_rush_fumbles',
-                    'lost_fumbles': 'psw_rush_fumbles_lost'
-                }
-            },
-             'receiving': {
-                'table_name': 'player_stats_weekly_receiving',
-                'response_key': 'receiving',
-                'key_columns': ['psw_rec_player_id', 'psw_rec_team_id', 'psw_rec_game_id', 'psw_rec_season_year', 'psw_rec_week_number'],
-                'data_columns': [
-                    'psw_rec_receptions', 'psw_rec_yards', 'psw_rec_avg_yards',
-                    'psw_rec_touchdowns', 'psw_rec_first_downs', 'psw_rec_longest',
-                    'psw_rec_longest_touchdown', 'psw_rec_targets', 'psw_rec_rz_targets',
-                    'psw_rec_tfl_yards', 'psw_rec_broken_tackles', 'psw_rec_yards_after_contact',
-                    'psw_rec_yards_after_catch', 'psw_rec_air_yards', 'psw_rec_dropped_passes',
-                    'psw_rec_catchable_passes'
-                ],
-                'field_map': {
-                    'receptions': 'psw_rec_receptions',
-                    'yards': 'psw_rec_yards',
-                    'avg_yards': 'psw_rec_avg_yards',
-                    'touchdowns': 'psw_rec_touchdowns',
-                    'first_downs': 'psw_rec_first_downs',
-                    'longest': 'psw_rec_longest',
-                    'longest_touchdown': 'psw_rec_longest_touchdown',
-                    'targets': 'psw_rec_targets',
-                    'redzone_targets': 'psw_rec_rz_targets',
-                    'broken_tackles': 'psw_rec_broken_tackles',
-                    'yards_after_contact': 'psw_rec_yards_after_contact',
-                    'yards_after_catch': 'psw_rec_yards_after_catch',
-                    'air_yards': 'psw_rec_air_yards',
-                    'dropped_passes': 'psw_rec_dropped_passes',
-                    'catchable_passes': 'psw_rec_catchable_passes'
-                }
-            },
-            'punting': {
-                'table_name': 'player_stats_weekly_punting',
-                'response_key': 'punts',
-                'key_columns': ['psw_punt_player_id', 'psw_punt_team_id', 'psw_punt_game_id', 'psw_punt_season_year', 'psw_punt_week_number'],
-                'data_columns': [
-                    'psw_punt_attempts', 'psw_punt_yards', 'psw_punt_avg_yards',
-                    'psw_punt_net_yards', 'psw_punt_avg_net_yards', 'psw_punt_longest',
-                    'psw_punt_hangtime', 'psw_punt_avg_hangtime', 'psw_punt_blocked',
-                    'psw_punt_touchbacks', 'psw_punt_inside_20', 'psw_punt_return_yards'
-                ],
-                'field_map': {
-                    'attempts': 'psw_punt_attempts',
-                    'yards': 'psw_punt_yards',
-                    'avg_yards': 'psw_punt_avg_yards',
-                    'net_yards': 'psw_punt_net_yards',
-                    'avg_net_yards': 'psw_punt_avg_net_yards',
-                    'longest': 'psw_punt_longest',
-                    'hang_time': 'psw_punt_hangtime',
-                    'avg_hang_time': 'psw_punt_avg_hangtime',
-                    'blocked': 'psw_punt_blocked',
-                    'touchbacks': 'psw_punt_touchbacks',
-                    'inside_20': 'psw_punt_inside_20',
-                    'return_yards': 'psw_punt_return_yards'
-                }
-            },
-            'punt_returns': {
-                'table_name': 'player_stats_weekly_punt_returns',
-                'response_key': 'punt_returns',
-                'key_columns': ['psw_punt_ret_player_id', 'psw_punt_ret_team_id', 'psw_punt_ret_game_id', 'psw_punt_ret_season_year', 'psw_punt_ret_week_number'],
-                'data_columns': [
-                    'psw_punt_ret_attempts', 'psw_punt_ret_yards', 'psw_punt_ret_avg_yards',
-                    'psw_punt_ret_touchdowns', 'psw_punt_ret_longest', 'psw_punt_ret_fair_catches'
-                ],
-                'field_map': {
-                    'number': 'psw_punt_ret_attempts',
-                    'yards': 'psw_punt_ret_yards',
-                    'avg_yards': 'psw_punt_ret_avg_yards',
-                    'touchdowns': 'psw_punt_ret_touchdowns',
-                    'longest': 'psw_punt_ret_longest',
-                    'faircatches': 'psw_punt_ret_fair_catches'
-                }
-            },
-            'field_goals': {
-                'table_name': 'player_stats_weekly_kicking',
-                'response_key': 'field_goals',
-                'key_columns': ['psw_kick_player_id', 'psw_kick_team_id', 'psw_kick_game_id', 'psw_kick_season_year', 'psw_kick_week_number'],
-                'data_columns': [
-                    'psw_kick_fg_attempts', 'psw_kick_fg_made', 'psw_kick_fg_block',
-                    'psw_kick_fg_yards', 'psw_kick_fg_avg_yards', 'psw_kick_fg_longest',
-                    'psw_kick_fg_net_attempts', 'psw_kick_fg_missed', 'psw_kick_fg_pct',
-                    'psw_kick_fg_attempts_19', 'psw_kick_fg_attempts_20_to_29', 'psw_kick_fg_attempts_30_to_39',
-                    'psw_kick_fg_attempts_40_to_49', 'psw_kick_fg_attempts_50_or_more',
-                    'psw_kick_fg_made_19', 'psw_kick_fg_made_20_to_29', 'psw_kick_fg_made_30_to_39',
-                    'psw_kick_fg_made_40_to_49', 'psw_kick_fg_made_50_or_more'
-                ],
-                'field_map': {
-                    'attempts': 'psw_kick_fg_attempts',
-                    'made': 'psw_kick_fg_made',
-                    'blocked': 'psw_kick_fg_block',
-                    'yards': 'psw_kick_fg_yards',
-                    'avg_yards': 'psw_kick_fg_avg_yards',
-                    'longest': 'psw_kick_fg_longest',
-                    'net_attempts': 'psw_kick_fg_net_attempts',
-                    'missed': 'psw_kick_fg_missed',
-                    'pct': 'psw_kick_fg_pct',
-                    'attempts_1_19': 'psw_kick_fg_attempts_19',
-                    'attempts_20_29': 'psw_kick_fg_attempts_20_to_29',
-                    'attempts_30_39': 'psw_kick_fg_attempts_30_to_39',
-                    'attempts_40_49': 'psw_kick_fg_attempts_40_to_49',
-                    'attempts_50_plus': 'psw_kick_fg_attempts_50_or_more',
-                    'made_1_19': 'psw_kick_fg_made_19',
-                    'made_20_29': 'psw_kick_fg_made_20_to_29',
-                    'made_30_39': 'psw_kick_fg_made_30_to_39',
-                    'made_40_49': 'psw_kick_fg_made_40_to_49',
-                    'made_50_plus': 'psw_kick_fg_made_50_or_more'
-                }
-            },
-            'extra_points': {
-                'table_name': 'player_stats_weekly_kicking',
-                'response_key': 'extra_points',
-                'key_columns': ['psw_kick_player_id', 'psw_kick_team_id', 'psw_kick_game_id', 'psw_kick_season_year', 'psw_kick_week_number'],
-                'data_columns': [
-                    'psw_kick_xp_attempts', 'psw_kick_xp_made', 'psw_kick_xp_blocked',
-                    'psw_kick_xp_missed', 'psw_kick_xp_pct'
-                ],
-                'field_map': {
-                    'attempts': 'psw_kick_xp_attempts',
-                    'made': 'psw_kick_xp_made',
-                    'blocked': 'psw_kick_xp_blocked',
-                    'missed': 'psw_kick_xp_missed',
-                    'pct': 'psw_kick_xp_pct'
-                }
-            },
-            'kickoffs': {
-                'table_name': 'player_stats_weekly_kickoffs',
-                'response_key': 'kickoffs',
-                'key_columns': ['psw_kickoff_player_id', 'psw_kickoff_team_id', 'psw_kickoff_game_id', 'psw_kickoff_season_year', 'psw_kickoff_week_number'],
-                'data_columns': [
-                    'psw_kickoff_attempts', 'psw_kickoff_yards', 'psw_kickoff_avg_yards',
-                    'psw_kickoff_touchbacks', 'psw_kickoff_onside_attempts', 'psw_kickoff_onside_made',
-                    'psw_kickoff_out_of_bounds'
-                ],
-                'field_map': {
-                    'number': 'psw_kickoff_attempts',
-                    'yards': 'psw_kickoff_yards',
-                    'avg_yards': 'psw_kickoff_avg_yards',
-                    'touchbacks': 'psw_kickoff_touchbacks',
-                    'onside_attempts': 'psw_kickoff_onside_attempts',
-                    'onside_successes': 'psw_kickoff_onside_made',
-                    'out_of_bounds': 'psw_kickoff_out_of_bounds'
-                }
-            },
-            'kick_returns': {
-                'table_name': 'player_stats_weekly_kick_returns',
-                'response_key': 'kick_returns',
-                'key_columns': ['psw_kick_ret_player_id', 'psw_kick_ret_team_id', 'psw_kick_ret_game_id', 'psw_kick_ret_season_year', 'psw_kick_ret_week_number'],
-                'data_columns': [
-                    'psw_kick_ret_attempts', 'psw_kick_ret_yards', 'psw_kick_ret_avg_yards',
-                    'psw_kick_ret_touchdowns', 'psw_kick_ret_longest', 'psw_kick_ret_fair_catches'
-                ],
-                'field_map': {
-                    'number': 'psw_kick_ret_attempts',
-                    'yards': 'psw_kick_ret_yards',
-                    'avg_yards': 'psw_kick_ret_avg_yards',
-                    'touchdowns': 'psw_kick_ret_touchdowns',
-                    'longest': 'psw_kick_ret_longest',
-                    'faircatches': 'psw_kick_ret_fair_catches'
-                }
-            },
-            'defense': {
-                'table_name': 'player_stats_weekly_defense',
-                'response_key': 'defense',
-                'key_columns': ['psw_def_player_id', 'psw_def_team_id', 'psw_def_game_id', 'psw_def_season_year', 'psw_def_week_number'],
-                'data_columns': [
-                    'psw_def_tackles', 'psw_def_assists', 'psw_def_combined', 
-                    'psw_def_sacks', 'psw_def_sack_yards', 'psw_def_interceptions',
-                    'psw_def_passes_defended', 'psw_def_forced_fumbles', 'psw_def_fumble_recoveries',
-                    'psw_def_qb_hits', 'psw_def_tloss', 'psw_def_tloss_yards',
-                    'psw_def_safeties', 'psw_def_sp_tackles', 'psw_def_sp_assists',
-                    'psw_def_sp_forced_fumbles', 'psw_def_sp_fumble_recoveries', 'psw_def_sp_blocks',
-                    'psw_def_misc_tackles', 'psw_def_misc_assists', 'psw_def_misc_forced_fumbles',
-                    'psw_def_misc_fumble_recoveries', 'psw_def_sp_own_fumble_recoveries', 'psw_def_sp_opp_fumble_recoveries',
-                    'psw_def_def_targets', 'psw_def_def_comps', 'psw_def_blitzes',
-                    'psw_def_hurries', 'psw_def_knockdowns', 'psw_def_missed_tackles',
-                    'psw_def_batted_passes'
-                ],
-                'field_map': {
-                    'tackles': 'psw_def_tackles',
-                    'assists': 'psw_def_assists',
-                    'combined': 'psw_def_combined',
-                    'sacks': 'psw_def_sacks',
-                    'sack_yards': 'psw_def_sack_yards',
-                    'interceptions': 'psw_def_interceptions',
-                    'passes_defended': 'psw_def_passes_defended',
-                    'forced_fumbles': 'psw_def_forced_fumbles',
-                    'fumble_recoveries': 'psw_def_fumble_recoveries',
-                    'qb_hits': 'psw_def_qb_hits',
-                    'tloss': 'psw_def_tloss',
-                    'tloss_yards': 'psw_def_tloss_yards',
-                    'safeties': 'psw_def_safeties',
-                    'sp_tackles': 'psw_def_sp_tackles',
-                    'sp_assists': 'psw_def_sp_assists',
-                    'sp_forced_fumbles': 'psw_def_sp_forced_fumbles',
-                    'sp_fumble_recoveries': 'psw_def_sp_fumble_recoveries',
-                    'sp_blocks': 'psw_def_sp_blocks',
-                    'misc_tackles': 'psw_def_misc_tackles',
-                    'misc_assists': 'psw_def_misc_assists',
-                    'misc_forced_fumbles': 'psw_def_misc_forced_fumbles',
-                    'misc_fumble_recoveries': 'psw_def_misc_fumble_recoveries',
-                    'sp_own_fumble_recoveries': 'psw_def_sp_own_fumble_recoveries',
-                    'sp_opp_fumble_recoveries': 'psw_def_sp_opp_fumble_recoveries',
-                    'def_targets': 'psw_def_def_targets',
-                    'def_comps': 'psw_def_def_comps',
-                    'blitzes': 'psw_def_blitzes',
-                    'hurries': 'psw_def_hurries',
-                    'knockdowns': 'psw_def_knockdowns',
-                    'missed_tackles': 'psw_def_missed_tackles',
-                    'batted_passes': 'psw_def_batted_passes'
-                }
-            },
-            'fumbles': {
-                'table_name': 'player_stats_weekly_fumbles',
-                'response_key': 'fumbles',
-                'key_columns': ['psw_fum_player_id', 'psw_fum_team_id', 'psw_fum_game_id', 'psw_fum_season_year', 'psw_fum_week_number'],
-                'data_columns': [
-                    'psw_fum_fumbles', 'psw_fum_lost_fumbles', 'psw_fum_own_rec',
-                    'psw_fum_own_rec_yards', 'psw_fum_opp_rec', 'psw_fum_opp_rec_yards',
-                    'psw_fum_forced_fumbles'
-                ],
-                'field_map': {
-                    'fumbles': 'psw_fum_fumbles',
-                    'lost_fumbles': 'psw_fum_lost_fumbles',
-                    'own_rec': 'psw_fum_own_rec',
-                    'own_rec_yards': 'psw_fum_own_rec_yards',
-                    'opp_rec': 'psw_fum_opp_rec',
-                    'opp_rec_yards': 'psw_fum_opp_rec_yards',
-                    'forced_fumbles': 'psw_fum_forced_fumbles'
-                }
-            },
-        }
+        self.STAT_CONFIGS = STAT_CONFIGS
+        self.STAT_TABLES = STAT_TABLES
         
         
     def get_games(self, conn) -> list:
-        with conn.cursor() as cur:
-            if hasattr(self, 'week_mode') and self.week_mode:
-                cur.execute("""
-                    select game_sr_uuid, game_id, game_week, game_season_year
-                    from refdata.game
-                    where game_week = %s and game_season_year = %s
-                    order by game_season_year, game_week
-                """, (self.week, self.year))
-                self.logger.info(f"Processing games for Week {self.week}, Year {self.year}")
-            elif hasattr(self, 'season_mode') and self.season_mode:
-                cur.execute("""
-                    select game_sr_uuid, game_id, game_week, game_season_year
-                    from refdata.game
-                    where game_season_year = %s
-                    order by game_week
-                """, (self.year,))
-                self.logger.info(f"Processing all games for season {self.year}")
-            
-            return [
-                {
-                    'uuid': row[0],
-                    'id': row[1],
-                    'week': row[2],
-                    'year': row[3]
-                }
-                for row in cur.fetchall()
-            ]
-            
-            
-    def process_and_insert_all_stats(self, conn, player_weekly_stats_response: Dict[str, Any]) -> None:
-        team_map = self.get_team_map(conn)
-        self.logger.info(f"Loaded team map with {len(team_map)} teams")
-        
-        if len(team_map) > 0:
-            self.logger.info(f"Team map keys (first 5): {list(team_map.keys())[:5]}")
-        
-        self.logger.info(f"Available keys in response: {', '.join(player_weekly_stats_response.keys())}")
-        
-        if 'statistics' not in player_weekly_stats_response:
-            self.logger.warning("No 'statistics' key found in the response")
-            return
-            
-        statistics = player_weekly_stats_response['statistics']
+        if self.mode == 'week':
+            self.logger.info(f"Processing games for Week {self.week}, Year {self.year}")
+            games = self.storage.get_games(conn, self.year, self.week)
+        elif self.mode == 'season':
+            self.logger.info(f"Processing all games for season {self.year}")
+            games = self.storage.get_games(conn, self.year)
+        elif self.mode == 'live':
+            self.logger.info("Processing games currently in progress")
+            games = self.storage.get_live_games(conn, self.live_lookback_hours)
+        else:
+            raise ValueError(f"Unknown mode {self.mode}")
         
-        teams_data = []
-        if 'home' in statistics:
-            self.logger.info("Found home team statistics")
-            teams_data.append(('home', statistics['home']))
-        if 'away' in statistics:
-            self.logger.info("Found away team statistics")
-            teams_data.append(('away', statistics['away']))
+        # game -> (home, away) index used to stamp each stat row with the opposing defense
+        self.game_teams.update({game['id']: (game['home_team_id'], game['away_team_id']) for game in games})
+        return games
             
-        if not teams_data:
-            self.logger.warning("No home or away team statistics found")
-            return
             
-        stats_processed = 0
-        
-        for team_type, team_data in teams_data:
-            team_id = team_data.get('id')
-            team_name = team_data.get('name')
-            self.logger.info(f"Processing {team_type} team statistics for {team_name} (ID: {team_id})")
-            
-            for stat_type, config in self.STAT_CONFIGS.items():
-                response_key = config['response_key']
-                
-                if response_key in team_data:
-                    stat_data = team_data[response_key]
-                    
-                    if 'players' in stat_data and stat_data['players']:
-                        players = stat_data['players']
-                        self.logger.info(f"Found {len(players)} players with {stat_type} stats for {team_type} team")
-                        
-                        processed_players = []
-                        
-                        for player in players:
-                            player_with_team = player.copy()
-                            player_with_team['team'] = {'id': team_id, 'name': team_name}
-                            
-                            if 'id' not in player:
-                                self.logger.warning(f"Skipping player without ID in {stat_type} stats")
-                                continue
-                                
-                            processed_players.append(player_with_team)
-                        
-                        if processed_players:
-                            processed_data = self.process_stats(conn, processed_players, stat_type, team_map)
-                            self.logger.info(f"After processing: {len(processed_data)} {stat_type} records ready for insertion")
-                            
-                            if processed_data:
-                                self.insert_stats(
-                                    conn=conn,
-                                    table_name=config['table_name'],
-                                    key_columns=config['key_columns'],
-                                    data_columns=config['data_columns'],
-                                    data=processed_data,
-                                    is_bulk=True 
-                                )
-                                stats_processed += len(processed_data)
-                            else:
-                                self.logger.warning(f"No records to insert for {stat_type} after processing")
-                    else:
-                        self.logger.info(f"No player stats found for {stat_type} in {team_type} team data")
-                else:
-                    self.logger.info(f"No {response_key} data found for {team_type} team")
-        
-        self.update_rushing_with_fumbles(conn, statistics)
-        
-        self.logger.info(f"Total stats processed in this response: {stats_processed}")
+    def has_upcoming_live_games(self, conn) -> bool:
+        return self.storage.has_upcoming_live_games(conn, self.live_lookahead_hours, self.live_lookback_hours)
 
-    def update_rushing_with_fumbles(self, conn, statistics: Dict[str, Any]) -> None:
-        team_map = self.get_team_map(conn)
+
+    @profile_stage("write")
+    def mark_game_final(self, conn, game_db_id: int, player_weekly_stats_response: Dict[str, Any]) -> None:
+        summary = player_weekly_stats_response.get('summary', {})
+        home_points = summary.get('home', {}).get('points')
+        away_points = summary.get('away', {}).get('points')
         
-        teams_data = []
-        if 'home' in statistics:
-            teams_data.append(('home', statistics['home']))
-        if 'away' in statistics:
-            teams_data.append(('away', statistics['away']))
+        self.storage.mark_game_final(conn, game_db_id, home_points, away_points)
         
-        for team_type, team_data in teams_data:
-            team_id = team_data.get('id')
-            team_name = team_data.get('name')
-            
-            if 'fumbles' not in team_data or 'players' not in team_data['fumbles'] or not team_data['fumbles']['players']:
-                continue
-                
-            fumbles_players = team_data['fumbles']['players']
-            self.logger.info(f"Processing fumbles data for {len(fumbles_players)} players from {team_type} team")
-            
-            for player in fumbles_players:
-                player_uuid = player.get('id')
-                if not player_uuid:
-                    self.logger.warning("Skipping player without ID in fumbles data")
-                    continue
-                
-                db_team_id = None
-                if team_id:
-                    db_team_id = team_map.get(team_id)
-                    if db_team_id is None:
-                        with conn.cursor() as cur:
-                            cur.execute(
-                                """
-                                SELECT team_id, team_name
-                                FROM refdata.team
-                                WHERE team_sr_uuid = %s
-                                """, (team_id,))
-                            team_row = cur.fetchone()
-                            if team_row:
-                                db_team_id = team_row[0]
-                                team_map[team_id] = db_team_id
-                
-                player_id = self.get_player_id(conn, player_uuid)
-                if not player_id:
-                    player_data = {
-                        "name": player.get('name', 'Unknown Player'),
-                        "player_sr_uuid": player_uuid,
-                        "team_id": team_id,
-                        "position": player.get('position', 'UNK'),
-                        "jersey": player.get('jersey', None)
-                    }
-                    player_id = self.insert_player(conn, player_data)
-                    if not player_id:
-                        self.logger.warning(f"Failed to insert player with UUID {player_uuid} from fumbles data")
-                        continue
-                
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        SELECT psw_rush_id, psw_rush_attempts
-                        FROM stats.player_stats_weekly_rushing
-                        WHERE psw_rush_player_id = %s
-                        AND psw_rush_game_id = %s
-                        AND psw_rush_season_year = %s
-                        AND psw_rush_week_number = %s
-                    """, (player_id, self.game_id, self.year, self.week))
-                    
-                    rush_row = cur.fetchone()
-                    
-                    fumbles = int(player.get('fumbles', 0) or 0)
-                    lost_fumbles = int(player.get('lost_fumbles', 0) or 0)
-                    
-                    if rush_row:
-                        rush_id = rush_row[0]
-                        self.logger.info(f"Updating existing rushing stats (ID: {rush_id}) with fumbles data for player {player.get('name')} (ID: {player_id})")
-                        
-                        cur.execute("""
-                            UPDATE stats.player_stats_weekly_rushing
-                            SET psw_rush_fumbles = %s,
-                                psw_rush_fumbles_lost = %s,
-                                psw_rush_updated_at = NOW()
-                            WHERE psw_rush_id = %s
-                        """, (fumbles, lost_fumbles, rush_id))
-                    else:
-                        self.logger.info(f"Creating new rushing stats entry with only fumbles data for player {player.get('name')} (ID: {player_id})")
-                        
-                        cur.execute("""
-                            INSERT INTO stats.player_stats_weekly_rushing (
-                                psw_rush_player_id, psw_rush_team_id, psw_rush_game_id, 
-                                psw_rush_season_year, psw_rush_week_number,
-                                psw_rush_attempts, psw_rush_yards, psw_rush_fumbles, psw_rush_fumbles_lost,
-                                psw_rush_touchdowns, psw_rush_avg_yards, psw_rush_longest
-                            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (player_id, db_team_id, self.game_id, self.year, self.week, 
-                              0, 0, fumbles, lost_fumbles, 0, 0.0, 0))
-                    
-                    conn.commit()
-                    self.logger.info(f"Successfully updated rushing stats with fumbles data for player {player.get('name')} (ID: {player_id})")
+        self.logger.info(f"Marked game {game_db_id} final ({home_points}-{away_points})")
 
-    def process_stats(self, conn, data: List[Dict[str, Any]], stat_type: str, team_map: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
-        config = self.STAT_CONFIGS[stat_type]
-        
-        processed_data = []
+
+    def filter_changed_rows(self, snapshot: Dict[Any, tuple], table_config: Dict[str, Any], data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        table_name = table_config['table_name']
         
+        changed = []
         for item in data:
-            if 'id' not in item:
-                self.logger.debug(f"Skipping entry without player ID for {stat_type}")
-                continue
-                
-            processed_item = {}
-            
-            processed_item['_original_player_data'] = {
-                'name': item.get('name'),
-                'position': item.get('position'),
-                'jersey': item.get('jersey'),
-                'team_id': item.get('team', {}).get('id')
-            }
-            
-            player_id_col = next((col for col in config['key_columns'] if col.endswith('player_id')), None)
-            team_id_col = next((col for col in config['key_columns'] if col.endswith('team_id')), None)
-            season_col = next((col for col in config['key_columns'] if col.endswith('season_year')), None)
-            week_col = next((col for col in config['key_columns'] if col.endswith('week_number')), None)
-            game_id_col = next((col for col in config['key_columns'] if col.endswith('game_id')), None)
-            
-            if stat_type == 'rushing':
-                item['fumbles'] = int(item.get('fumbles', 0) or 0)
-                item['lost_fumbles'] = int(item.get('lost_fumbles', 0) or 0)
-            
-            if player_id_col:
-                player_uuid = item.get('id')
-                processed_item[player_id_col] = player_uuid
-            
-            if team_id_col and 'team' in item:
-                team_uuid = item.get('team', {}).get('id')
-                if team_uuid and team_map:
-                    self.logger.debug(f"Looking up team UUID: {team_uuid}")
-                    
-                    processed_item[team_id_col] = team_map.get(team_uuid)
-                    
-                    if processed_item[team_id_col] is None:
-                        self.logger.warning(f"Could not find team ID in map for UUID {team_uuid}, trying direct DB lookup")
-                        with conn.cursor() as cur:
-                            cur.execute(
-                                """
-                                SELECT team_id, team_name
-                                FROM refdata.team
-                                WHERE team_sr_uuid = %s
-                                """, (team_uuid,))
-                            team_row = cur.fetchone()
-                            if team_row:
-                                processed_item[team_id_col] = team_row[0]
-                                self.logger.info(f"Found team ID {team_row[0]} ({team_row[1]}) for UUID {team_uuid}")
-                                
-                                team_map[team_uuid] = team_row[0]
-                            else:
-                                self.logger.warning(f"Team UUID {team_uuid} not found in database")
-                else:
-                    self.logger.warning(f"No team UUID provided for player or no team map available")
-            if season_col:
-                processed_item[season_col] = self.year
-            
-            if week_col:
-                processed_item[week_col] = self.week
-                
-            if game_id_col and hasattr(self, 'game_id'):
-                processed_item[game_id_col] = self.game_id
-            
-            for api_field, db_field in config['field_map'].items():
-                if api_field in item:
-                    if db_field in ['psw_rush_fumbles', 'psw_rush_fumbles_lost']:
-                        processed_item[db_field] = int(item.get(api_field, 0) or 0)
-                    else:
-                        processed_item[db_field] = item[api_field]
-            
-            if any(k in processed_item for k in config['data_columns']):
-                processed_data.append(processed_item)
-            else:
-                self.logger.debug(f"Skipping item with no data fields for {stat_type}")
+            key = (table_name,) + tuple(item.get(col) for col in table_config['key_columns'])
+            values = tuple(item.get(col) for col in table_config['data_columns'])
+            if snapshot.get(key) != values:
+                snapshot[key] = values
+                changed.append(item)
         
-        return processed_data
+        self.logger.info(f"{len(changed)} of {len(data)} {table_name} records changed since last poll")
+        return changed
 
+
+    @profile_stage("write")
     def insert_stats(
         self, 
         conn,
         table_name: str,
         key_columns: List[str],
         data_columns: List[str],
-        data: List[Dict[str, Any]],
-        is_bulk: bool = False
+        data: List[Dict[str, Any]]
     ) -> None:
         if not data:
             self.logger.warning(f"No data to insert into {table_name}")
@@ -652,178 +776,335 @@ class PlayerStatsIngestor(BaseIngestor):
             self.resolve_player_ids(conn, data)
         
         all_columns = key_columns + data_columns
-        columns_str = self.generate_column_list(all_columns)
-        placeholders = self.generate_placeholders(all_columns)
-        update_clause = self.generate_update_clause(data_columns)
-        
-        player_id_col = next((col for col in key_columns if col.endswith('player_id')), None)
-        team_id_col = next((col for col in key_columns if col.endswith('team_id')), None)
-        game_id_col = next((col for col in key_columns if col.endswith('game_id')), None)
-        season_col = next((col for col in key_columns if col.endswith('season_year')), None)
-        week_col = next((col for col in key_columns if col.endswith('week_number')), None)
-        
-        conflict_columns = []
-        if player_id_col:
-            conflict_columns.append(player_id_col)
-        if team_id_col:
-            conflict_columns.append(team_id_col)
-        if game_id_col:
-            conflict_columns.append(game_id_col)
-        if season_col:
-            conflict_columns.append(season_col)
-        if week_col:
-            conflict_columns.append(week_col)
-            
-        self.logger.info(f"Using conflict columns: {', '.join(conflict_columns)}")
-            
-        query = f"""
-        INSERT INTO stats.{table_name} ({columns_str})
-        VALUES ({placeholders})
-        ON CONFLICT ({', '.join(conflict_columns)})
-        DO UPDATE SET {update_clause}
-        """
-        
-        self.logger.debug(f"SQL Query: {query}")
-        
-        cursor = conn.cursor()
+        self.logger.info(f"Using conflict columns: {', '.join(key_columns)}")
         
         try:
-            if is_bulk and len(data) > 1:
-                values = []
-                for item in data:
-                    row = []
-                    for col in all_columns:
-                        row.append(item.get(col))
-                    values.append(row) 
-                
-                self.logger.info(f"Executing bulk insert of {len(values)} rows into {table_name}")
-                cursor.executemany(query, values)
-                self.logger.info(f"Bulk inserted {len(values)} rows into {table_name}")
-            else:
-                for item in data:
-                    values = []
-                    for col in all_columns:
-                        values.append(item.get(col))
-                    
-                    cursor.execute(query, values)
-                    self.logger.debug(f"Inserted 1 row into {table_name}")
+            values = []
+            for item in data:
+                row = []
+                for col in all_columns:
+                    row.append(item.get(col))
+                values.append(row) 
             
-            conn.commit()
-            self.logger.info(f"Committed {len(data)} inserts to {table_name}")
+            self.logger.info(f"Executing bulk insert of {len(values)} rows into {table_name}")
+            written = self.storage.insert_stats(
+                conn,
+                table_name=table_name,
+                key_columns=key_columns,
+                data_columns=data_columns,
+                rows=values,
+                skip_unchanged=self.skip_unchanged
+            )
+            self.logger.info(f"Bulk inserted {len(values)} rows into {table_name}")
+            
+            # Committed by the caller together with the rest of the game
+            if written:
+                self.changed_tables.add(table_name)
+            self.rows_written += written
+            self.rows_unchanged += len(data) - written
+            self.logger.info(f"Wrote {written} rows to {table_name} ({len(data) - written} unchanged rows skipped)")
             
         except Exception as e:
-            conn.rollback()
             self.logger.error(f"Error inserting into {table_name}: {str(e)}")
             self.logger.error(f"Error details: {type(e).__name__}")
             raise
-        finally:
-            cursor.close()
 
+    @profile_stage("resolve")
     def resolve_player_ids(self, conn, data: List[Dict[str, Any]]) -> None:
-        player_id_map = {}
+        player_uuids = set()
+        for item in data:
+            player_id_col = next((col for col in item.keys() if col.endswith('player_id')), None)
+            if player_id_col and item[player_id_col]:
+                player_uuids.add(item[player_id_col])
         
+        player_id_map = self.get_player_ids(conn, player_uuids)
+        
+        missing_players = {}
         for item in data:
             player_id_col = next((col for col in item.keys() if col.endswith('player_id')), None)
+            if not player_id_col or not item[player_id_col] or item[player_id_col] in player_id_map:
+                continue
             
-            if player_id_col and item[player_id_col]:
-                player_uuid = item[player_id_col]
-                if player_uuid not in player_id_map:
-                    player_id = self.get_player_id(conn, player_uuid)
-                    
-                    if not player_id:
-                        self.logger.info(f"Player with UUID {player_uuid} not found. Attempting to insert.")
-                        
-                        original_data = item.get('_original_player_data', {})
-                        player_data = {
-                            "name": original_data.get('name', 'Unknown Player'),
-                            "player_sr_uuid": player_uuid,
-                            "team_id": original_data.get('team_id'),
-                            "position": original_data.get('position', 'UNK'), 
-                            "jersey": original_data.get('jersey', None)
-                        }
-                        
-                        self.logger.info(f"Inserting player {player_data['name']} ({player_data['position']}) with UUID {player_uuid}")
-                        player_id = self.insert_player(conn, player_data)
-                        
-                        if player_id:
-                            self.logger.info(f"Successfully inserted player with UUID {player_uuid}, assigned ID {player_id}")
-                        else:
-                            self.logger.warning(f"Failed to insert player with UUID {player_uuid}")
-                    
-                    if player_id:
-                        player_id_map[player_uuid] = player_id
-                
+            player_uuid = item[player_id_col]
+            if player_uuid not in missing_players:
+                self.logger.info(f"Player with UUID {player_uuid} not found. Attempting to insert.")
+                original_data = item.get('_original_player_data', {})
+                missing_players[player_uuid] = {
+                    "name": original_data.get('name', 'Unknown Player'),
+                    "player_sr_uuid": player_uuid,
+                    "team_id": original_data.get('team_id'),
+                    "position": original_data.get('position', 'UNK'), 
+                    "jersey": original_data.get('jersey', None)
+                }
+        
+        if missing_players:
+            self.logger.info(f"Inserting {len(missing_players)} new players")
+            self.insert_players(conn, missing_players.values(), self.get_team_map(conn))
+            player_id_map.update(self.get_player_ids(conn, missing_players.keys()))
+            
+            for player_uuid in missing_players:
                 if player_uuid in player_id_map:
-                    item[player_id_col] = player_id_map[player_uuid]
+                    self.logger.info(f"Successfully inserted player with UUID {player_uuid}, assigned ID {player_id_map[player_uuid]}")
+                else:
+                    self.logger.warning(f"Failed to insert player with UUID {player_uuid}")
+        
+        for item in data:
+            player_id_col = next((col for col in item.keys() if col.endswith('player_id')), None)
+            
+            if player_id_col and item[player_id_col] in player_id_map:
+                item[player_id_col] = player_id_map[item[player_id_col]]
                     
             if '_original_player_data' in item:
                 del item['_original_player_data']
 
 
-    def generate_column_list(self, columns: List[str]) -> str:
-        return ', '.join(columns)
+    def publish_stats_changes(self, conn, game: Dict[str, Any]) -> None:
+        # Called after the game's commit or rollback; a rolled back game has cleared changed_tables
+        team_ids = self.game_teams.get(game['id'], ())
+        for table_name in sorted(self.changed_tables):
+            self.publish_change(conn, f"stats.{table_name}", game['year'], game['week'], team_ids)
+        self.changed_tables.clear()
+
+
+    @profile_stage("trends")
+    def update_defense_trends(self, conn, weeks) -> None:
+        trends = DefenseTrends(self.storage)
+        seasons = {}
+        for season_year, week_number in weeks:
+            seasons.setdefault(season_year, set()).add(week_number)
+
+        for season_year, season_weeks in sorted(seasons.items()):
+            try:
+                changed = trends.update_weeks(conn, season_year, season_weeks)
+                conn.commit()
+                # season-wide: a re-ingested week rebuilds every later week's windows
+                self.publish_change(conn, 'stats.def_vs_pos_trends', season_year, None, changed)
+            except Exception as e:
+                self.logger.error(f"Error updating defense trends for season {season_year}, weeks {sorted(season_weeks)}: {e}")
+                conn.rollback()
+
 
+    def log_run_summary(self) -> None:
+        self.logger.info(
+            f"Run summary: {self.rows_written} stat rows written, "
+            f"{self.rows_unchanged} unchanged rows skipped"
+        )
 
-    def generate_placeholders(self, columns: List[str]) -> str:
-        return ', '.join(['%s'] * len(columns))
 
+    def fetch_game(self, game: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch and archive one game's statistics payload; None when the API would not return it."""
+        game_uuid = game['uuid']
+        self.logger.info(f"Processing game {game_uuid} (Week {game['week']}, Year {game['year']})")
 
-    def generate_update_clause(self, data_columns: List[str]) -> str:
-        updates = []
-        for col in data_columns:
-            updates.append(f"{col} = EXCLUDED.{col}")
-        return ', '.join(updates)
+        while True:
+            try:
+                url = f"{self.base_url}{self.endpoint_template.format(game_id=game_uuid)}"
+                data = self.fetch_data(url)
+                break
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 429:
+                    self.logger.warning(f"Rate limit hit for game {game_uuid}, sleeping...")
+                    time.sleep(5) 
+                else:
+                    self.logger.error(f"HTTP error processing game {game_uuid}: {e}")
+                    return None
+        
+        if os.getenv("ENVIRONMENT", "DEV").upper() == "DEV":
+            self.save_raw_json(data, "game_stats", season=game['year'], week=game['week'], game_uuid=game_uuid)
+        return data
+
+
+    @profile_stage("transform")
+    def transform_game(self, game: Dict[str, Any], data: Dict[str, Any], team_map: Dict[str, int]) -> Dict[str, List[Dict[str, Any]]]:
+        """Rows per table for one game's payload; needs no connection, so it can run apart from the writes."""
+        return transform_game_stats(
+            data, team_map, game['id'], game['year'], game['week'],
+            game_teams=self.game_teams.get(game['id']),
+            team_totals=True
+        )
+
+
+    def fill_team_ids(self, conn, table_config: Dict[str, Any], rows: List[Dict[str, Any]]) -> None:
+        """Look up teams that were missing from the team map when the rows were transformed."""
+        team_id_col = key_column(table_config, 'team_id')
+        for row in rows:
+            team_uuid = row.get('_original_player_data', {}).get('team_id')
+            if not team_id_col or not team_uuid or row.get(team_id_col) is not None:
+                continue
+            self.logger.warning(f"Could not find team ID in map for UUID {team_uuid}, trying direct DB lookup")
+            row[team_id_col] = self.storage.get_team_id(conn, team_uuid)
+            if row[team_id_col] is None:
+                self.logger.warning(f"Team UUID {team_uuid} not found in database")
+
+
+    def write_rows(self, conn, rows_by_table: Dict[str, List[Dict[str, Any]]], snapshot: Optional[Dict[Any, tuple]] = None) -> None:
+        """Upsert a game's transformed rows; with a live snapshot, only the rows changed since the last poll."""
+        for table_name, rows in rows_by_table.items():
+            table_config = TEAM_STATS_TABLE if table_name == TEAM_STATS_TABLE['table_name'] else self.STAT_TABLES[table_name]
+            self.fill_team_ids(conn, table_config, rows)
+            if snapshot is not None:
+                rows = self.filter_changed_rows(snapshot, table_config, rows)
+            if not rows:
+                continue
+            self.insert_stats(
+                conn=conn,
+                table_name=table_name,
+                key_columns=table_config['key_columns'],
+                data_columns=stored_data_columns(table_config),
+                data=rows
+            )
+
+
+    def write_game(self, conn, game: Dict[str, Any], task: Dict[str, Any], rows_by_table: Optional[Dict[str, List[Dict[str, Any]]]]) -> bool:
+        """Write one game's transformed rows, committing them with its task; return whether it succeeded."""
+        game_uuid = game['uuid']
+
+        try:
+            if rows_by_table is None:
+                self.logger.error(f"No data retrieved for game {game_uuid}, skipping")
+                self.tasks.failed(conn, task, "no data retrieved")
+                return False
+            
+            self.write_rows(conn, rows_by_table)
+            self.logger.info(f"Completed ingesting player weekly stats for game {game_uuid}")
+
+            self.logger.info(f"Successfully processed game {game_uuid}")
+            self.tasks.done(conn, task)
+            conn.commit()
+            self.logger.info(f"Database changes committed for game {game_uuid}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error processing game {game_uuid}: {e}")
+            conn.rollback()
+            self.changed_tables.clear()
+            self.logger.warning(f"Database changes rolled back for game {game_uuid}")
+            self.tasks.failed(conn, task, e)
+            return False
+        finally:
+            self.publish_stats_changes(conn, game)
+
+
+    def ingest_game(self, conn, game: Dict[str, Any], task: Dict[str, Any]) -> bool:
+        """Fetch, transform and write one game in turn; return whether it succeeded."""
+        data = self.fetch_game(game)
+        rows_by_table = None if data is None else self.transform_game(game, data, self.get_team_map(conn))
+        return self.write_game(conn, game, task, rows_by_table)
 
 
     def run(self) -> None:
-        with safe_connection() as conn:
+        """
+        Ingest the week's or season's games through a fetch, transform and write pipeline.
+
+        Several fetchers keep requests in flight while the payloads before
+        them are transformed and written, so the run takes about as long
+        as its slowest stage. Writes stay on one connection, each game
+        committed with its task as in a sequential run.
+        """
+        self.rows_written = 0
+        self.rows_unchanged = 0
+        with self.storage.connection() as conn:
             games = self.get_games(conn)
             self.logger.info(f"Found {len(games)} games to process")
+            tasks = self.tasks.plan(conn, [make_task(game['year'], game['week'], game['uuid']) for game in games], resume=self.resume)
+            team_map = self.get_team_map(conn)
+        
+        ingested_weeks = set()
+
+        def fetch(item):
+            game, task = item
+            return game, task, self.fetch_game(game)
+
+        def transform(item):
+            game, task, data = item
+            return game, task, None if data is None else self.transform_game(game, data, team_map)
+
+        def write(conn, item):
+            game, task, rows_by_table = item
+            self.tasks.start(conn, task)
+            if self.write_game(conn, game, task, rows_by_table):
+                ingested_weeks.add((game['year'], game['week']))
+
+        pipeline = Pipeline("player_stats")
+        pipeline.stage("fetch", fetch, workers=settings.PIPELINE_FETCH_WORKERS)
+        pipeline.stage("transform", transform, workers=settings.PIPELINE_TRANSFORM_WORKERS)
+        pipeline.stage("write", write, context=self.storage.connection)
+        pipeline.run((game, task) for game, task in zip(games, tasks) if not self.tasks.skip(task))
+        
+        self.logger.info("Player weekly stats processing complete")
+        with self.storage.connection() as conn:
+            self.update_defense_trends(conn, ingested_weeks)
+        self.tasks.log_summary()
+        self.log_run_summary()
+
+
+    def run_task(self, conn, task: Dict[str, Any]) -> bool:
+        """
+        Ingest the game behind a claimed task (see ingestors.worker).
+
+        Defense trends are left to a rebuild once the whole backfill is
+        done, since workers finish a week's games in no particular order.
+        """
+        games = self.storage.get_games(conn, task['season_year'], task['week'])
+        self.game_teams.update({game['id']: (game['home_team_id'], game['away_team_id']) for game in games})
+        game = next((game for game in games if game['uuid'] == task['game_uuid']), None)
+        if game is None:
+            self.tasks.failed(conn, task, "game not found in refdata.game")
+            return False
+        return self.ingest_game(conn, game, task)
+
+
+    def poll_live_game(self, conn, game: Dict[str, Any]) -> None:
+        game_uuid = game['uuid']
+        url = f"{self.base_url}{self.endpoint_template.format(game_id=game_uuid)}"
+        
+        try:
+            data = self.fetch_data(url)
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 429:
+                self.logger.warning(f"Rate limit hit for game {game_uuid}, retrying next poll")
+            else:
+                self.logger.error(f"HTTP error polling game {game_uuid}: {e}")
+            return
+        
+        # Work on a copy so a rolled back poll is retried in full next time
+        snapshot = dict(self.live_snapshots.get(game_uuid, {}))
+        
+        try:
+            rows_by_table = self.transform_game(game, data, self.get_team_map(conn))
+            self.write_rows(conn, rows_by_table, snapshot)
             
-            for game in games:
-                game_uuid = game['uuid']
-                game_db_id = game['id']
-                week_number = game['week']
-                season_year = game['year']
-                data = None
+            if data.get('status') == 'closed':
+                self.mark_game_final(conn, game['id'], data)
+            
+            conn.commit()
+            self.live_snapshots[game_uuid] = snapshot
+            self.logger.info(f"Live poll committed for game {game_uuid} (status: {data.get('status')})")
+        except Exception as e:
+            self.logger.error(f"Error polling game {game_uuid}: {e}")
+            conn.rollback()
+            self.changed_tables.clear()
+            return
+        finally:
+            self.publish_stats_changes(conn, game)
+        
+        if data.get('status') == 'closed':
+            self.live_snapshots.pop(game_uuid, None)
+
+
+    def run_live(self) -> None:
+        with self.storage.connection() as conn:
+            while self.has_upcoming_live_games(conn):
+                games = self.get_games(conn)
+                conn.commit()
+                self.logger.info(f"Polling {len(games)} games in progress")
                 
-                self.logger.info(f"Processing game {game_uuid} (Week {week_number}, Year {season_year})")
-
-                while True:
-                    try:
-                        url = f"{self.base_url}{self.endpoint_template.format(game_id=game_uuid)}"
-                        data = self.fetch_data(url)
-                        break
-                    except requests.exceptions.HTTPError as e:
-                        if e.response.status_code == 429:
-                            self.logger.warning(f"Rate limit hit for game {game_uuid}, sleeping...")
-                            time.sleep(5) 
-                        else:
-                            self.logger.error(f"HTTP error processing game {game_uuid}: {e}")
-                            break 
+                for game in games:
+                    self.poll_live_game(conn, game)
                 
-                try:
-                    if data is None:
-                        self.logger.error(f"No data retrieved for game {game_uuid}, skipping")
-                        continue
-                    
-                    if os.getenv("ENVIRONMENT", "DEV").upper() == "DEV":
-                        self.save_raw_json(data, "game_stats")
-                    
-                    self.game_id = game_db_id
-                    
-                    self.process_and_insert_all_stats(conn, data)
-                    self.logger.info(f"Completed ingesting player weekly stats for game {game_uuid}")
-
-                    self.logger.info(f"Successfully processed game {game_uuid}")
-                    conn.commit()
-                    self.logger.info(f"Database changes committed for game {game_uuid}")
-                except Exception as e:
-                    self.logger.error(f"Error processing game {game_uuid}: {e}")
-                    conn.rollback()
-                    self.logger.warning(f"Database changes rolled back for game {game_uuid}")
+                time.sleep(self.poll_interval)
             
-            self.logger.info("Player weekly stats processing complete")
+            self.logger.info("No games in progress or starting soon, live polling complete")
+            self.log_run_summary()
 
 
 if __name__ == "__main__":
@@ -845,17 +1126,27 @@ if __name__ == "__main__":
     logging.info(f"Logging to file: {log_filename}")
     
     parser = argparse.ArgumentParser(description='Process NFL player weekly statistics')
-    parser.add_argument('--mode', choices=['week', 'season'], required=True,
-                       help='Processing mode: week (single week), season (full season)')
-    parser.add_argument('--year', type=int, required=True,
+    parser.add_argument('--mode', choices=['week', 'season', 'live'], required=True,
+                       help='Processing mode: week (single week), season (full season), live (poll games in progress)')
+    parser.add_argument('--year', type=int,
                        help='Season year to process (will prompt for confirmation if not current NFL season year)')
     parser.add_argument('--week-num', type=int,
                        help='Week number to process (required for week mode)')
+    parser.add_argument('--poll-interval', type=int, default=60,
+                       help='Seconds between polls in live mode')
+    parser.add_argument('--skip-unchanged', action='store_true',
+                       help='Only write stat rows whose values differ from the stored row')
+    parser.add_argument('--resume', action='store_true',
+                       help='Skip games already ingested by an earlier week or season run that did not finish')
+    add_profile_arguments(parser)
     args = parser.parse_args()
     
     if args.mode == 'week' and args.week_num is None:
         parser.error("--week-num is required when using week mode")
         
+    if args.mode == 'live' and args.year is None:
+        args.year = get_current_nfl_season_year()
+    
     if args.year is None:
         parser.error("--year is required")
     
@@ -892,20 +1183,30 @@ if __name__ == "__main__":
     
     ingestor = PlayerStatsIngestor()
     ingestor.year = args.year
+    ingestor.skip_unchanged = args.skip_unchanged
+    ingestor.resume = args.resume
     
+    ingestor.mode = args.mode
     if args.mode == 'week':
-        ingestor.week_mode = True
-        ingestor.season_mode = False
         ingestor.week = args.week_num
         logging.info(f"Running in WEEK mode for Week {args.week_num}, Year {args.year}")
         print(f"Running in WEEK mode for Week {args.week_num}, Year {args.year}")
     elif args.mode == 'season':
-        ingestor.week_mode = False
-        ingestor.season_mode = True
         logging.info(f"Running in SEASON mode for Year {args.year}")
         print(f"Running in SEASON mode for Year {args.year}")
+    elif args.mode == 'live':
+        ingestor.poll_interval = args.poll_interval
+        logging.info(f"Running in LIVE mode, polling every {args.poll_interval}s")
+        print(f"Running in LIVE mode, polling every {args.poll_interval}s")
+    
+    if args.profile:
+        ingestor.profiler = StageProfiler(profile_dir(log_filename), top=args.profile_top)
     
-    ingestor.run()
+    with ingestor.profiler or nullcontext():
+        if args.mode == 'live':
+            ingestor.run_live()
+        else:
+            ingestor.run()
     
     logging.info("Player stats script execution completed")
     print(f"\nScript execution completed. Full logs saved to: {log_filename}")
\ No newline at end of file
@@ -0,0 +1,257 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import signal
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Thread
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import requests
+from ..config.settings import settings
+from ..storage import get_storage_backend
+from ..utils.change_events import ChangeListener, subscribe
+from ..utils.id_cache import IdCache
+from ..utils.time import utc_now
+from .depth_chart_ingestor import DepthChartIngestor
+from .injuries_ingestor import InjuriesIngestor
+from .player_stats_ingestor import PlayerStatsIngestor
+
+WEDNESDAY, SATURDAY = 2, 5
+
+
+class DailySchedule:
+    """Due once a day at a UTC time of day, optionally only on some weekdays (Monday = 0)."""
+
+    def __init__(self, at: datetime.time, weekdays: Optional[Iterable[int]] = None):
+        self.at = at
+        self.weekdays = set(weekdays) if weekdays is not None else None
+
+    def due_runs(self, storage, now: datetime.datetime, last_started: Optional[datetime.datetime]) -> List[Dict[str, Any]]:
+        if self.weekdays is not None and now.weekday() not in self.weekdays:
+            return []
+        scheduled = datetime.datetime.combine(now.date(), self.at, tzinfo=datetime.timezone.utc)
+        if now < scheduled or (last_started is not None and last_started >= scheduled):
+            return []
+        return [{}]
+
+    def describe(self) -> str:
+        days = "daily" if self.weekdays is None else "weekdays " + ",".join(str(day) for day in sorted(self.weekdays))
+        return f"{days} at {self.at.strftime('%H:%M')} UTC"
+
+
+class GameWindowSchedule:
+    """
+    Due when a game window closes.
+
+    Games in progress (kicked off within window_hours and not closed) are
+    remembered by season and week; once none are left, each remembered
+    week is ingested. Weeks seen before a restart are not remembered.
+    """
+
+    def __init__(self, window_hours: int = 4):
+        self.window_hours = window_hours
+        self.pending_weeks = set()
+
+    def due_runs(self, storage, now: datetime.datetime, last_started: Optional[datetime.datetime]) -> List[Dict[str, Any]]:
+        with storage.connection() as conn:
+            live_games = storage.get_live_games(conn, self.window_hours)
+            conn.commit()
+
+        self.pending_weeks.update((game['year'], game['week']) for game in live_games)
+        if live_games or not self.pending_weeks:
+            return []
+
+        runs = [
+            {'mode': 'week', 'year': year, 'week': week}
+            for year, week in sorted(self.pending_weeks)
+        ]
+        self.pending_weeks.clear()
+        return runs
+
+    def describe(self) -> str:
+        return f"after game windows ({self.window_hours}h from kickoff)"
+
+
+class Job:
+    """One ingestor on a schedule. The ingestor is built once and reused, so its session and caches stay warm."""
+
+    def __init__(self, name: str, factory: Callable[[], Any], schedule):
+        self.name = name
+        self.factory = factory
+        self.schedule = schedule
+        self.ingestor = None
+        self.last_started = None
+        self.last_run = None
+
+    def run(self, params: Dict[str, Any], session: requests.Session, id_cache: IdCache) -> None:
+        if self.ingestor is None:
+            self.ingestor = self.factory()
+            self.ingestor.session = session
+            self.ingestor.id_cache = id_cache
+
+        for attr, value in params.items():
+            setattr(self.ingestor, attr, value)
+
+        logger = logging.getLogger(__name__)
+        logger.info(f"Starting {self.name} {params or ''}")
+        id_cache.begin_run()
+        self.last_started = utc_now()
+        start = time.perf_counter()
+        status, error = "ok", None
+        try:
+            self.ingestor.run()
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error(f"{self.name} failed: {e}")
+
+        self.last_run = {
+            'started_at': self.last_started.isoformat(),
+            'seconds': round(time.perf_counter() - start, 3),
+            'status': status,
+            'error': error,
+            'params': params,
+        }
+        logger.info(f"Finished {self.name} in {self.last_run['seconds']}s ({status})")
+
+    def status(self) -> Dict[str, Any]:
+        return {'schedule': self.schedule.describe(), 'last_run': self.last_run}
+
+
+class IngestionScheduler:
+    """
+    Resident process running the ingestors on their schedules.
+
+    Replaces one cron-started interpreter per run: the storage backend
+    and its connection pool, one HTTP session and the team/player id
+    cache are created once and shared by every job. Jobs run one at a
+    time on the scheduler thread, checked every tick_seconds.
+    """
+
+    def __init__(self, jobs: List[Job], storage=None, tick_seconds: Optional[int] = None):
+        self.jobs = jobs
+        self.storage = storage or get_storage_backend()
+        self.tick_seconds = tick_seconds or settings.SCHEDULER_TICK_SECONDS
+        self.session = requests.Session()
+        self.id_cache = IdCache()
+        self.stopped = Event()
+        self.logger = logging.getLogger(__name__)
+        subscribe(self.id_cache.invalidate)
+
+
+    def tick(self) -> None:
+        now = utc_now()
+        for job in self.jobs:
+            try:
+                runs = job.schedule.due_runs(self.storage, now, job.last_started)
+            except Exception as e:
+                self.logger.error(f"Error checking schedule for {job.name}: {e}")
+                continue
+
+            for params in runs:
+                if self.stopped.is_set():
+                    return
+                job.run(params, self.session, self.id_cache)
+
+
+    def run(self) -> None:
+        listener = ChangeListener(self.storage, self.id_cache.invalidate, tables=['refdata.team'], on_gap=self.id_cache.clear).start()
+        self.logger.info(f"Scheduler started with jobs: {', '.join(job.name for job in self.jobs)}")
+        try:
+            while not self.stopped.is_set():
+                self.tick()
+                self.stopped.wait(self.tick_seconds)
+        finally:
+            listener.stop()
+            self.session.close()
+            self.logger.info("Scheduler stopped")
+
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'jobs': {job.name: job.status() for job in self.jobs},
+            'id_cache': self.id_cache.stats(),
+        }
+
+
+def default_jobs(delta_depth_charts: bool = False) -> List[Job]:
+    return [
+        Job("injuries", InjuriesIngestor, DailySchedule(datetime.time(22, 0), weekdays=range(WEDNESDAY, SATURDAY + 1))),
+        Job("depth_charts", lambda: DepthChartIngestor(delta=delta_depth_charts), DailySchedule(datetime.time(12, 0))),
+        Job("player_stats", PlayerStatsIngestor, GameWindowSchedule()),
+    ]
+
+
+class SchedulerStatusHandler(BaseHTTPRequestHandler):
+    """GET /status: schedule and last run timings per job, plus id cache counters."""
+
+    scheduler: IngestionScheduler = None
+
+    def do_GET(self):
+        if self.path != '/status':
+            status, body = 404, {"error": "Not Found"}
+        else:
+            status, body = 200, self.scheduler.status()
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+
+def serve_status(port: int, scheduler: IngestionScheduler) -> ThreadingHTTPServer:
+    SchedulerStatusHandler.scheduler = scheduler
+    server = ThreadingHTTPServer(("", port), SchedulerStatusHandler)
+    Thread(target=server.serve_forever, name="scheduler-status", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.logs')
+    os.makedirs(logs_dir, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_filename = os.path.join(logs_dir, f'scheduler_{timestamp}.log')
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_filename),
+            logging.StreamHandler()
+        ]
+    )
+
+    logging.info(f"Logging to file: {log_filename}")
+
+    parser = argparse.ArgumentParser(description='Run the ingestors on their schedules in one long-lived process')
+    parser.add_argument('--jobs', nargs='+', choices=['injuries', 'depth_charts', 'player_stats'],
+                       help='Jobs to schedule (default: all)')
+    parser.add_argument('--tick', type=int, default=settings.SCHEDULER_TICK_SECONDS,
+                       help='Seconds between schedule checks')
+    parser.add_argument('--port', type=int, default=settings.SCHEDULER_STATUS_PORT,
+                       help='Port for the /status endpoint (0 to disable)')
+    parser.add_argument('--delta-depth-charts', action='store_true',
+                       help='Store depth charts as week-to-week changes')
+    args = parser.parse_args()
+
+    jobs = [job for job in default_jobs(args.delta_depth_charts) if not args.jobs or job.name in args.jobs]
+    scheduler = IngestionScheduler(jobs, tick_seconds=args.tick)
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stopped.set())
+    server = serve_status(args.port, scheduler) if args.port else None
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.shutdown()
+        if scheduler.storage.name == "postgres":
+            from ..utils.db import close_pool
+            close_pool()
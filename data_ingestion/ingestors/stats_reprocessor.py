@@ -0,0 +1,257 @@
+import argparse
+import datetime
+import logging
+import os
+from collections import defaultdict
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+from ..analytics.defense_trends import DefenseTrends
+from ..storage.base import season_week_columns
+from ..utils.profiling import StageProfiler, add_profile_arguments, profile_dir, profile_stage
+from ..utils.raw_archive import RawArchive
+from .player_stats_ingestor import STAT_CONFIGS, TEAM_STATS_TABLE, PlayerStatsIngestor, key_column, stat_table_configs, stored_data_columns, transform_game_stats
+
+
+def transform_archived_game(task) -> Dict[str, List[Dict[str, Any]]]:
+    """Worker entry point: read one archived payload and transform it, without touching the database."""
+    archive_root, season, entry, game, team_map, stat_types, team_totals = task
+    payload = RawArchive(archive_root).read_entry("game_stats", season, entry)
+    return transform_game_stats(
+        payload, team_map, game['id'], game['year'], game['week'], stat_types,
+        game_teams=(game['home_team_id'], game['away_team_id']),
+        team_totals=team_totals
+    )
+
+
+class StatsReprocessor(PlayerStatsIngestor):
+    """
+    Rebuild player weekly stats from the raw archive instead of the API.
+
+    Payloads are transformed in a process pool, one task per game; the parent
+    resolves player ids for the whole season at once and bulk loads each
+    table with a single storage call. Team totals are rebuilt too unless the
+    run is limited to some stat types. With reload set, each week's rows
+    replace the stored week outright (see StorageBackend.reload_stats_week)
+    instead of being upserted into it. A week is only reloaded when every
+    one of its games in refdata.game was archived and transformed; the
+    rows of any other week are upserted, so the stored rows of a game
+    missing from the archive are never dropped.
+    """
+
+    def __init__(
+        self,
+        seasons: Optional[List[str]] = None,
+        stat_types: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        week: Optional[int] = None,
+        reload: bool = False
+    ):
+        super().__init__()
+        if reload and stat_types is not None:
+            raise ValueError("A reload replaces whole rows, so it needs every stat type")
+        self.seasons = seasons
+        self.week = week
+        self.reload = reload
+        self.stat_types = stat_types or list(STAT_CONFIGS)
+        self.team_totals = stat_types is None
+        self.tables = stat_table_configs(self.stat_types)
+        if self.team_totals:
+            self.tables[TEAM_STATS_TABLE['table_name']] = TEAM_STATS_TABLE
+        self.workers = workers or os.cpu_count()
+        self.logger = logging.getLogger(__name__)
+
+
+    def archived_games(self, conn, season: str) -> List[tuple]:
+        games = {game['uuid']: game for game in self.storage.get_games(conn, int(season))}
+
+        archived = []
+        for entry in self.raw_archive.latest_entries("game_stats", season):
+            game = games.get(entry.game_uuid)
+            if game is None:
+                self.logger.warning(f"Skipping archived game {entry.game_uuid}: not found in refdata.game")
+                continue
+            if self.week is not None and game['week'] != self.week:
+                continue
+            archived.append((game, entry))
+        return archived
+
+
+    def complete_weeks(self, conn, season: str, transformed_game_ids: set) -> set:
+        """(season, week) pairs whose every refdata.game was transformed from the archive."""
+        games_by_week = defaultdict(list)
+        for game in self.storage.get_games(conn, int(season)):
+            if self.week is None or game['week'] == self.week:
+                games_by_week[(game['year'], game['week'])].append(game)
+
+        complete = set()
+        for (season_year, week), games in sorted(games_by_week.items()):
+            missing = [game['uuid'] for game in games if game['id'] not in transformed_game_ids]
+            if missing:
+                self.logger.warning(
+                    f"Season {season_year} week {week}: {len(missing)} of {len(games)} games not archived or not "
+                    f"transformed ({', '.join(missing)}); upserting the week instead of reloading it"
+                )
+            else:
+                complete.add((season_year, week))
+        return complete
+
+
+    @profile_stage("write")
+    def load_rows(self, conn, table_name: str, rows: List[Dict[str, Any]], complete_weeks: Optional[set] = None) -> int:
+        config = self.tables[table_name]
+        data_columns = stored_data_columns(config)
+        all_columns = config['key_columns'] + data_columns
+
+        # One row per key, last archived wins, as with row-by-row upserts
+        unique_rows = {}
+        for row in rows:
+            unique_rows[tuple(row.get(col) for col in config['key_columns'])] = [row.get(col) for col in all_columns]
+
+        upserted = list(unique_rows.values())
+        written = 0
+        if self.reload:
+            # A reload drops the week's stored rows, so only weeks with every game in hand are reloaded
+            season_col, week_col = season_week_columns(config['key_columns'])
+            season_index, week_index = all_columns.index(season_col), all_columns.index(week_col)
+            rows_by_week = defaultdict(list)
+            for values in unique_rows.values():
+                rows_by_week[(values[season_index], values[week_index])].append(values)
+            upserted = []
+            for (season_year, week), week_rows in sorted(rows_by_week.items()):
+                if (season_year, week) not in (complete_weeks or ()):
+                    upserted.extend(week_rows)
+                    continue
+                written += self.storage.reload_stats_week(
+                    conn, config['table_name'], config['key_columns'], data_columns, season_year, week, week_rows
+                )
+            if not upserted:
+                return written
+
+        return written + self.storage.bulk_load_stats(
+            conn,
+            table_name=config['table_name'],
+            key_columns=config['key_columns'],
+            data_columns=data_columns,
+            rows=upserted
+        )
+
+
+    def reprocess_season(self, conn, pool: ProcessPoolExecutor, season: str, team_map: Dict[str, int]) -> None:
+        archived = self.archived_games(conn, season)
+        self.logger.info(f"Reprocessing {len(archived)} archived games for season {season}")
+        if not archived:
+            return
+
+        futures = {
+            pool.submit(transform_archived_game, (self.raw_archive.root, season, entry, game, team_map, self.stat_types, self.team_totals)): game
+            for game, entry in archived
+        }
+
+        rows_by_table = defaultdict(list)
+        transformed_game_ids = set()
+        # The transforms run in the pool, so here this stage is mostly waiting on them
+        with self.stage("transform"):
+            for future in as_completed(futures):
+                game = futures[future]
+                try:
+                    game_rows = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error transforming archived game {game['uuid']}: {e}")
+                    continue
+                transformed_game_ids.add(game['id'])
+                for table_name, rows in game_rows.items():
+                    rows_by_table[table_name].extend(rows)
+
+        complete_weeks = self.complete_weeks(conn, season, transformed_game_ids) if self.reload else None
+
+        try:
+            self.resolve_player_ids(conn, [row for rows in rows_by_table.values() for row in rows])
+
+            changed_tables = defaultdict(set)
+            for table_name, config in self.tables.items():
+                rows = rows_by_table.get(table_name)
+                if not rows:
+                    continue
+                written = self.load_rows(conn, table_name, rows, complete_weeks)
+                self.rows_written += written
+                self.logger.info(f"Loaded {written} {table_name} rows for season {season}")
+
+                team_id_col = key_column(config, 'team_id')
+                changed_tables[table_name].update(row.get(team_id_col) for row in rows)
+
+            with self.stage("write"):
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error loading season {season}: {e}")
+            conn.rollback()
+            raise
+
+        for table_name, team_ids in changed_tables.items():
+            self.publish_change(conn, f"stats.{table_name}", int(season), None, team_ids)
+
+        # Any week may have changed, so the rolling windows are replayed
+        with self.stage("trends"):
+            changed = DefenseTrends(self.storage).rebuild_season(conn, int(season))
+            conn.commit()
+        self.publish_change(conn, 'stats.def_vs_pos_trends', int(season), None, changed)
+
+
+    def run(self) -> None:
+        seasons = self.seasons or [season for season in self.raw_archive.seasons("game_stats") if season.isdigit()]
+        self.logger.info(f"Reprocessing seasons {', '.join(seasons)} with {self.workers} workers")
+
+        with self.storage.connection() as conn, ProcessPoolExecutor(max_workers=self.workers) as pool:
+            team_map = self.get_team_map(conn)
+            conn.commit()
+
+            for season in seasons:
+                self.reprocess_season(conn, pool, season, team_map)
+
+        self.logger.info("Reprocessing complete")
+        self.log_run_summary()
+
+
+if __name__ == "__main__":
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.logs')
+    os.makedirs(logs_dir, exist_ok=True)
+
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_filename = os.path.join(logs_dir, f'stats_reprocessor_{timestamp}.log')
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_filename),
+            logging.StreamHandler()
+        ]
+    )
+
+    logging.info(f"Logging to file: {log_filename}")
+
+    parser = argparse.ArgumentParser(description='Rebuild player weekly statistics from the raw payload archive')
+    parser.add_argument('--seasons', nargs='+',
+                       help='Seasons to reprocess (default: every archived season)')
+    parser.add_argument('--stat-types', nargs='+', choices=list(STAT_CONFIGS),
+                       help='Stat types to reprocess (default: all)')
+    parser.add_argument('--workers', type=int,
+                       help='Worker processes for the transform (default: CPU count)')
+    parser.add_argument('--week-num', type=int,
+                       help='Only reprocess this week of each season')
+    parser.add_argument('--reload', action='store_true',
+                       help='Replace each reprocessed week outright via a staging table instead of upserting; '
+                            'weeks with a game missing from the archive or failing to transform are upserted instead')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.reload and args.stat_types:
+        parser.error("--reload replaces whole rows and cannot be limited to --stat-types")
+
+    reprocessor = StatsReprocessor(seasons=args.seasons, stat_types=args.stat_types, workers=args.workers,
+                                   week=args.week_num, reload=args.reload)
+    if args.profile:
+        # Profiles this process only: transforms in the worker pool show up as waiting in the transform stage
+        reprocessor.profiler = StageProfiler(profile_dir(log_filename), top=args.profile_top)
+    with reprocessor.profiler or nullcontext():
+        reprocessor.run()
@@ -1,5 +1,8 @@
 import os
-from ..utils.db import safe_connection
+import argparse
+import datetime
+from contextlib import nullcontext
+from ..utils.profiling import StageProfiler, add_profile_arguments, profile_stage
 from ..utils.time import utc_now
 from .base_ingestor import BaseIngestor
 
@@ -9,38 +12,22 @@ class TeamIngestor(BaseIngestor):
         self.endpoint = "league/teams.json"
 
 
+    @profile_stage("write")
     def insert_team(self, data):
-        query = """
-            insert into refdata.team 
-            (team_sr_uuid, team_name, team_market, team_abbreviation)
-            values (%s, %s, %s, %s)
-            on conflict (team_sr_uuid) do nothing;
-        """
-
-        with safe_connection() as conn:
+        with self.storage.connection() as conn:
             valid_teams = [
                 team for team in data.get("teams", [])
                 if team.get("name") != "TBD"
             ]
             
-            inserted_count = 0
-            with conn.cursor() as cur:
-                for team in valid_teams:
-                    try:
-                        cur.execute(
-                            query,
-                            (
-                                team["id"],
-                                team["name"],
-                                team["market"],
-                                team["alias"],
-                            ),
-                        )
-                        inserted_count += 1
-                    except Exception as e:
-                        print(f"Error inserting team {team.get('name', 'unknown')}: {e}")
+            try:
+                inserted_count = self.storage.insert_teams(conn, valid_teams)
+            except Exception as e:
+                print(f"Error inserting teams: {e}")
+                raise
             
             conn.commit()
+            self.publish_change(conn, 'refdata.team', None)
             print(f"✅ Inserted {inserted_count} teams out of {len(valid_teams)} valid teams")
 
     def run(self):
@@ -54,5 +41,16 @@ class TeamIngestor(BaseIngestor):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Ingest the NFL league teams')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
     ingestor = TeamIngestor()
-    ingestor.run()
\ No newline at end of file
+    if args.profile:
+        logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.logs')
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        ingestor.profiler = StageProfiler(os.path.join(logs_dir, f'team_ingestor_{timestamp}_profile'), top=args.profile_top)
+    with ingestor.profiler or nullcontext():
+        ingestor.run()
+    if ingestor.profiler:
+        print(f"Profile written to {ingestor.profiler.output_dir}")
\ No newline at end of file
@@ -0,0 +1,234 @@
+import argparse
+import datetime
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from collections import Counter
+from contextlib import nullcontext
+from threading import Event, Thread
+from typing import Any, Dict, List, Optional
+from ..config.settings import settings
+from ..storage import get_storage_backend
+from ..utils.profiling import StageProfiler, add_profile_arguments, profile_dir
+from ..utils.rate_budget import RateBudget
+from ..utils.task_queue import TaskQueue, make_task
+from .depth_chart_ingestor import DepthChartIngestor
+from .player_stats_ingestor import PlayerStatsIngestor
+
+INGESTORS = {
+    "player_stats": PlayerStatsIngestor,
+    "depth_charts": DepthChartIngestor,
+}
+
+logger = logging.getLogger(__name__)
+
+
+class IngestWorker:
+    """
+    Claims queued tasks and runs them, alongside any number of other workers.
+
+    Workers can run on any host that reaches the same Postgres database.
+    Tasks are claimed with FOR UPDATE SKIP LOCKED, so each goes to exactly
+    one worker. While a task runs, a background thread stamps its
+    heartbeat on a second connection. Before each claim the worker puts
+    back tasks whose heartbeat has gone quiet for stale_seconds; a worker
+    that finishes a task it no longer holds discards its writes. Every
+    API request draws on one RateBudget shared by all workers. Failed
+    tasks are retried until they have been attempted max_attempts times.
+    """
+
+    def __init__(
+        self,
+        ingestors: List[str],
+        worker_id: Optional[str] = None,
+        storage=None,
+        heartbeat_seconds: Optional[float] = None,
+        stale_seconds: Optional[float] = None,
+        idle_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.storage = storage or get_storage_backend()
+        if self.storage.name != "postgres":
+            raise ValueError("Ingestion workers coordinate through Postgres; set STORAGE_BACKEND=postgres")
+
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.heartbeat_seconds = heartbeat_seconds or settings.WORKER_HEARTBEAT_SECONDS
+        self.stale_seconds = stale_seconds or settings.WORKER_STALE_SECONDS
+        self.idle_seconds = idle_seconds or settings.WORKER_IDLE_SECONDS
+        self.max_attempts = max_attempts or settings.WORKER_MAX_ATTEMPTS
+        self.rate_budget = RateBudget(self.storage)
+        self.ingestors = {}
+        for name in ingestors:
+            ingestor = INGESTORS[name]()
+            ingestor.rate_budget = self.rate_budget
+            self.ingestors[name] = ingestor
+        self.stopped = Event()
+        self.counts = Counter()
+
+
+    def heartbeat(self, name: str, task: Dict[str, Any], finished: Event) -> None:
+        while not finished.wait(self.heartbeat_seconds):
+            try:
+                with self.storage.connection() as conn:
+                    held = self.storage.heartbeat_task(conn, name, task["key"], self.worker_id)
+                    conn.commit()
+                if not held:
+                    logger.warning(f"Task {name} {task['key']} was requeued while {self.worker_id} was running it")
+                    return
+            except Exception as e:
+                logger.error(f"Heartbeat failed for {name} {task['key']}: {e}")
+
+
+    def run_one(self) -> bool:
+        """Claim and run one task; False when no ingestor has anything to claim."""
+        with self.storage.connection() as conn:
+            for name in self.ingestors:
+                requeued = self.storage.requeue_stale_tasks(conn, name, self.stale_seconds)
+                conn.commit()
+                if requeued:
+                    logger.warning(f"Requeued {requeued} {name} tasks with no heartbeat for {self.stale_seconds}s")
+
+            for name, ingestor in self.ingestors.items():
+                task = ingestor.tasks.claim(conn, self.worker_id, self.max_attempts)
+                if task is None:
+                    continue
+
+                logger.info(f"{self.worker_id} claimed {name} {task['key']} (attempt {task['attempts']})")
+                finished = Event()
+                Thread(target=self.heartbeat, args=(name, task, finished), daemon=True).start()
+                try:
+                    succeeded = ingestor.run_task(conn, task)
+                except Exception as e:
+                    # Raised before the ingestor could record the failure itself, e.g. a dropped connection
+                    logger.error(f"Error running {name} {task['key']}: {e}")
+                    conn.rollback()
+                    ingestor.tasks.failed(conn, task, e)
+                    succeeded = False
+                finally:
+                    finished.set()
+
+                self.counts["done" if succeeded else "failed"] += 1
+                return True
+        return False
+
+
+    def has_open_tasks(self) -> bool:
+        """Whether any task could still be claimed, now or after another worker's task is requeued."""
+        with self.storage.connection() as conn:
+            for name in self.ingestors:
+                for task in self.storage.get_tasks(conn, name):
+                    if task["status"] in ("pending", "running"):
+                        return True
+                    if task["status"] == "failed" and task["attempts"] < self.max_attempts:
+                        return True
+        return False
+
+
+    def run(self, exit_when_idle: bool = False) -> None:
+        logger.info(f"Worker {self.worker_id} started for {', '.join(self.ingestors)}")
+        while not self.stopped.is_set():
+            if self.run_one():
+                continue
+            if exit_when_idle and not self.has_open_tasks():
+                break
+            self.stopped.wait(self.idle_seconds)
+
+        logger.info(
+            f"Worker {self.worker_id} stopped: {self.counts['done']} tasks done, {self.counts['failed']} failed, "
+            f"{self.rate_budget.requests} requests, {self.rate_budget.waited_seconds:.1f}s waiting on the rate budget"
+        )
+
+
+def enqueue(storage, ingestor: str, year: int, week: Optional[int] = None, resume: bool = False) -> int:
+    """Queue a season's (or one week's) tasks for workers; returns the number queued."""
+    with storage.connection() as conn:
+        if ingestor == "player_stats":
+            tasks = [make_task(game['year'], game['week'], game['uuid']) for game in storage.get_games(conn, year, week)]
+        else:
+            tasks = [make_task(year, week_number) for week_number in ([week] if week else range(1, 19))]
+
+        planned = TaskQueue(storage, ingestor).plan(conn, tasks, resume=resume)
+    return sum(1 for task in planned if task["status"] != "done")
+
+
+def setup_logging(log_filename: str) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_filename),
+            logging.StreamHandler()
+        ]
+    )
+
+
+def run_worker_process(ingestors: List[str], exit_when_idle: bool, log_filename: str, profile_top: Optional[int] = None) -> None:
+    setup_logging(log_filename)
+    worker = IngestWorker(ingestors)
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stopped.set())
+
+    # One profile per process, written when the worker stops
+    profiler = None
+    if profile_top is not None:
+        profiler = StageProfiler(f"{profile_dir(log_filename)}_{os.getpid()}", top=profile_top)
+        for ingestor in worker.ingestors.values():
+            ingestor.profiler = profiler
+    with profiler or nullcontext():
+        try:
+            worker.run(exit_when_idle=exit_when_idle)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.logs')
+    os.makedirs(logs_dir, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_filename = os.path.join(logs_dir, f'worker_{timestamp}.log')
+    setup_logging(log_filename)
+
+    logging.info(f"Logging to file: {log_filename}")
+
+    parser = argparse.ArgumentParser(description='Queue ingestion tasks and run workers that claim them from Postgres')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help='Queue tasks for a season or week')
+    enqueue_parser.add_argument('--ingestor', choices=sorted(INGESTORS), required=True)
+    enqueue_parser.add_argument('--year', type=int, required=True, help='Season year')
+    enqueue_parser.add_argument('--week-num', type=int, help='Only queue this week')
+    enqueue_parser.add_argument('--resume', action='store_true',
+                                help='Keep tasks already done instead of resetting them to pending')
+
+    work_parser = subparsers.add_parser('work', help='Claim and run queued tasks')
+    work_parser.add_argument('--ingestors', nargs='+', choices=sorted(INGESTORS), default=sorted(INGESTORS))
+    work_parser.add_argument('--processes', type=int, default=1,
+                             help='Worker processes to start on this host')
+    work_parser.add_argument('--exit-when-idle', action='store_true',
+                             help='Stop once no task is left to claim instead of waiting for more')
+    add_profile_arguments(work_parser)
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        queued = enqueue(get_storage_backend(), args.ingestor, args.year, args.week_num, args.resume)
+        logging.info(f"Queued {queued} {args.ingestor} tasks for {args.year}" + (f" week {args.week_num}" if args.week_num else ""))
+    elif args.processes == 1:
+        run_worker_process(args.ingestors, args.exit_when_idle, log_filename, args.profile_top if args.profile else None)
+    else:
+        # spawn, not fork: each process opens its own connection pool
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=run_worker_process,
+                            args=(args.ingestors, args.exit_when_idle, log_filename, args.profile_top if args.profile else None))
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        signal.signal(signal.SIGTERM, lambda signum, frame: [process.terminate() for process in processes])
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.join()
@@ -0,0 +1,229 @@
+import argparse
+import logging
+import os
+from typing import List, Tuple
+from psycopg import ClientCursor
+from ..analytics.fantasy import fantasy_points_allowed_params, fantasy_points_allowed_query
+from ..ingestors.player_stats_ingestor import STAT_TABLES, TEAM_STATS_TABLE, stored_data_columns
+from ..storage import postgres
+from ..utils.db import safe_connection
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions")
+
+INDEX_SCAN_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+# Row triggers on partitioned tables (0010, 0011) need PostgreSQL 13
+MIN_SERVER_VERSION_NUM = 130000
+
+# Lookups whose index INCLUDEs every column they read; check requires an Index Only Scan for these
+INDEX_ONLY_QUERIES = {
+    "PostgresBackend.get_player_id",
+    "PostgresBackend.get_player_ids",
+    "PostgresBackend.get_team_id",
+    "PostgresBackend.get_week_ids",
+    "PostgresBackend.get_games (week)",
+    "PostgresBackend.get_games (season)",
+    "PostgresBackend.get_live_games",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def get_migration_files() -> List[Tuple[str, str]]:
+    return [
+        (filename.split("_", 1)[0], os.path.join(VERSIONS_DIR, filename))
+        for filename in sorted(os.listdir(VERSIONS_DIR))
+        if filename.endswith(".sql")
+    ]
+
+
+def ensure_migrations_table(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute("""
+            create table if not exists public.schema_migrations (
+                version text primary key,
+                filename text not null,
+                applied_at timestamptz not null default now()
+            )
+        """)
+
+
+def get_applied_versions(conn) -> set:
+    with conn.cursor() as cur:
+        cur.execute("select version from public.schema_migrations")
+        return {row[0] for row in cur.fetchall()}
+
+
+def ensure_server_version(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute("select current_setting('server_version_num')::integer, current_setting('server_version')")
+        version_num, version = cur.fetchone()
+    if version_num < MIN_SERVER_VERSION_NUM:
+        raise RuntimeError(
+            f"PostgreSQL {version} is not supported; the migrations need server_version_num >= {MIN_SERVER_VERSION_NUM}"
+        )
+
+
+def upgrade(conn) -> None:
+    ensure_server_version(conn)
+    ensure_migrations_table(conn)
+    applied = get_applied_versions(conn)
+    conn.commit()
+
+    for version, path in get_migration_files():
+        if version in applied:
+            continue
+
+        logger.info(f"Applying migration {os.path.basename(path)}")
+        with open(path) as f:
+            migration_sql = f.read()
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute(migration_sql)
+                cur.execute(
+                    "insert into public.schema_migrations (version, filename) values (%s, %s)",
+                    (version, os.path.basename(path))
+                )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Migration {os.path.basename(path)} failed: {e}")
+            raise
+
+    logger.info("Schema is up to date")
+
+
+def status(conn) -> None:
+    ensure_migrations_table(conn)
+    applied = get_applied_versions(conn)
+    conn.commit()
+
+    for version, path in get_migration_files():
+        state = "applied" if version in applied else "pending"
+        print(f"{os.path.basename(path)}: {state}")
+
+
+def get_lookup_queries() -> List[Tuple[str, str, tuple]]:
+    """Read and update paths issued through the Postgres backend, with representative parameters."""
+    uuid = "00000000-0000-0000-0000-000000000000"
+    return [
+        ("PostgresBackend.get_player_id", postgres.PLAYER_ID_QUERY, (uuid,)),
+        ("PostgresBackend.get_player_ids", postgres.PLAYER_IDS_QUERY, ([uuid],)),
+        ("PostgresBackend.get_team_id", postgres.TEAM_ID_QUERY, (uuid,)),
+        ("PostgresBackend.get_week_ids", postgres.WEEK_IDS_QUERY, ([uuid],)),
+        ("PostgresBackend.get_games (week)", postgres.GAMES_WEEK_QUERY, (1, 2024)),
+        ("PostgresBackend.get_games (season)", postgres.GAMES_SEASON_QUERY, (2024,)),
+        ("PostgresBackend.get_live_games", postgres.LIVE_GAMES_QUERY, (8,)),
+        ("PostgresBackend.get_depth_chart (one team)", postgres.depth_chart_query(by_team=True), (2024, 1, 1)),
+        ("PostgresBackend.get_depth_chart (all teams)", postgres.depth_chart_query(by_team=False), (2024, 1)),
+        ("PostgresBackend.get_fantasy_points_allowed",
+         fantasy_points_allowed_query('%s'), fantasy_points_allowed_params(2024, 1)),
+        ("PostgresBackend.get_tasks", postgres.get_tasks_query(by_season=True), ("player_stats", 2024)),
+        ("PostgresBackend.start_task", postgres.START_TASK_QUERY, (None, "player_stats", "2024/01")),
+        ("PostgresBackend.finish_task", postgres.finish_task_query(by_worker=False),
+         ("done", None, None, None, "player_stats", "2024/01")),
+        ("PostgresBackend.finish_task (claimed)", postgres.finish_task_query(by_worker=True),
+         ("done", None, None, None, "player_stats", "2024/01", "check")),
+        ("PostgresBackend.claim_task", postgres.CLAIM_TASK_QUERY, ("check", None, "player_stats", 3)),
+        ("PostgresBackend.heartbeat_task", postgres.HEARTBEAT_TASK_QUERY, ("player_stats", "2024/01", "check")),
+        ("PostgresBackend.requeue_stale_tasks", postgres.REQUEUE_STALE_TASKS_QUERY, ("player_stats", 120)),
+    ]
+
+
+def get_conflict_queries() -> List[Tuple[str, str, tuple]]:
+    """Upserts issued through the Postgres backend; each needs a unique index as its arbiter."""
+    uuid = "00000000-0000-0000-0000-000000000000"
+    queries = [
+        ("PostgresBackend.insert_player", postgres.PLAYER_UPSERT_QUERY,
+         ("check", "check", "", None, None, uuid, None)),
+        ("PostgresBackend.insert_teams", postgres.TEAM_INSERT_QUERY, (uuid, "check", "check", "CHK")),
+        ("PostgresBackend.insert_weeks", postgres.WEEK_INSERT_QUERY, (uuid, 2024, "REG", 1, None, None)),
+        ("PostgresBackend.insert_games", postgres.GAME_UPSERT_QUERY,
+         (1, 2024, 1, 2, None, None, None, uuid, None, None)),
+        ("PostgresBackend.insert_depth_charts", postgres.DEPTH_CHART_INSERT_QUERY, (1, 2024, 1, 1, "QB", "QB", 1)),
+        ("PostgresBackend.insert_injuries", postgres.INJURY_INSERT_QUERY,
+         (1, None, 2024, 1, None, None, None, None, None)),
+        ("PostgresBackend.enqueue_tasks", postgres.enqueue_tasks_query(reset=True),
+         ("player_stats", "2024/01", 2024, 1, None)),
+    ]
+
+    for config in list(STAT_TABLES.values()) + [TEAM_STATS_TABLE]:
+        key_columns = config['key_columns']
+        data_columns = stored_data_columns(config)
+        queries.append((
+            f"PostgresBackend.insert_stats ({config['table_name']})",
+            postgres.stats_upsert_query(config['table_name'], key_columns, data_columns, skip_unchanged=True),
+            (1,) * len(key_columns) + (None,) * len(data_columns)
+        ))
+    return queries
+
+
+def explain(conn, query: str, params: tuple) -> str:
+    with ClientCursor(conn) as cur:
+        cur.execute(f"explain {query}", params)
+        return "\n".join(row[0] for row in cur.fetchall())
+
+
+def check(conn) -> bool:
+    """
+    EXPLAIN every ingestor query and confirm it is served by an index.
+
+    Sequential scans are disabled for the check so that small or empty
+    tables in a fresh environment report whether a usable index exists
+    rather than the planner's preference for the current row counts.
+    Bitmap scans are disabled too, so an index that covers a query plans
+    as an Index Only Scan; the queries in INDEX_ONLY_QUERIES must.
+    """
+    ok = True
+
+    with conn.cursor() as cur:
+        cur.execute("set local enable_seqscan = off")
+        cur.execute("set local enable_bitmapscan = off")
+
+    for name, query, params in get_lookup_queries():
+        plan = explain(conn, query, params)
+        if name in INDEX_ONLY_QUERIES and "Index Only Scan" not in plan:
+            ok = False
+            print(f"FAIL  {name}: index does not cover the query\n{plan}")
+        elif any(node in plan for node in INDEX_SCAN_NODES):
+            print(f"OK    {name}")
+        elif "Scan" not in plan:
+            # A partitioned table with no partition for the sample season yet
+            print(f"OK    {name} (no partitions to scan)")
+        else:
+            ok = False
+            print(f"FAIL  {name}: no index scan in plan\n{plan}")
+
+    for name, query, params in get_conflict_queries():
+        plan = explain(conn, query, params)
+        if "Conflict Arbiter Indexes" in plan:
+            print(f"OK    {name}")
+        else:
+            ok = False
+            print(f"FAIL  {name}: no arbiter index for conflict target\n{plan}")
+
+    conn.rollback()
+    return ok
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Manage the ingestion database schema')
+    parser.add_argument('command', choices=['upgrade', 'status', 'check'],
+                        help='upgrade (apply pending migrations), status (list migrations), '
+                             'check (EXPLAIN ingestor queries and confirm index use)')
+    args = parser.parse_args()
+
+    with safe_connection() as conn:
+        if args.command == 'upgrade':
+            upgrade(conn)
+        elif args.command == 'status':
+            status(conn)
+        elif args.command == 'check':
+            if not check(conn):
+                exit(1)
@@ -0,0 +1,98 @@
+-- Reference tables written by TeamIngestor, GamesIngestor, DepthChartIngestor,
+-- InjuriesIngestor and the shared BaseIngestor player helpers.
+--
+-- Sportradar ids are stored as text because the ingestors key their lookup
+-- maps on the raw id strings from the API payloads.
+
+create schema if not exists refdata;
+
+create table if not exists refdata.team (
+    team_id serial primary key,
+    team_sr_uuid text not null,
+    team_name text not null,
+    team_market text,
+    team_abbreviation text,
+    -- get_team_map / team lookups by uuid are answered from the index alone
+    constraint team_sr_uuid_key unique (team_sr_uuid) include (team_id)
+);
+
+create table if not exists refdata.player (
+    player_id serial primary key,
+    player_name text not null,
+    player_first_name text,
+    player_last_name text,
+    player_team_id integer references refdata.team (team_id),
+    player_position text,
+    player_sr_uuid text not null,
+    player_number text,
+    -- get_player_id is an index-only scan
+    constraint player_sr_uuid_key unique (player_sr_uuid) include (player_id)
+);
+
+create table if not exists refdata.week (
+    week_id serial primary key,
+    week_sr_uuid text not null,
+    week_season_year integer not null,
+    week_season_type text not null,
+    week_number integer not null,
+    week_start_date timestamptz,
+    week_end_date timestamptz,
+    constraint week_season_number_key unique (week_season_year, week_season_type, week_number),
+    constraint week_sr_uuid_key unique (week_sr_uuid) include (week_id)
+);
+
+create table if not exists refdata.game (
+    game_id serial primary key,
+    game_week integer not null,
+    game_season_year integer not null,
+    game_home_team_id integer not null references refdata.team (team_id),
+    game_away_team_id integer not null references refdata.team (team_id),
+    game_date timestamptz,
+    game_home_score integer,
+    game_away_score integer,
+    game_sr_uuid text not null,
+    game_week_id integer references refdata.week (week_id),
+    -- Schedule status from GamesIngestor ('scheduled', 'inprogress', 'closed', ...);
+    -- PlayerStatsIngestor live mode sets 'closed' once a polled game ends
+    game_status text,
+    constraint game_week_season_teams_key unique (game_week, game_season_year, game_home_team_id, game_away_team_id),
+    constraint game_sr_uuid_key unique (game_sr_uuid)
+);
+
+-- PlayerStatsIngestor.get_games (week and season modes) as an index-only scan
+create index if not exists game_season_week_idx
+    on refdata.game (game_season_year, game_week)
+    include (game_sr_uuid, game_id);
+
+-- PlayerStatsIngestor.get_games (live mode) only ever looks at open games
+create index if not exists game_open_date_idx
+    on refdata.game (game_date)
+    include (game_sr_uuid, game_id, game_week, game_season_year)
+    where game_status is distinct from 'closed';
+
+create table if not exists refdata.depth_chart_weekly (
+    dc_id serial primary key,
+    dc_team_id integer references refdata.team (team_id),
+    dc_season_year integer not null,
+    dc_week integer not null,
+    dc_player_id integer references refdata.player (player_id),
+    dc_player_position text,
+    dc_player_position_alignment text,
+    dc_rank integer,
+    constraint depth_chart_weekly_key unique (dc_team_id, dc_season_year, dc_week, dc_player_id,
+        dc_player_position, dc_player_position_alignment)
+);
+
+create table if not exists refdata.injury_weekly (
+    inj_id serial primary key,
+    inj_player_id integer not null references refdata.player (player_id),
+    inj_team_id integer references refdata.team (team_id),
+    inj_season_year integer not null,
+    inj_week_number integer not null,
+    inj_status text,
+    inj_status_date timestamptz,
+    inj_primary_injury text,
+    inj_week_id integer references refdata.week (week_id),
+    inj_practice_participation text,
+    constraint injury_weekly_key unique (inj_player_id, inj_season_year, inj_week_number)
+);
@@ -0,0 +1,308 @@
+-- Weekly player stat tables written by PlayerStatsIngestor.insert_stats.
+-- Column sets mirror PlayerStatsIngestor.STAT_CONFIGS.
+--
+-- The *_key constraints are the insert_stats conflict targets. ON CONFLICT
+-- matches the unique index by column set, not order, so their columns are
+-- ordered player, game, season, week, team to lead the arbiter's probe for
+-- each incoming row with the most selective columns.
+
+create schema if not exists stats;
+
+create table if not exists stats.player_stats_weekly_passing (
+    psw_pass_id serial primary key,
+    psw_pass_player_id integer not null references refdata.player (player_id),
+    psw_pass_team_id integer references refdata.team (team_id),
+    psw_pass_game_id integer not null references refdata.game (game_id),
+    psw_pass_season_year integer not null,
+    psw_pass_week_number integer not null,
+    psw_pass_attempts integer,
+    psw_pass_completions integer,
+    psw_pass_yards integer,
+    psw_pass_avg_yards numeric(6, 2),
+    psw_pass_air_yards integer,
+    psw_pass_longest integer,
+    psw_pass_longest_touchdown integer,
+    psw_pass_touchdowns integer,
+    psw_pass_interceptions integer,
+    psw_pass_rz_attempts integer,
+    psw_pass_pick_sixes integer,
+    psw_pass_throw_aways integer,
+    psw_pass_poor_throws integer,
+    psw_pass_on_target_throws integer,
+    psw_pass_defended_passes integer,
+    psw_pass_batted_passes integer,
+    psw_pass_dropped_passes integer,
+    psw_pass_spikes integer,
+    psw_pass_blitzes integer,
+    psw_pass_hurries integer,
+    psw_pass_knockdowns integer,
+    psw_pass_avg_pocket_time numeric(6, 2),
+    psw_pass_net_yards integer,
+    psw_pass_sacks integer,
+    psw_pass_sack_yards integer,
+    psw_pass_created_at timestamptz not null default now(),
+    psw_pass_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_passing_key unique (psw_pass_player_id, psw_pass_game_id, psw_pass_season_year, psw_pass_week_number, psw_pass_team_id)
+);
+
+create index if not exists player_stats_weekly_passing_season_week_idx
+    on stats.player_stats_weekly_passing (psw_pass_season_year, psw_pass_week_number);
+
+create table if not exists stats.player_stats_weekly_rushing (
+    psw_rush_id serial primary key,
+    psw_rush_player_id integer not null references refdata.player (player_id),
+    psw_rush_team_id integer references refdata.team (team_id),
+    psw_rush_game_id integer not null references refdata.game (game_id),
+    psw_rush_season_year integer not null,
+    psw_rush_week_number integer not null,
+    psw_rush_attempts integer,
+    psw_rush_yards integer,
+    psw_rush_avg_yards numeric(6, 2),
+    psw_rush_touchdowns integer,
+    psw_rush_first_downs integer,
+    psw_rush_longest integer,
+    psw_rush_rz_attempts integer,
+    psw_rush_tfl integer,
+    psw_rush_tfl_yards integer,
+    psw_rush_broken_tackles integer,
+    psw_rush_yards_after_contact integer,
+    psw_rush_kneel_downs integer,
+    psw_rush_scrambles integer,
+    psw_rush_fumbles integer,
+    psw_rush_fumbles_lost integer,
+    psw_rush_created_at timestamptz not null default now(),
+    psw_rush_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_rushing_key unique (psw_rush_player_id, psw_rush_game_id, psw_rush_season_year, psw_rush_week_number, psw_rush_team_id)
+);
+
+create index if not exists player_stats_weekly_rushing_season_week_idx
+    on stats.player_stats_weekly_rushing (psw_rush_season_year, psw_rush_week_number);
+
+create table if not exists stats.player_stats_weekly_receiving (
+    psw_rec_id serial primary key,
+    psw_rec_player_id integer not null references refdata.player (player_id),
+    psw_rec_team_id integer references refdata.team (team_id),
+    psw_rec_game_id integer not null references refdata.game (game_id),
+    psw_rec_season_year integer not null,
+    psw_rec_week_number integer not null,
+    psw_rec_receptions integer,
+    psw_rec_yards integer,
+    psw_rec_avg_yards numeric(6, 2),
+    psw_rec_touchdowns integer,
+    psw_rec_first_downs integer,
+    psw_rec_longest integer,
+    psw_rec_longest_touchdown integer,
+    psw_rec_targets integer,
+    psw_rec_rz_targets integer,
+    psw_rec_tfl_yards integer,
+    psw_rec_broken_tackles integer,
+    psw_rec_yards_after_contact integer,
+    psw_rec_yards_after_catch integer,
+    psw_rec_air_yards integer,
+    psw_rec_dropped_passes integer,
+    psw_rec_catchable_passes integer,
+    psw_rec_created_at timestamptz not null default now(),
+    psw_rec_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_receiving_key unique (psw_rec_player_id, psw_rec_game_id, psw_rec_season_year, psw_rec_week_number, psw_rec_team_id)
+);
+
+create index if not exists player_stats_weekly_receiving_season_week_idx
+    on stats.player_stats_weekly_receiving (psw_rec_season_year, psw_rec_week_number);
+
+create table if not exists stats.player_stats_weekly_punting (
+    psw_punt_id serial primary key,
+    psw_punt_player_id integer not null references refdata.player (player_id),
+    psw_punt_team_id integer references refdata.team (team_id),
+    psw_punt_game_id integer not null references refdata.game (game_id),
+    psw_punt_season_year integer not null,
+    psw_punt_week_number integer not null,
+    psw_punt_attempts integer,
+    psw_punt_yards integer,
+    psw_punt_avg_yards numeric(6, 2),
+    psw_punt_net_yards integer,
+    psw_punt_avg_net_yards numeric(6, 2),
+    psw_punt_longest integer,
+    psw_punt_hangtime numeric(6, 2),
+    psw_punt_avg_hangtime numeric(6, 2),
+    psw_punt_blocked integer,
+    psw_punt_touchbacks integer,
+    psw_punt_inside_20 integer,
+    psw_punt_return_yards integer,
+    psw_punt_created_at timestamptz not null default now(),
+    psw_punt_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_punting_key unique (psw_punt_player_id, psw_punt_game_id, psw_punt_season_year, psw_punt_week_number, psw_punt_team_id)
+);
+
+create index if not exists player_stats_weekly_punting_season_week_idx
+    on stats.player_stats_weekly_punting (psw_punt_season_year, psw_punt_week_number);
+
+create table if not exists stats.player_stats_weekly_punt_returns (
+    psw_punt_ret_id serial primary key,
+    psw_punt_ret_player_id integer not null references refdata.player (player_id),
+    psw_punt_ret_team_id integer references refdata.team (team_id),
+    psw_punt_ret_game_id integer not null references refdata.game (game_id),
+    psw_punt_ret_season_year integer not null,
+    psw_punt_ret_week_number integer not null,
+    psw_punt_ret_attempts integer,
+    psw_punt_ret_yards integer,
+    psw_punt_ret_avg_yards numeric(6, 2),
+    psw_punt_ret_touchdowns integer,
+    psw_punt_ret_longest integer,
+    psw_punt_ret_fair_catches integer,
+    psw_punt_ret_created_at timestamptz not null default now(),
+    psw_punt_ret_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_punt_returns_key unique (psw_punt_ret_player_id, psw_punt_ret_game_id, psw_punt_ret_season_year, psw_punt_ret_week_number, psw_punt_ret_team_id)
+);
+
+create index if not exists player_stats_weekly_punt_returns_season_week_idx
+    on stats.player_stats_weekly_punt_returns (psw_punt_ret_season_year, psw_punt_ret_week_number);
+
+create table if not exists stats.player_stats_weekly_kicking (
+    psw_kick_id serial primary key,
+    psw_kick_player_id integer not null references refdata.player (player_id),
+    psw_kick_team_id integer references refdata.team (team_id),
+    psw_kick_game_id integer not null references refdata.game (game_id),
+    psw_kick_season_year integer not null,
+    psw_kick_week_number integer not null,
+    psw_kick_fg_attempts integer,
+    psw_kick_fg_made integer,
+    psw_kick_fg_block integer,
+    psw_kick_fg_yards integer,
+    psw_kick_fg_avg_yards numeric(6, 2),
+    psw_kick_fg_longest integer,
+    psw_kick_fg_net_attempts integer,
+    psw_kick_fg_missed integer,
+    psw_kick_fg_pct numeric(6, 2),
+    psw_kick_fg_attempts_19 integer,
+    psw_kick_fg_attempts_20_to_29 integer,
+    psw_kick_fg_attempts_30_to_39 integer,
+    psw_kick_fg_attempts_40_to_49 integer,
+    psw_kick_fg_attempts_50_or_more integer,
+    psw_kick_fg_made_19 integer,
+    psw_kick_fg_made_20_to_29 integer,
+    psw_kick_fg_made_30_to_39 integer,
+    psw_kick_fg_made_40_to_49 integer,
+    psw_kick_fg_made_50_or_more integer,
+    psw_kick_xp_attempts integer,
+    psw_kick_xp_made integer,
+    psw_kick_xp_blocked integer,
+    psw_kick_xp_missed integer,
+    psw_kick_xp_pct numeric(6, 2),
+    psw_kick_created_at timestamptz not null default now(),
+    psw_kick_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_kicking_key unique (psw_kick_player_id, psw_kick_game_id, psw_kick_season_year, psw_kick_week_number, psw_kick_team_id)
+);
+
+create index if not exists player_stats_weekly_kicking_season_week_idx
+    on stats.player_stats_weekly_kicking (psw_kick_season_year, psw_kick_week_number);
+
+create table if not exists stats.player_stats_weekly_kickoffs (
+    psw_kickoff_id serial primary key,
+    psw_kickoff_player_id integer not null references refdata.player (player_id),
+    psw_kickoff_team_id integer references refdata.team (team_id),
+    psw_kickoff_game_id integer not null references refdata.game (game_id),
+    psw_kickoff_season_year integer not null,
+    psw_kickoff_week_number integer not null,
+    psw_kickoff_attempts integer,
+    psw_kickoff_yards integer,
+    psw_kickoff_avg_yards numeric(6, 2),
+    psw_kickoff_touchbacks integer,
+    psw_kickoff_onside_attempts integer,
+    psw_kickoff_onside_made integer,
+    psw_kickoff_out_of_bounds integer,
+    psw_kickoff_created_at timestamptz not null default now(),
+    psw_kickoff_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_kickoffs_key unique (psw_kickoff_player_id, psw_kickoff_game_id, psw_kickoff_season_year, psw_kickoff_week_number, psw_kickoff_team_id)
+);
+
+create index if not exists player_stats_weekly_kickoffs_season_week_idx
+    on stats.player_stats_weekly_kickoffs (psw_kickoff_season_year, psw_kickoff_week_number);
+
+create table if not exists stats.player_stats_weekly_kick_returns (
+    psw_kick_ret_id serial primary key,
+    psw_kick_ret_player_id integer not null references refdata.player (player_id),
+    psw_kick_ret_team_id integer references refdata.team (team_id),
+    psw_kick_ret_game_id integer not null references refdata.game (game_id),
+    psw_kick_ret_season_year integer not null,
+    psw_kick_ret_week_number integer not null,
+    psw_kick_ret_attempts integer,
+    psw_kick_ret_yards integer,
+    psw_kick_ret_avg_yards numeric(6, 2),
+    psw_kick_ret_touchdowns integer,
+    psw_kick_ret_longest integer,
+    psw_kick_ret_fair_catches integer,
+    psw_kick_ret_created_at timestamptz not null default now(),
+    psw_kick_ret_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_kick_returns_key unique (psw_kick_ret_player_id, psw_kick_ret_game_id, psw_kick_ret_season_year, psw_kick_ret_week_number, psw_kick_ret_team_id)
+);
+
+create index if not exists player_stats_weekly_kick_returns_season_week_idx
+    on stats.player_stats_weekly_kick_returns (psw_kick_ret_season_year, psw_kick_ret_week_number);
+
+create table if not exists stats.player_stats_weekly_defense (
+    psw_def_id serial primary key,
+    psw_def_player_id integer not null references refdata.player (player_id),
+    psw_def_team_id integer references refdata.team (team_id),
+    psw_def_game_id integer not null references refdata.game (game_id),
+    psw_def_season_year integer not null,
+    psw_def_week_number integer not null,
+    psw_def_tackles integer,
+    psw_def_assists integer,
+    psw_def_combined integer,
+    psw_def_sacks numeric(6, 2),
+    psw_def_sack_yards numeric(6, 2),
+    psw_def_interceptions integer,
+    psw_def_passes_defended integer,
+    psw_def_forced_fumbles integer,
+    psw_def_fumble_recoveries integer,
+    psw_def_qb_hits integer,
+    psw_def_tloss integer,
+    psw_def_tloss_yards integer,
+    psw_def_safeties integer,
+    psw_def_sp_tackles integer,
+    psw_def_sp_assists integer,
+    psw_def_sp_forced_fumbles integer,
+    psw_def_sp_fumble_recoveries integer,
+    psw_def_sp_blocks integer,
+    psw_def_misc_tackles integer,
+    psw_def_misc_assists integer,
+    psw_def_misc_forced_fumbles integer,
+    psw_def_misc_fumble_recoveries integer,
+    psw_def_sp_own_fumble_recoveries integer,
+    psw_def_sp_opp_fumble_recoveries integer,
+    psw_def_def_targets integer,
+    psw_def_def_comps integer,
+    psw_def_blitzes integer,
+    psw_def_hurries integer,
+    psw_def_knockdowns integer,
+    psw_def_missed_tackles integer,
+    psw_def_batted_passes integer,
+    psw_def_created_at timestamptz not null default now(),
+    psw_def_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_defense_key unique (psw_def_player_id, psw_def_game_id, psw_def_season_year, psw_def_week_number, psw_def_team_id)
+);
+
+create index if not exists player_stats_weekly_defense_season_week_idx
+    on stats.player_stats_weekly_defense (psw_def_season_year, psw_def_week_number);
+
+create table if not exists stats.player_stats_weekly_fumbles (
+    psw_fum_id serial primary key,
+    psw_fum_player_id integer not null references refdata.player (player_id),
+    psw_fum_team_id integer references refdata.team (team_id),
+    psw_fum_game_id integer not null references refdata.game (game_id),
+    psw_fum_season_year integer not null,
+    psw_fum_week_number integer not null,
+    psw_fum_fumbles integer,
+    psw_fum_lost_fumbles integer,
+    psw_fum_own_rec integer,
+    psw_fum_own_rec_yards integer,
+    psw_fum_opp_rec integer,
+    psw_fum_opp_rec_yards integer,
+    psw_fum_forced_fumbles integer,
+    psw_fum_created_at timestamptz not null default now(),
+    psw_fum_updated_at timestamptz not null default now(),
+    constraint player_stats_weekly_fumbles_key unique (psw_fum_player_id, psw_fum_game_id, psw_fum_season_year, psw_fum_week_number, psw_fum_team_id)
+);
+
+create index if not exists player_stats_weekly_fumbles_season_week_idx
+    on stats.player_stats_weekly_fumbles (psw_fum_season_year, psw_fum_week_number);
@@ -0,0 +1,170 @@
+-- Stamp every weekly stat row with the opposing defense.
+--
+-- PlayerStatsIngestor writes <prefix>_opp_team_id from the game's
+-- home/away pair, so defense-vs-position reads filter or group on it
+-- directly instead of joining back through refdata.game. Existing rows are
+-- backfilled from refdata.game below.
+
+alter table stats.player_stats_weekly_passing
+    add column if not exists psw_pass_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_passing s
+set psw_pass_opp_team_id = case
+        when g.game_home_team_id = s.psw_pass_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_pass_game_id
+and s.psw_pass_opp_team_id is null;
+
+create index if not exists player_stats_weekly_passing_opp_team_idx
+    on stats.player_stats_weekly_passing (psw_pass_opp_team_id, psw_pass_season_year, psw_pass_week_number);
+
+alter table stats.player_stats_weekly_rushing
+    add column if not exists psw_rush_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_rushing s
+set psw_rush_opp_team_id = case
+        when g.game_home_team_id = s.psw_rush_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_rush_game_id
+and s.psw_rush_opp_team_id is null;
+
+create index if not exists player_stats_weekly_rushing_opp_team_idx
+    on stats.player_stats_weekly_rushing (psw_rush_opp_team_id, psw_rush_season_year, psw_rush_week_number);
+
+alter table stats.player_stats_weekly_receiving
+    add column if not exists psw_rec_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_receiving s
+set psw_rec_opp_team_id = case
+        when g.game_home_team_id = s.psw_rec_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_rec_game_id
+and s.psw_rec_opp_team_id is null;
+
+create index if not exists player_stats_weekly_receiving_opp_team_idx
+    on stats.player_stats_weekly_receiving (psw_rec_opp_team_id, psw_rec_season_year, psw_rec_week_number);
+
+alter table stats.player_stats_weekly_punting
+    add column if not exists psw_punt_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_punting s
+set psw_punt_opp_team_id = case
+        when g.game_home_team_id = s.psw_punt_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_punt_game_id
+and s.psw_punt_opp_team_id is null;
+
+create index if not exists player_stats_weekly_punting_opp_team_idx
+    on stats.player_stats_weekly_punting (psw_punt_opp_team_id, psw_punt_season_year, psw_punt_week_number);
+
+alter table stats.player_stats_weekly_punt_returns
+    add column if not exists psw_punt_ret_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_punt_returns s
+set psw_punt_ret_opp_team_id = case
+        when g.game_home_team_id = s.psw_punt_ret_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_punt_ret_game_id
+and s.psw_punt_ret_opp_team_id is null;
+
+create index if not exists player_stats_weekly_punt_returns_opp_team_idx
+    on stats.player_stats_weekly_punt_returns (psw_punt_ret_opp_team_id, psw_punt_ret_season_year, psw_punt_ret_week_number);
+
+alter table stats.player_stats_weekly_kicking
+    add column if not exists psw_kick_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_kicking s
+set psw_kick_opp_team_id = case
+        when g.game_home_team_id = s.psw_kick_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_kick_game_id
+and s.psw_kick_opp_team_id is null;
+
+create index if not exists player_stats_weekly_kicking_opp_team_idx
+    on stats.player_stats_weekly_kicking (psw_kick_opp_team_id, psw_kick_season_year, psw_kick_week_number);
+
+alter table stats.player_stats_weekly_kickoffs
+    add column if not exists psw_kickoff_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_kickoffs s
+set psw_kickoff_opp_team_id = case
+        when g.game_home_team_id = s.psw_kickoff_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_kickoff_game_id
+and s.psw_kickoff_opp_team_id is null;
+
+create index if not exists player_stats_weekly_kickoffs_opp_team_idx
+    on stats.player_stats_weekly_kickoffs (psw_kickoff_opp_team_id, psw_kickoff_season_year, psw_kickoff_week_number);
+
+alter table stats.player_stats_weekly_kick_returns
+    add column if not exists psw_kick_ret_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_kick_returns s
+set psw_kick_ret_opp_team_id = case
+        when g.game_home_team_id = s.psw_kick_ret_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_kick_ret_game_id
+and s.psw_kick_ret_opp_team_id is null;
+
+create index if not exists player_stats_weekly_kick_returns_opp_team_idx
+    on stats.player_stats_weekly_kick_returns (psw_kick_ret_opp_team_id, psw_kick_ret_season_year, psw_kick_ret_week_number);
+
+alter table stats.player_stats_weekly_defense
+    add column if not exists psw_def_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_defense s
+set psw_def_opp_team_id = case
+        when g.game_home_team_id = s.psw_def_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_def_game_id
+and s.psw_def_opp_team_id is null;
+
+create index if not exists player_stats_weekly_defense_opp_team_idx
+    on stats.player_stats_weekly_defense (psw_def_opp_team_id, psw_def_season_year, psw_def_week_number);
+
+alter table stats.player_stats_weekly_fumbles
+    add column if not exists psw_fum_opp_team_id integer references refdata.team (team_id);
+
+update stats.player_stats_weekly_fumbles s
+set psw_fum_opp_team_id = case
+        when g.game_home_team_id = s.psw_fum_team_id then g.game_away_team_id
+        else g.game_home_team_id
+    end
+from refdata.game g
+where g.game_id = s.psw_fum_game_id
+and s.psw_fum_opp_team_id is null;
+
+create index if not exists player_stats_weekly_fumbles_opp_team_idx
+    on stats.player_stats_weekly_fumbles (psw_fum_opp_team_id, psw_fum_season_year, psw_fum_week_number);
+
+-- PlayerStatsIngestor.get_games now also returns each game's home and away
+-- team ids to derive the opponent, so the game indexes from 0001 carry them
+-- too and the week, season and live lookups stay index-only scans.
+drop index if exists refdata.game_season_week_idx;
+create index game_season_week_idx
+    on refdata.game (game_season_year, game_week)
+    include (game_sr_uuid, game_id, game_home_team_id, game_away_team_id);
+
+drop index if exists refdata.game_open_date_idx;
+create index game_open_date_idx
+    on refdata.game (game_date)
+    include (game_sr_uuid, game_id, game_week, game_season_year, game_home_team_id, game_away_team_id)
+    where game_status is distinct from 'closed';
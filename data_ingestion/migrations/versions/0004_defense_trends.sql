@@ -0,0 +1,38 @@
+-- Rolling fantasy-points-allowed metrics written by analytics.defense_trends.
+--
+-- def_vs_pos_trends is read directly by the app, one row per defense,
+-- skill position and week; its primary key serves the per-defense,
+-- per-position season lookups. def_vs_pos_trend_state holds the running
+-- window sums that let each new week be applied without rescanning the
+-- season.
+
+create table if not exists stats.def_vs_pos_trends (
+    dvp_defense_team_id integer not null references refdata.team (team_id),
+    dvp_position text not null,
+    dvp_season_year integer not null,
+    dvp_week_number integer not null,
+    dvp_fantasy_points numeric(6, 2) not null,
+    dvp_avg_3 numeric(6, 2),
+    dvp_avg_5 numeric(6, 2),
+    dvp_season_avg numeric(6, 2),
+    dvp_games integer,
+    -- 1 = fewest fantasy points allowed per game to the position
+    dvp_season_rank integer,
+    dvp_season_z numeric(6, 3),
+    dvp_updated_at timestamptz not null default now(),
+    primary key (dvp_defense_team_id, dvp_position, dvp_season_year, dvp_week_number)
+);
+
+create table if not exists stats.def_vs_pos_trend_state (
+    dvps_defense_team_id integer not null references refdata.team (team_id),
+    dvps_position text not null,
+    dvps_season_year integer not null,
+    dvps_last_week integer,
+    dvps_games integer not null,
+    dvps_season_points numeric(8, 2) not null,
+    dvps_sum_3 numeric(8, 2) not null,
+    dvps_sum_5 numeric(8, 2) not null,
+    -- most recent game first, at most five entries
+    dvps_recent_points numeric(6, 2)[] not null,
+    primary key (dvps_defense_team_id, dvps_position, dvps_season_year)
+);
@@ -0,0 +1,119 @@
+-- Delta-encoded depth charts.
+--
+-- DepthChartIngestor --delta writes only what changed for each team from
+-- one week to the next: a row per (player, position, alignment) whose
+-- rank moved or who joined the chart, and a row with a null rank for
+-- each one who left it. Most of a depth chart is unchanged week to week,
+-- so a season is a fraction of the size of weekly snapshots.
+-- refdata.depth_chart_as_of(season, week) rebuilds the full chart for
+-- any week in the same shape as refdata.depth_chart_weekly.
+
+create table if not exists refdata.depth_chart_change (
+    dcc_id serial primary key,
+    dcc_team_id integer not null references refdata.team (team_id),
+    dcc_season_year integer not null,
+    dcc_week integer not null,
+    dcc_player_id integer not null references refdata.player (player_id),
+    dcc_player_position text,
+    dcc_player_position_alignment text,
+    -- null = removed from the chart this week
+    dcc_rank integer,
+    constraint depth_chart_change_key unique (dcc_team_id, dcc_season_year, dcc_week, dcc_player_id,
+        dcc_player_position, dcc_player_position_alignment)
+);
+
+-- depth_chart_as_of without a team filter reads the season up to a week
+create index if not exists depth_chart_change_season_week_idx
+    on refdata.depth_chart_change (dcc_season_year, dcc_week);
+
+create or replace function refdata.depth_chart_as_of(p_season_year integer, p_week integer)
+returns table (
+    dc_team_id integer,
+    dc_season_year integer,
+    dc_week integer,
+    dc_player_id integer,
+    dc_player_position text,
+    dc_player_position_alignment text,
+    dc_rank integer
+)
+language sql stable
+as $$
+    select dcc_team_id, dcc_season_year, p_week, dcc_player_id,
+        dcc_player_position, dcc_player_position_alignment, dcc_rank
+    from (
+        select distinct on (dcc_team_id, dcc_player_id, dcc_player_position, dcc_player_position_alignment)
+            dcc_team_id, dcc_season_year, dcc_player_id, dcc_player_position,
+            dcc_player_position_alignment, dcc_rank
+        from refdata.depth_chart_change
+        where dcc_season_year = p_season_year
+        and dcc_week <= p_week
+        order by dcc_team_id, dcc_player_id, dcc_player_position, dcc_player_position_alignment, dcc_week desc
+    ) latest
+    where dcc_rank is not null
+$$;
+
+-- Backfill from existing snapshots: each team-week is diffed against the
+-- same team's previous snapshot week. Team-weeks already present in the
+-- change table are left alone, so the migration can be re-run safely.
+insert into refdata.depth_chart_change
+(
+    dcc_team_id,
+    dcc_season_year,
+    dcc_week,
+    dcc_player_id,
+    dcc_player_position,
+    dcc_player_position_alignment,
+    dcc_rank
+)
+with team_weeks as (
+    select dc_team_id, dc_season_year, dc_week,
+        lag(dc_week) over (partition by dc_team_id, dc_season_year order by dc_week) as prev_week
+    from (
+        select distinct dc_team_id, dc_season_year, dc_week
+        from refdata.depth_chart_weekly
+        where dc_team_id is not null
+    ) snapshot_weeks
+),
+current_rows as (
+    select dc.*
+    from team_weeks tw
+    join refdata.depth_chart_weekly dc
+        on dc.dc_team_id = tw.dc_team_id
+        and dc.dc_season_year = tw.dc_season_year
+        and dc.dc_week = tw.dc_week
+    where dc.dc_player_id is not null
+),
+previous_rows as (
+    select tw.dc_week as next_week, dc.*
+    from team_weeks tw
+    join refdata.depth_chart_weekly dc
+        on dc.dc_team_id = tw.dc_team_id
+        and dc.dc_season_year = tw.dc_season_year
+        and dc.dc_week = tw.prev_week
+    where dc.dc_player_id is not null
+)
+select
+    coalesce(cur.dc_team_id, prev.dc_team_id),
+    coalesce(cur.dc_season_year, prev.dc_season_year),
+    coalesce(cur.dc_week, prev.next_week),
+    coalesce(cur.dc_player_id, prev.dc_player_id),
+    coalesce(cur.dc_player_position, prev.dc_player_position),
+    coalesce(cur.dc_player_position_alignment, prev.dc_player_position_alignment),
+    cur.dc_rank
+from current_rows cur
+full join previous_rows prev
+    on prev.dc_team_id = cur.dc_team_id
+    and prev.dc_season_year = cur.dc_season_year
+    and prev.next_week = cur.dc_week
+    and prev.dc_player_id = cur.dc_player_id
+    -- coalesce rather than "is not distinct from": full joins need hashable conditions
+    and coalesce(prev.dc_player_position, '') = coalesce(cur.dc_player_position, '')
+    and coalesce(prev.dc_player_position_alignment, '') = coalesce(cur.dc_player_position_alignment, '')
+where (prev.dc_id is null or cur.dc_id is null or prev.dc_rank is distinct from cur.dc_rank)
+and not exists (
+    select 1
+    from refdata.depth_chart_change existing
+    where existing.dcc_team_id = coalesce(cur.dc_team_id, prev.dc_team_id)
+    and existing.dcc_season_year = coalesce(cur.dc_season_year, prev.dc_season_year)
+    and existing.dcc_week = coalesce(cur.dc_week, prev.next_week)
+);
@@ -0,0 +1,66 @@
+-- Team-level totals per game, written by PlayerStatsIngestor from the same
+-- statistics payload as the player rows (the summary, efficiency,
+-- first_downs, touchdowns and section totals blocks for each side).
+-- Column set mirrors player_stats_ingestor.TEAM_STATS_TABLE.
+
+create table if not exists stats.team_stats_game (
+    tsg_id serial primary key,
+    tsg_team_id integer not null references refdata.team (team_id),
+    tsg_game_id integer not null references refdata.game (game_id),
+    tsg_season_year integer not null,
+    tsg_week_number integer not null,
+    tsg_opp_team_id integer references refdata.team (team_id),
+    tsg_points integer,
+    tsg_possession_seconds integer,
+    tsg_play_count integer,
+    tsg_total_yards integer,
+    tsg_avg_gain numeric(6, 2),
+    tsg_rush_plays integer,
+    tsg_turnovers integer,
+    tsg_fumbles integer,
+    tsg_lost_fumbles integer,
+    tsg_penalties integer,
+    tsg_penalty_yards integer,
+    tsg_return_yards integer,
+    tsg_safeties integer,
+    tsg_touchdowns integer,
+    tsg_first_downs integer,
+    tsg_first_downs_pass integer,
+    tsg_first_downs_rush integer,
+    tsg_first_downs_penalty integer,
+    tsg_third_down_attempts integer,
+    tsg_third_down_successes integer,
+    tsg_fourth_down_attempts integer,
+    tsg_fourth_down_successes integer,
+    tsg_redzone_attempts integer,
+    tsg_redzone_successes integer,
+    tsg_pass_attempts integer,
+    tsg_pass_completions integer,
+    tsg_pass_yards integer,
+    tsg_pass_net_yards integer,
+    tsg_pass_touchdowns integer,
+    tsg_pass_interceptions integer,
+    tsg_pass_sacks integer,
+    tsg_pass_sack_yards integer,
+    tsg_rush_attempts integer,
+    tsg_rush_yards integer,
+    tsg_rush_avg_yards numeric(6, 2),
+    tsg_rush_touchdowns integer,
+    tsg_def_tackles integer,
+    tsg_def_sacks numeric(6, 2),
+    tsg_def_interceptions integer,
+    tsg_def_forced_fumbles integer,
+    tsg_def_fumble_recoveries integer,
+    tsg_def_passes_defended integer,
+    tsg_def_qb_hits integer,
+    tsg_def_tloss numeric(6, 2),
+    tsg_created_at timestamptz not null default now(),
+    tsg_updated_at timestamptz not null default now(),
+    constraint team_stats_game_key unique (tsg_team_id, tsg_game_id, tsg_season_year, tsg_week_number)
+);
+
+create index if not exists team_stats_game_season_week_idx
+    on stats.team_stats_game (tsg_season_year, tsg_week_number);
+
+create index if not exists team_stats_game_opp_team_idx
+    on stats.team_stats_game (tsg_opp_team_id, tsg_season_year, tsg_week_number);
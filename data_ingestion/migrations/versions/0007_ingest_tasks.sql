@@ -0,0 +1,30 @@
+-- Durable work items for season and week runs (utils.task_queue).
+--
+-- PlayerStatsIngestor records one task per game and DepthChartIngestor one
+-- per week. A task is marked done in the same transaction as the rows it
+-- wrote, so after a crash a --resume run skips exactly the work that was
+-- committed and picks up at the first task that is not done.
+
+create schema if not exists ops;
+
+create table if not exists ops.ingest_task (
+    task_id serial primary key,
+    task_ingestor text not null,
+    -- season/week[/game uuid], see task_queue.task_key
+    task_key text not null,
+    task_season_year integer not null,
+    task_week integer,
+    task_game_uuid text,
+    -- pending, running, done or failed
+    task_status text not null default 'pending',
+    task_attempts integer not null default 0,
+    task_started_at timestamptz,
+    task_finished_at timestamptz,
+    task_seconds numeric(10, 3),
+    task_error text,
+    task_created_at timestamptz not null default now(),
+    constraint ingest_task_key unique (task_ingestor, task_key)
+);
+
+create index if not exists ingest_task_season_idx
+    on ops.ingest_task (task_ingestor, task_season_year, task_week);
@@ -0,0 +1,31 @@
+-- Multi-node ingestion workers (ingestors.worker).
+--
+-- Workers on any number of hosts claim pending ops.ingest_task rows with
+-- FOR UPDATE SKIP LOCKED, so no two workers take the same task and none
+-- waits on another's claim. A worker stamps task_heartbeat_at while its
+-- task runs; a running task whose heartbeat has gone quiet is put back
+-- to pending for another worker.
+--
+-- ops.api_rate_budget is a token bucket per API shared by every worker,
+-- so the fleet as a whole stays inside the provider's request quota.
+
+alter table ops.ingest_task
+    add column if not exists task_worker text,
+    add column if not exists task_heartbeat_at timestamptz;
+
+-- claim_task: next claimable task for an ingestor in season/week order
+create index if not exists ingest_task_claim_idx
+    on ops.ingest_task (task_ingestor, task_season_year, task_week, task_id)
+    where task_status in ('pending', 'failed');
+
+-- requeue_stale_tasks
+create index if not exists ingest_task_running_idx
+    on ops.ingest_task (task_heartbeat_at)
+    where task_status = 'running';
+
+create table if not exists ops.api_rate_budget (
+    rb_name text primary key,
+    -- negative while requests are reserved ahead of the refill
+    rb_tokens double precision not null,
+    rb_updated_at timestamptz not null default clock_timestamp()
+);
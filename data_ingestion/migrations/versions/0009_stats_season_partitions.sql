@@ -0,0 +1,104 @@
+-- Partition the weekly player stat tables by season.
+--
+-- Each stats.player_stats_weekly_* table becomes a range-partitioned
+-- table on <prefix>_season_year with one partition per season
+-- (<table>_y<season>), so upserts and season/week reads touch one
+-- season's rows and indexes instead of the whole history.
+-- PostgresBackend creates the partition for a new season before its
+-- first write. With STATS_WEEK_PARTITIONS=true, new season partitions are
+-- themselves partitioned by week (<table>_y<season>_w<week>), which lets
+-- reload_stats_week swap a whole week in with DETACH/ATTACH.
+--
+-- The primary key becomes (<prefix>_id, <prefix>_season_year,
+-- <prefix>_week_number), since a partitioned table's unique constraints
+-- must include every partition key, week included for week partitions;
+-- the *_key conflict targets already do. Indexes, unique and foreign keys
+-- are recreated from the existing definitions, and the id sequences carry
+-- over.
+
+do $$
+declare
+    stats_table record;
+    season_col text;
+    week_col text;
+    id_col text;
+    id_seq text;
+    definitions text[];
+    definition text;
+    season integer;
+begin
+    for stats_table in
+        select c.oid, c.relname
+        from pg_class c
+        join pg_namespace n on n.oid = c.relnamespace
+        where n.nspname = 'stats'
+        and c.relname like 'player\_stats\_weekly\_%'
+        and c.relkind = 'r'
+        and not c.relispartition
+    loop
+        select attname into season_col
+        from pg_attribute
+        where attrelid = stats_table.oid
+        and attname like '%\_season\_year'
+        and not attisdropped;
+
+        select attname into week_col
+        from pg_attribute
+        where attrelid = stats_table.oid
+        and attname like '%\_week\_number'
+        and not attisdropped;
+
+        select a.attname into id_col
+        from pg_index i
+        join pg_attribute a on a.attrelid = i.indrelid and a.attnum = i.indkey[0]
+        where i.indrelid = stats_table.oid
+        and i.indisprimary;
+
+        id_seq := pg_get_serial_sequence(format('stats.%I', stats_table.relname), id_col);
+
+        -- Unique constraints before foreign keys, then the plain indexes
+        select coalesce(array_agg(format('alter table stats.%I add constraint %I %s',
+                stats_table.relname, conname, pg_get_constraintdef(oid)) order by contype desc, conname), '{}')
+        into definitions
+        from pg_constraint
+        where conrelid = stats_table.oid
+        and contype in ('u', 'f');
+
+        select definitions || coalesce(array_agg(pg_get_indexdef(i.indexrelid) order by i.indexrelid), '{}')
+        into definitions
+        from pg_index i
+        where i.indrelid = stats_table.oid
+        and not exists (select 1 from pg_constraint con where con.conindid = i.indexrelid);
+
+        execute format('create table stats.%I (like stats.%I including defaults) partition by range (%I)',
+            stats_table.relname || '_partitioned', stats_table.relname, season_col);
+
+        for season in execute format('select distinct %I from stats.%I', season_col, stats_table.relname)
+        loop
+            execute format('create table stats.%I partition of stats.%I for values from (%s) to (%s)',
+                stats_table.relname || '_y' || season, stats_table.relname || '_partitioned', season, season + 1);
+        end loop;
+
+        execute format('insert into stats.%I select * from stats.%I',
+            stats_table.relname || '_partitioned', stats_table.relname);
+
+        -- The new table's id default still points at the sequence; keep it when the old table goes
+        if id_seq is not null then
+            execute format('alter sequence %s owned by none', id_seq);
+        end if;
+
+        execute format('drop table stats.%I', stats_table.relname);
+        execute format('alter table stats.%I rename to %I', stats_table.relname || '_partitioned', stats_table.relname);
+        execute format('alter table stats.%I add primary key (%I, %I, %I)', stats_table.relname, id_col, season_col, week_col);
+
+        foreach definition in array definitions
+        loop
+            execute definition;
+        end loop;
+
+        if id_seq is not null then
+            execute format('alter sequence %s owned by stats.%I.%I', id_seq, stats_table.relname, id_col);
+        end if;
+    end loop;
+end
+$$;
@@ -0,0 +1,66 @@
+-- Ingestion timestamps for incremental exports (exports.parquet_export).
+--
+-- The export rewrites only the season/week partitions holding rows
+-- written since its last run, found through <prefix>_updated_at. The
+-- refdata tables it exports get that column, and a before-update trigger
+-- on every exported table stamps it, since the stats upserts only set
+-- their data columns. Inserts take the column default. An index on the
+-- column keeps the changed-partition lookup off the table itself.
+--
+-- Before-row triggers on the partitioned stats tables from 0009 need
+-- PostgreSQL 13 or later; migrate.py refuses to run on older servers.
+
+alter table refdata.game add column if not exists game_updated_at timestamptz not null default now();
+alter table refdata.depth_chart_weekly add column if not exists dc_updated_at timestamptz not null default now();
+alter table refdata.depth_chart_change add column if not exists dcc_updated_at timestamptz not null default now();
+alter table refdata.injury_weekly add column if not exists inj_updated_at timestamptz not null default now();
+
+-- tg_argv[0] names the timestamp column
+create or replace function ops.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new := jsonb_populate_record(new, jsonb_build_object(tg_argv[0], now()));
+    return new;
+end
+$$;
+
+do $$
+declare
+    export_table record;
+begin
+    for export_table in
+        select *
+        from (values
+            ('refdata', 'game', 'game_updated_at'),
+            ('refdata', 'depth_chart_weekly', 'dc_updated_at'),
+            ('refdata', 'depth_chart_change', 'dcc_updated_at'),
+            ('refdata', 'injury_weekly', 'inj_updated_at'),
+            ('stats', 'team_stats_game', 'tsg_updated_at'),
+            ('stats', 'def_vs_pos_trends', 'dvp_updated_at')
+        ) tables (schema_name, table_name, column_name)
+        union all
+        -- player_stats_weekly_passing -> psw_pass_updated_at
+        select 'stats', c.relname, a.attname
+        from pg_class c
+        join pg_namespace n on n.oid = c.relnamespace
+        join pg_attribute a on a.attrelid = c.oid
+        where n.nspname = 'stats'
+        and c.relname like 'player\_stats\_weekly\_%'
+        and c.relkind in ('r', 'p')
+        and not c.relispartition
+        and a.attname like '%\_updated\_at'
+        and not a.attisdropped
+    loop
+        execute format('drop trigger if exists %I on %I.%I',
+            export_table.table_name || '_touch_updated_at', export_table.schema_name, export_table.table_name);
+        execute format('create trigger %I before update on %I.%I for each row execute function ops.touch_updated_at(%L)',
+            export_table.table_name || '_touch_updated_at', export_table.schema_name, export_table.table_name,
+            export_table.column_name);
+        execute format('create index if not exists %I on %I.%I (%I)',
+            export_table.table_name || '_updated_at_idx', export_table.schema_name, export_table.table_name,
+            export_table.column_name);
+    end loop;
+end
+$$;
@@ -0,0 +1,72 @@
+-- Deleted rows for incremental exports (exports.parquet_export).
+--
+-- The export finds changed season/week partitions through <prefix>_updated_at,
+-- which a deleted row no longer has. replace_depth_chart_changes, the
+-- stats week reloads and the trend rebuilds all delete rows, so a week that
+-- lost rows and gained none back would keep its old export file. An after
+-- delete trigger on every exported table records the row's season and week
+-- in ops.export_deleted_week, and the export rewrites the weeks recorded
+-- since its watermark along with the updated ones.
+
+create table if not exists ops.export_deleted_week (
+    edw_table text not null,
+    edw_season_year integer not null,
+    edw_week integer not null,
+    edw_deleted_at timestamptz not null default now(),
+    constraint export_deleted_week_key primary key (edw_table, edw_season_year, edw_week)
+);
+
+create index if not exists export_deleted_week_deleted_at_idx
+    on ops.export_deleted_week (edw_table, edw_deleted_at);
+
+-- tg_argv: exported table name (the parent, not the partition), season column, week column
+create or replace function ops.record_deleted_week()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into ops.export_deleted_week (edw_table, edw_season_year, edw_week)
+    values (tg_argv[0], (to_jsonb(old) ->> tg_argv[1])::integer, (to_jsonb(old) ->> tg_argv[2])::integer)
+    on conflict (edw_table, edw_season_year, edw_week) do update
+    set edw_deleted_at = excluded.edw_deleted_at;
+    return old;
+end
+$$;
+
+do $$
+declare
+    export_table record;
+begin
+    for export_table in
+        select *
+        from (values
+            ('refdata', 'game', 'game_season_year', 'game_week'),
+            ('refdata', 'depth_chart_weekly', 'dc_season_year', 'dc_week'),
+            ('refdata', 'depth_chart_change', 'dcc_season_year', 'dcc_week'),
+            ('refdata', 'injury_weekly', 'inj_season_year', 'inj_week_number'),
+            ('stats', 'team_stats_game', 'tsg_season_year', 'tsg_week_number'),
+            ('stats', 'def_vs_pos_trends', 'dvp_season_year', 'dvp_week_number')
+        ) tables (schema_name, table_name, season_column, week_column)
+        union all
+        -- psw_pass_updated_at -> psw_pass_season_year, psw_pass_week_number
+        select 'stats', c.relname,
+            replace(a.attname, '_updated_at', '_season_year'),
+            replace(a.attname, '_updated_at', '_week_number')
+        from pg_class c
+        join pg_namespace n on n.oid = c.relnamespace
+        join pg_attribute a on a.attrelid = c.oid
+        where n.nspname = 'stats'
+        and c.relname like 'player\_stats\_weekly\_%'
+        and c.relkind in ('r', 'p')
+        and not c.relispartition
+        and a.attname like '%\_updated\_at'
+        and not a.attisdropped
+    loop
+        execute format('drop trigger if exists %I on %I.%I',
+            export_table.table_name || '_record_deleted_week', export_table.schema_name, export_table.table_name);
+        execute format('create trigger %I after delete on %I.%I for each row execute function ops.record_deleted_week(%L, %L, %L)',
+            export_table.table_name || '_record_deleted_week', export_table.schema_name, export_table.table_name,
+            export_table.schema_name || '.' || export_table.table_name, export_table.season_column, export_table.week_column);
+    end loop;
+end
+$$;
@@ -0,0 +1,102 @@
+from collections import OrderedDict, defaultdict
+from threading import Event, Lock
+from typing import Any, Callable, Hashable, Iterable
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with tag-based invalidation.
+
+    Every entry carries tags; invalidate(tags) drops all entries sharing
+    any of them. Concurrent misses on one key run the loader once and the
+    other callers wait for its result. A load that overlaps an
+    invalidation of one of its tags is returned to the caller but not
+    stored, so a stale read can never outlive the invalidation.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.tag_keys = defaultdict(set)
+        self.tag_generations = defaultdict(int)
+        self.epoch = 0
+        self.loading = {}
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key: Hashable, tags: Iterable[Hashable], loader: Callable[[], Any]) -> Any:
+        tags = tuple(tags)
+        while True:
+            with self.lock:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return self.entries[key][0]
+
+                in_flight = self.loading.get(key)
+                if in_flight is None:
+                    in_flight = self.loading[key] = Event()
+                    generations = self.generations(tags)
+                    self.misses += 1
+                    break
+            in_flight.wait()
+
+        try:
+            value = loader()
+            with self.lock:
+                if generations == self.generations(tags):
+                    self.store(key, value, tags)
+            return value
+        finally:
+            with self.lock:
+                del self.loading[key]
+            in_flight.set()
+
+    def generations(self, tags: tuple) -> tuple:
+        return (self.epoch,) + tuple(self.tag_generations[tag] for tag in tags)
+
+    def store(self, key: Hashable, value: Any, tags: tuple) -> None:
+        self.discard(key)
+        self.entries[key] = (value, tags)
+        for tag in tags:
+            self.tag_keys[tag].add(key)
+
+        while len(self.entries) > self.max_entries:
+            self.discard(next(iter(self.entries)))
+
+    def discard(self, key: Hashable) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self.tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_keys[tag]
+
+    def invalidate(self, tags: Iterable[Hashable]) -> int:
+        dropped = 0
+        with self.lock:
+            for tag in tags:
+                self.tag_generations[tag] += 1
+                for key in list(self.tag_keys.get(tag, ())):
+                    self.discard(key)
+                    dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        with self.lock:
+            self.epoch += 1
+            self.entries.clear()
+            self.tag_keys.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,165 @@
+import argparse
+import json
+import logging
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+from ..analytics.fantasy import SKILL_POSITIONS
+from ..config.settings import settings
+from ..storage import get_storage_backend
+from ..utils.change_events import ChangeListener, subscribe
+from ..utils.time import get_current_nfl_season_year
+from .cache import LRUCache
+
+
+def to_api_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        col[len('dvp_'):]: float(value) if isinstance(value, Decimal) else value
+        for col, value in row.items()
+    }
+
+
+class DefenseVsPositionService:
+    """
+    Defense-vs-position reads served from an in-process cache.
+
+    One cache entry holds a defense's whole season for one position (at
+    most one row per week), and any week range is sliced from it, so the
+    number of distinct queries does not fragment the cache. Entries are
+    tagged (team_id, season_year) and dropped when a change event for
+    stats.def_vs_pos_trends names that team and season, whether it was
+    published in this process or, once listen() is called, in another.
+    """
+
+    TABLE = 'stats.def_vs_pos_trends'
+
+    def __init__(self, storage=None, max_entries: Optional[int] = None):
+        self.storage = storage or get_storage_backend()
+        self.cache = LRUCache(max_entries or settings.READ_CACHE_MAX_ENTRIES)
+        self.logger = logging.getLogger(__name__)
+        self.listener = None
+        subscribe(self.invalidate)
+
+
+    def listen(self) -> ChangeListener:
+        self.listener = ChangeListener(self.storage, self.invalidate, tables=[self.TABLE], on_gap=self.cache.clear)
+        return self.listener.start()
+
+
+    def invalidate(self, event) -> None:
+        if event.table != self.TABLE:
+            return
+        if not event.team_ids:
+            self.cache.clear()
+            self.logger.info(f"Cleared cache for season-wide change to {event.table}")
+            return
+
+        dropped = self.cache.invalidate((team_id, event.season) for team_id in event.team_ids)
+        self.logger.info(f"Invalidated {dropped} cached seasons for {len(event.team_ids)} teams in season {event.season}")
+
+
+    def load_season(self, defense_team_id: int, position: str, season_year: int) -> List[Dict[str, Any]]:
+        with self.storage.connection() as conn:
+            rows = self.storage.get_defense_trends(conn, season_year, defense_team_id, position)
+        return [to_api_row(row) for row in rows]
+
+
+    def season_rows(self, defense_team_id: int, position: str, season_year: int) -> List[Dict[str, Any]]:
+        return self.cache.get_or_load(
+            (defense_team_id, position, season_year),
+            [(defense_team_id, season_year)],
+            lambda: self.load_season(defense_team_id, position, season_year)
+        )
+
+
+    def query(
+        self,
+        defense_team_id: int,
+        position: str,
+        season_year: int,
+        week_from: Optional[int] = None,
+        week_to: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        if position not in SKILL_POSITIONS:
+            raise ValueError(f"Invalid Skill Position: {position}")
+
+        return [
+            row for row in self.season_rows(defense_team_id, position, season_year)
+            if (week_from is None or row['week_number'] >= week_from)
+            and (week_to is None or row['week_number'] <= week_to)
+        ]
+
+
+class DefenseVsPositionHandler(BaseHTTPRequestHandler):
+    """
+    GET /def-vs-pos?defTeamId=1&skillPos=RB[&season=2024][&weekFrom=1][&weekTo=8]
+    GET /cache-stats
+    """
+
+    service: DefenseVsPositionService = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == '/cache-stats':
+            return self.send_json(self.service.cache.stats())
+        if url.path != '/def-vs-pos':
+            return self.send_json({"error": "Not Found"}, status=404)
+
+        try:
+            def_team_id = int(params['defTeamId'])
+            season_year = int(params.get('season') or get_current_nfl_season_year())
+            week_from = int(params['weekFrom']) if 'weekFrom' in params else None
+            week_to = int(params['weekTo']) if 'weekTo' in params else None
+        except (KeyError, ValueError):
+            return self.send_json({"error": "defTeamId is required; defTeamId, season, weekFrom and weekTo must be integers"}, status=400)
+
+        try:
+            rows = self.service.query(def_team_id, params.get('skillPos'), season_year, week_from, week_to)
+        except ValueError as e:
+            return self.send_json({"error": str(e)}, status=400)
+        except Exception as e:
+            self.service.logger.error(f"Error serving {self.path}: {e}")
+            return self.send_json({"error": "Internal Server Error"}, status=500)
+
+        self.send_json(rows)
+
+    def send_json(self, body, status=200):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+
+def serve(port: int, service: Optional[DefenseVsPositionService] = None) -> ThreadingHTTPServer:
+    DefenseVsPositionHandler.service = service or DefenseVsPositionService()
+    return ThreadingHTTPServer(("", port), DefenseVsPositionHandler)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Serve cached defense-vs-position queries over HTTP')
+    parser.add_argument('--port', type=int, default=settings.READ_SERVICE_PORT, help='Port to listen on')
+    args = parser.parse_args()
+
+    service = DefenseVsPositionService()
+    service.listen()
+    server = serve(args.port, service)
+    logging.info(f"Defense-vs-position service listening on port {args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,261 @@
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+from ..config.settings import settings
+from ..utils.raw_archive import RawArchive
+
+logger = logging.getLogger(__name__)
+
+# Matched against the end of the request path, so any NFL_BASE_API_URL prefix works
+ROUTES = [
+    ("teams", re.compile(r"/league/teams\.json$")),
+    ("games", re.compile(r"/games/(?P<year>\d{4})/REG/schedule\.json$")),
+    ("depth_charts", re.compile(r"/seasons/(?P<year>\d{4})/REG/(?P<week>\d{1,2})/depth_charts\.json$")),
+    ("injuries", re.compile(r"/seasons/(?P<year>\d{4})/REG/(?P<week>\d{1,2})/injuries\.json$")),
+    ("game_stats", re.compile(r"/games/(?P<game_id>[0-9a-f-]{36})/statistics\.json$")),
+]
+
+
+class MockSportradarConfig:
+    """
+    Fault injection for the mock API; all probabilities are per request.
+
+    latency_ms and jitter_ms delay every response by latency plus a
+    uniform draw from +/- jitter. rate_limit_per_second, when set, is a
+    token bucket in front of the routes that answers 429 with a
+    Retry-After once it is drained, like the provider's QPS cap;
+    throttle_rate adds random 429s on top. error_rate answers 500 or 503.
+    seed makes the draws reproducible for a single client thread.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_per_second: float = 0.0,
+        rate_limit_burst: int = 1,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.rate_limit_per_second = rate_limit_per_second
+        self.rate_limit_burst = rate_limit_burst
+        self.seed = seed
+
+
+class MockSportradar:
+    """
+    Serves recorded API payloads from the raw archive (see utils.raw_archive).
+
+    Every payload the ingestors archived in DEV can be replayed: the
+    latest one per season, week and game answers the matching route.
+    A fixtures directory laid out like the API paths, e.g.
+    <fixtures>/league/teams.json, is checked first and overrides the
+    archive. Requests without a recording get a 404.
+    """
+
+    def __init__(self, config: Optional[MockSportradarConfig] = None, archive_root: str = ".data", fixtures_dir: Optional[str] = None):
+        self.config = config or MockSportradarConfig()
+        self.archive = RawArchive(archive_root)
+        self.fixtures_dir = fixtures_dir
+        self.random = random.Random(self.config.seed)
+        self.lock = Lock()
+        self.tokens = float(self.config.rate_limit_burst)
+        self.refilled_at = time.monotonic()
+        self.counts = Counter()
+        self.game_seasons = self.index_game_stats()
+        self.payloads = {}
+
+    def index_game_stats(self) -> Dict[str, str]:
+        """Season of every archived game, since the statistics route only carries the game id."""
+        game_seasons = {}
+        for season in self.archive.seasons("game_stats"):
+            for entry in self.archive.entries("game_stats", season):
+                if entry.game_uuid:
+                    game_seasons[entry.game_uuid] = season
+        return game_seasons
+
+    def route(self, path: str) -> Tuple[Optional[str], Dict[str, str]]:
+        path = re.sub(r"/{2,}", "/", path)
+        for endpoint, pattern in ROUTES:
+            match = pattern.search(path)
+            if match:
+                return endpoint, match.groupdict()
+        return None, {}
+
+    def fixture(self, path: str) -> Optional[Any]:
+        if not self.fixtures_dir:
+            return None
+        for prefix_length in range(len(path.strip("/").split("/"))):
+            relative = "/".join(path.strip("/").split("/")[prefix_length:])
+            fixture_path = os.path.join(self.fixtures_dir, relative)
+            if os.path.isfile(fixture_path):
+                with open(fixture_path) as f:
+                    return json.load(f)
+        return None
+
+    def recorded(self, endpoint: str, params: Dict[str, str]) -> Optional[Any]:
+        if endpoint == "teams":
+            key = (endpoint, None, None, None)
+        elif endpoint == "game_stats":
+            season = self.game_seasons.get(params["game_id"])
+            if season is None:
+                return None
+            key = (endpoint, season, None, params["game_id"])
+        else:
+            key = (endpoint, params["year"], int(params["week"]) if "week" in params else None, None)
+
+        if key not in self.payloads:
+            _, season, week, game_uuid = key
+            self.payloads[key] = self.archive.read(endpoint, season, week=week, game_uuid=game_uuid)
+        return self.payloads[key]
+
+    def take_token(self) -> float:
+        """0 if the request fits the rate limit, otherwise seconds until a token is free."""
+        if not self.config.rate_limit_per_second:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                float(self.config.rate_limit_burst),
+                self.tokens + (now - self.refilled_at) * self.config.rate_limit_per_second
+            )
+            self.refilled_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.config.rate_limit_per_second
+
+    def respond(self, path: str) -> Tuple[int, Any, Dict[str, str]]:
+        """Status, JSON body and extra headers for one request, after the configured delay."""
+        with self.lock:
+            delay = self.config.latency_ms + self.random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+            throttled = self.random.random() < self.config.throttle_rate
+            failed = self.random.random() < self.config.error_rate
+            error_status = self.random.choice((500, 503))
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        retry_after = self.take_token()
+        if retry_after or throttled:
+            self.count("throttled")
+            return 429, {"message": "Too Many Requests"}, {"Retry-After": str(max(1, round(retry_after)))}
+        if failed:
+            self.count("errors")
+            return error_status, {"message": "Injected error"}, {}
+
+        endpoint, params = self.route(urlparse(path).path)
+        if endpoint is None:
+            self.count("not_found")
+            return 404, {"message": "Unknown route"}, {}
+
+        payload = self.fixture(urlparse(path).path)
+        if payload is None:
+            payload = self.recorded(endpoint, params)
+        if payload is None:
+            self.count("not_found")
+            return 404, {"message": f"No recorded {endpoint} payload"}, {}
+
+        self.count(endpoint)
+        return 200, payload, {}
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counts["requests"] += 1
+            self.counts[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+
+class MockSportradarHandler(BaseHTTPRequestHandler):
+    """
+    GET <any prefix>/league/teams.json, games/{year}/REG/schedule.json,
+    seasons/{year}/REG/{week}/depth_charts.json, seasons/{year}/REG/{week}/injuries.json,
+    games/{id}/statistics.json
+    GET /_mock/stats
+    """
+
+    mock: MockSportradar = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == '/_mock/stats':
+            return self.send_json(200, self.mock.stats())
+        status, body, headers = self.mock.respond(self.path)
+        self.send_json(status, body, headers)
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+
+def serve(port: int, mock: Optional[MockSportradar] = None) -> ThreadingHTTPServer:
+    MockSportradarHandler.mock = mock or MockSportradar()
+    return ThreadingHTTPServer(("", port), MockSportradarHandler)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description='Serve recorded Sportradar payloads locally; point NFL_BASE_API_URL at http://localhost:<port>/'
+    )
+    parser.add_argument('--port', type=int, default=settings.MOCK_API_PORT, help='Port to listen on')
+    parser.add_argument('--archive-root', default='.data', help='Raw archive to replay')
+    parser.add_argument('--fixtures-dir', help='JSON files laid out like the API paths, served before the archive')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Uniform +/- variation on the delay')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered 429 at random')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 500/503')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='Requests per second before answering 429 with Retry-After (0 for no limit)')
+    parser.add_argument('--rate-limit-burst', type=int, default=1, help='Requests allowed at once under --rate-limit')
+    parser.add_argument('--seed', type=int, help='Seed for latency, throttle and error draws')
+    args = parser.parse_args()
+
+    config = MockSportradarConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        rate_limit_per_second=args.rate_limit,
+        rate_limit_burst=args.rate_limit_burst,
+        seed=args.seed
+    )
+    mock = MockSportradar(config, archive_root=args.archive_root, fixtures_dir=args.fixtures_dir)
+    server = serve(args.port, mock)
+    logging.info(f"Mock Sportradar API listening on port {args.port} ({len(mock.game_seasons)} archived games)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logging.info(f"Mock Sportradar API stats: {mock.stats()}")
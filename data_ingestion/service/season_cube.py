@@ -0,0 +1,247 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import numpy as np
+from ..analytics.fantasy import SKILL_POSITIONS
+from ..config.settings import settings
+from ..storage import get_storage_backend
+from ..storage.base import DEFENSE_TREND_COLUMNS
+from ..utils.change_events import ChangeListener
+
+TRENDS_TABLE = 'stats.def_vs_pos_trends'
+
+# Stat axis: the trend columns after the (defense, position, season, week) key
+CUBE_COLUMNS = DEFENSE_TREND_COLUMNS[4:]
+CUBE_STATS = [col[len('dvp_'):] for col in CUBE_COLUMNS]
+INTEGER_STATS = ('games', 'season_rank')
+
+logger = logging.getLogger(__name__)
+
+
+def index_path(root: str, season_year: int) -> str:
+    return os.path.join(root, f"{season_year}.json")
+
+
+def export_season(storage, season_year: int, root: Optional[str] = None) -> Optional[str]:
+    """
+    Pack a season's defense trends into <root>/<season>.<generation>.npy.
+
+    The array is float64 shaped (defense, week, position, stat), with NaN
+    where a defense has no row (bye weeks, weeks not played yet). The index
+    <root>/<season>.json names the array file and the team ids, weeks,
+    positions and stats along each axis. A new generation is written next
+    to the old one and the index is swapped in with a rename, so readers
+    never pair an index with the wrong array; older arrays are unlinked,
+    which leaves existing mappings of them readable.
+    """
+    root = root or settings.SEASON_CUBE_DIR
+    with storage.connection() as conn:
+        rows = storage.get_season_defense_trends(conn, season_year)
+    if not rows:
+        logger.info(f"No defense trends for season {season_year}; nothing to export")
+        return None
+
+    teams = sorted({row['dvp_defense_team_id'] for row in rows})
+    weeks = list(range(1, max(row['dvp_week_number'] for row in rows) + 1))
+    team_index = {team_id: i for i, team_id in enumerate(teams)}
+    position_index = {position: i for i, position in enumerate(SKILL_POSITIONS)}
+
+    values = np.full((len(teams), len(weeks), len(SKILL_POSITIONS), len(CUBE_STATS)), np.nan)
+    for row in rows:
+        position = position_index.get(row['dvp_position'])
+        if position is None:
+            continue
+        values[team_index[row['dvp_defense_team_id']], row['dvp_week_number'] - 1, position] = [
+            np.nan if row[col] is None else float(row[col]) for col in CUBE_COLUMNS
+        ]
+
+    os.makedirs(root, exist_ok=True)
+    generation = time.time_ns()
+    array_name = f"{season_year}.{generation}.npy"
+    np.save(os.path.join(root, array_name), values)
+
+    index = {
+        "season_year": season_year,
+        "array": array_name,
+        "shape": list(values.shape),
+        "teams": teams,
+        "weeks": weeks,
+        "positions": list(SKILL_POSITIONS),
+        "stats": CUBE_STATS,
+    }
+    path = index_path(root, season_year)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(index, f)
+    os.replace(f"{path}.tmp", path)
+
+    for old in glob.glob(os.path.join(root, f"{season_year}.*.npy")):
+        if os.path.basename(old) != array_name:
+            os.remove(old)
+
+    logger.info(f"Exported season {season_year} cube {values.shape} to {os.path.join(root, array_name)}")
+    return os.path.join(root, array_name)
+
+
+class SeasonCube:
+    """
+    One season's exported trends, memory-mapped read-only.
+
+    Every process that opens the same file shares its pages through the
+    OS page cache. slice() uses basic indexing only, so what it returns is
+    a view into the mapping and nothing is copied or read until used.
+    """
+
+    def __init__(self, root: str, season_year: int):
+        with open(index_path(root, season_year)) as f:
+            self.index = json.load(f)
+        self.season_year = season_year
+        self.values = np.load(os.path.join(root, self.index["array"]), mmap_mode='r')
+        self.teams = {team_id: i for i, team_id in enumerate(self.index["teams"])}
+        self.positions = {position: i for i, position in enumerate(self.index["positions"])}
+        self.stats = {stat: i for i, stat in enumerate(self.index["stats"])}
+        self.first_week = self.index["weeks"][0] if self.index["weeks"] else 1
+
+    def week_range(self, week_from: Optional[int], week_to: Optional[int]) -> slice:
+        start = max(0, (week_from or self.first_week) - self.first_week)
+        stop = len(self.index["weeks"]) if week_to is None else max(start, week_to - self.first_week + 1)
+        return slice(start, stop)
+
+    def slice(
+        self,
+        defense_team_id: Optional[int] = None,
+        position: Optional[str] = None,
+        week_from: Optional[int] = None,
+        week_to: Optional[int] = None,
+        stat: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        View of the cube; each argument left as None keeps its whole axis.
+
+        Raises KeyError for a defense, position or stat not in the cube.
+        """
+        return self.values[
+            slice(None) if defense_team_id is None else self.teams[defense_team_id],
+            self.week_range(week_from, week_to),
+            slice(None) if position is None else self.positions[position],
+            slice(None) if stat is None else self.stats[stat],
+        ]
+
+    def rows(
+        self,
+        defense_team_id: int,
+        position: str,
+        week_from: Optional[int] = None,
+        week_to: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """The rows DefenseVsPositionService.query returns, read from the cube."""
+        if defense_team_id not in self.teams:
+            return []
+        weeks = self.week_range(week_from, week_to)
+        rows = []
+        for offset, values in enumerate(self.slice(defense_team_id, position, week_from, week_to)):
+            if np.isnan(values[self.stats['fantasy_points']]):
+                continue
+            row = {
+                'defense_team_id': defense_team_id,
+                'position': position,
+                'season_year': self.season_year,
+                'week_number': self.index["weeks"][weeks.start + offset],
+            }
+            for stat, value in zip(self.index["stats"], values.tolist()):
+                if value != value:
+                    row[stat] = None
+                else:
+                    row[stat] = int(value) if stat in INTEGER_STATS else value
+            rows.append(row)
+        return rows
+
+
+class SeasonCubes:
+    """
+    Open cubes per season for a long-running reader such as an API worker.
+
+    Each get() stats the season's index file and reopens the cube when a
+    new export has replaced it; otherwise the open mapping is reused.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.SEASON_CUBE_DIR
+        self.cubes = {}
+        self.lock = Lock()
+
+    def get(self, season_year: int) -> Optional[SeasonCube]:
+        try:
+            stamp = os.stat(index_path(self.root, season_year)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self.lock:
+            opened = self.cubes.get(season_year)
+            if opened is None or opened[0] != stamp:
+                try:
+                    cube = SeasonCube(self.root, season_year)
+                except FileNotFoundError:
+                    # The array named by the index was replaced by an export in between; read the new index
+                    cube = SeasonCube(self.root, season_year)
+                opened = (os.stat(index_path(self.root, season_year)).st_mtime_ns, cube)
+                self.cubes[season_year] = opened
+            return opened[1]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Export defense trends as memory-mapped season cubes, or query them')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Export seasons to cubes')
+    export_parser.add_argument('--seasons', type=int, nargs='+', required=True)
+    export_parser.add_argument('--root', default=settings.SEASON_CUBE_DIR, help='Cube directory')
+
+    watch_parser = subparsers.add_parser('watch', help=f'Re-export a season whenever {TRENDS_TABLE} changes')
+    watch_parser.add_argument('--root', default=settings.SEASON_CUBE_DIR, help='Cube directory')
+
+    query_parser = subparsers.add_parser('query', help='Print a defense\'s rows from a cube')
+    query_parser.add_argument('--season', type=int, required=True)
+    query_parser.add_argument('--def-team-id', type=int, required=True)
+    query_parser.add_argument('--position', choices=list(SKILL_POSITIONS), required=True)
+    query_parser.add_argument('--week-from', type=int)
+    query_parser.add_argument('--week-to', type=int)
+    query_parser.add_argument('--root', default=settings.SEASON_CUBE_DIR, help='Cube directory')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        storage = get_storage_backend()
+        for season_year in args.seasons:
+            export_season(storage, season_year, args.root)
+    elif args.command == 'watch':
+        storage = get_storage_backend()
+
+        def on_change(event):
+            if event.season is not None:
+                export_season(storage, event.season, args.root)
+
+        def on_gap():
+            # Changes may have been missed while reconnecting; refresh every exported season
+            for path in glob.glob(os.path.join(args.root, "*.json")):
+                export_season(storage, int(os.path.basename(path)[:-len(".json")]), args.root)
+
+        listener = ChangeListener(storage, on_change, tables=[TRENDS_TABLE], on_gap=on_gap).start()
+        logging.info(f"Watching {TRENDS_TABLE} for changes; cubes are written to {args.root}")
+        try:
+            listener.thread.join()
+        except KeyboardInterrupt:
+            listener.stop()
+    else:
+        cube = SeasonCubes(args.root).get(args.season)
+        if cube is None:
+            parser.error(f"No cube for season {args.season} in {args.root}")
+        print(json.dumps(cube.rows(args.def_team_id, args.position, args.week_from, args.week_to), indent=2))
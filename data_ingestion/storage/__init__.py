@@ -0,0 +1,26 @@
+import os
+from .base import StorageBackend
+
+_backends = {}
+
+
+def get_storage_backend(name=None):
+    """
+    Return the shared backend selected by name or STORAGE_BACKEND.
+
+    Backends are cached per process so every ingestor in a run sees the
+    same data, which matters for the in-memory SQLite backend.
+    """
+    name = (name or os.getenv("STORAGE_BACKEND", "postgres")).lower()
+
+    if name not in _backends:
+        if name == "postgres":
+            from .postgres import PostgresBackend
+            _backends[name] = PostgresBackend()
+        elif name == "sqlite":
+            from .sqlite import SQLiteBackend
+            _backends[name] = SQLiteBackend(os.getenv("SQLITE_PATH", ":memory:"))
+        else:
+            raise ValueError(f"Unknown storage backend: {name}")
+
+    return _backends[name]
@@ -0,0 +1,341 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+DEPTH_CHART_COLUMNS = [
+    'dc_team_id', 'dc_season_year', 'dc_week', 'dc_player_id',
+    'dc_player_position', 'dc_player_position_alignment', 'dc_rank'
+]
+
+TASK_COLUMNS = [
+    'key', 'season_year', 'week', 'game_uuid', 'status', 'attempts',
+    'started_at', 'finished_at', 'seconds', 'error'
+]
+
+DEFENSE_TREND_COLUMNS = [
+    'dvp_defense_team_id', 'dvp_position', 'dvp_season_year', 'dvp_week_number',
+    'dvp_fantasy_points', 'dvp_avg_3', 'dvp_avg_5', 'dvp_season_avg',
+    'dvp_games', 'dvp_season_rank', 'dvp_season_z'
+]
+
+
+class StorageBackend:
+    """
+    Reads and writes issued by the ingestors.
+
+    Every method takes the connection handed out by connection(), so an
+    ingestor controls transaction boundaries with conn.commit() and
+    conn.rollback() the same way regardless of backend.
+    """
+
+    name = None
+
+    @contextmanager
+    def connection(self):
+        raise NotImplementedError
+
+    # refdata.team
+
+    def insert_teams(self, conn, teams: List[Dict[str, Any]]) -> int:
+        raise NotImplementedError
+
+    def get_team_map(self, conn) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def get_team_id(self, conn, team_uuid: str) -> Optional[int]:
+        raise NotImplementedError
+
+    # refdata.player
+
+    def insert_player(self, conn, player_data: Dict[str, Any], team_id: Optional[int]) -> Optional[int]:
+        raise NotImplementedError
+
+    def insert_players(self, conn, players: Iterable[Dict[str, Any]], team_map: Dict[str, int]) -> None:
+        raise NotImplementedError
+
+    def get_player_id(self, conn, player_uuid: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def get_player_ids(self, conn, player_uuids: Iterable[str]) -> Dict[str, int]:
+        raise NotImplementedError
+
+    # refdata.week / refdata.game
+
+    def insert_weeks(self, conn, week_rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def get_week_ids(self, conn, week_uuids: Iterable[str]) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def insert_games(self, conn, game_rows: List[Dict[str, Any]]) -> None:
+        """Insert games; a game already stored takes the schedule's date and, when given, its status."""
+        raise NotImplementedError
+
+    def get_games(self, conn, year: int, week: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Games as dicts with uuid, id, week, year, home_team_id and away_team_id."""
+        raise NotImplementedError
+
+    def get_live_games(self, conn, lookback_hours: int) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def has_upcoming_live_games(self, conn, lookahead_hours: int, lookback_hours: int) -> bool:
+        raise NotImplementedError
+
+    def mark_game_final(self, conn, game_id: int, home_points: Optional[int], away_points: Optional[int]) -> None:
+        raise NotImplementedError
+
+    # refdata.depth_chart_weekly / refdata.injury_weekly
+
+    def insert_depth_charts(self, conn, depth_chart_rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def replace_depth_chart_changes(
+        self,
+        conn,
+        season_year: int,
+        week: int,
+        team_ids: Iterable[int],
+        change_rows: List[Dict[str, Any]]
+    ) -> None:
+        """Swap the depth chart changes recorded for these teams and week for change_rows (dcc_rank None = removed)."""
+        raise NotImplementedError
+
+    def get_depth_chart(self, conn, season_year: int, week: int, team_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Depth charts as of a week, rebuilt from refdata.depth_chart_change and keyed by DEPTH_CHART_COLUMNS."""
+        raise NotImplementedError
+
+    def insert_injuries(self, conn, injuries: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    # stats.player_stats_weekly_*
+
+    def insert_stats(
+        self,
+        conn,
+        table_name: str,
+        key_columns: List[str],
+        data_columns: List[str],
+        rows: List[List[Any]],
+        skip_unchanged: bool = False
+    ) -> int:
+        """Upsert rows of key_columns + data_columns values and return the number written."""
+        raise NotImplementedError
+
+    def bulk_load_stats(
+        self,
+        conn,
+        table_name: str,
+        key_columns: List[str],
+        data_columns: List[str],
+        rows: List[List[Any]]
+    ) -> int:
+        """Upsert a large batch of rows, e.g. a reprocessed season; rows must be unique on key_columns."""
+        return self.insert_stats(conn, table_name, key_columns, data_columns, rows)
+
+    def ensure_stats_partitions(self, conn, table_name: str, key_columns: List[str], season_weeks: Iterable[tuple]) -> None:
+        """
+        Create, in the caller's transaction, the partitions a table needs for these (season, week) pairs.
+
+        Backends without partitioned stats tables have nothing to do.
+        """
+
+    def reload_stats_week(
+        self,
+        conn,
+        table_name: str,
+        key_columns: List[str],
+        data_columns: List[str],
+        season_year: int,
+        week: int,
+        rows: List[List[Any]]
+    ) -> int:
+        """
+        Replace every row of a table's season and week with rows, in the caller's transaction.
+
+        Unlike bulk_load_stats, rows stored for the week but missing from
+        rows are removed. Rows must be unique on key_columns.
+        """
+        raise NotImplementedError
+
+    # stats.def_vs_pos_trends / stats.def_vs_pos_trend_state
+
+    def get_fantasy_points_allowed(self, conn, season_year: int, week: int) -> List[tuple]:
+        """(defense_team_id, position, fantasy points) for every defense that played in the week."""
+        raise NotImplementedError
+
+    def get_defense_trend_state(self, conn, season_year: int) -> Dict[tuple, Dict[str, Any]]:
+        """Running window state per (defense_team_id, position), shaped like analytics.defense_trends.new_trend_state."""
+        raise NotImplementedError
+
+    def save_defense_trend_state(self, conn, season_year: int, states: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def insert_defense_trends(self, conn, trend_rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def get_defense_trends(self, conn, season_year: int, defense_team_id: int, position: str) -> List[Dict[str, Any]]:
+        """A defense's trend rows for one position and season, keyed by DEFENSE_TREND_COLUMNS, in week order."""
+        raise NotImplementedError
+
+    def get_season_defense_trends(self, conn, season_year: int) -> List[Dict[str, Any]]:
+        """Every trend row of a season, keyed by DEFENSE_TREND_COLUMNS."""
+        raise NotImplementedError
+
+    def delete_defense_trends(self, conn, season_year: int, from_week: Optional[int] = None) -> None:
+        """Drop a season's trend rows (only those from from_week on, if given) and state ahead of a rebuild."""
+        raise NotImplementedError
+
+    # ops.ingest_task
+
+    def enqueue_tasks(self, conn, ingestor: str, tasks: List[Dict[str, Any]], reset: bool = False) -> None:
+        """
+        Record tasks (dicts with key, season_year, week and game_uuid) for an ingestor.
+
+        Tasks already recorded keep their status unless reset is set, in
+        which case they go back to pending with no attempts.
+        """
+        raise NotImplementedError
+
+    def get_tasks(self, conn, ingestor: str, season_year: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Tasks keyed by TASK_COLUMNS, ordered by season, week and the order they were recorded in."""
+        raise NotImplementedError
+
+    def start_task(self, conn, ingestor: str, task_key: str, started_at: datetime) -> None:
+        """Mark a task running and count the attempt."""
+        raise NotImplementedError
+
+    def finish_task(
+        self,
+        conn,
+        ingestor: str,
+        task_key: str,
+        status: str,
+        finished_at: datetime,
+        seconds: float,
+        error: Optional[str] = None,
+        worker_id: Optional[str] = None
+    ) -> bool:
+        """
+        Record a task's outcome; False if it matched no row.
+
+        With worker_id, only a task that worker_id still holds running is
+        updated, so a worker whose task was requeued cannot overwrite the
+        outcome of the worker that claimed it next.
+        """
+        raise NotImplementedError
+
+    # ops.ingest_task workers / ops.api_rate_budget
+    #
+    # Worker mode coordinates processes on several hosts through row locks
+    # and server time, so only the Postgres backend provides these.
+
+    def claim_task(self, conn, ingestor: str, worker_id: str, started_at: datetime, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """
+        Mark the next pending task, or failed task with attempts left, running for worker_id.
+
+        Returns the task keyed by TASK_COLUMNS, or None when there is
+        nothing to claim. Tasks claimed by other workers are skipped.
+        """
+        raise NotImplementedError
+
+    def heartbeat_task(self, conn, ingestor: str, task_key: str, worker_id: str) -> bool:
+        """Stamp a running task's heartbeat; False if worker_id no longer holds it."""
+        raise NotImplementedError
+
+    def requeue_stale_tasks(self, conn, ingestor: str, stale_seconds: float) -> int:
+        """
+        Put ingestor's claimed tasks with no heartbeat for stale_seconds back to pending.
+
+        Only worker claims are heartbeated; tasks started by a single-process
+        run have no heartbeat and are never requeued.
+        """
+        raise NotImplementedError
+
+    def acquire_rate_token(self, conn, name: str, rate_per_second: float, burst: int) -> float:
+        """Reserve one request from a shared token bucket; return the seconds to wait before sending it."""
+        raise NotImplementedError
+
+    # incremental exports
+    #
+    # Changed partitions are found through the <prefix>_updated_at columns
+    # stamped by migration 0010's triggers and the deleted weeks recorded
+    # by migration 0011's, so only the Postgres backend provides these.
+
+    def get_database_time(self, conn) -> datetime:
+        """The server's current time, used as the export watermark."""
+        raise NotImplementedError
+
+    def get_changed_weeks(
+        self,
+        conn,
+        table: str,
+        season_column: str,
+        week_column: str,
+        updated_column: str,
+        since: Optional[datetime] = None
+    ) -> List[tuple]:
+        """(season, week) pairs of a schema-qualified table with rows updated or deleted after since (every pair when None)."""
+        raise NotImplementedError
+
+    def get_week_rows(self, conn, table: str, season_column: str, week_column: str, season_year: int, week: int) -> tuple:
+        """
+        (columns, rows) for one season and week of a schema-qualified table, every column included.
+
+        columns are dicts with the column's name, database type name and,
+        for numerics, precision and scale.
+        """
+        raise NotImplementedError
+
+    # change events
+
+    def publish_change(self, conn, payload: str) -> None:
+        """
+        Send an encoded change event to listeners in other processes.
+
+        The default appends it to the change log file shared by every
+        process on the host (CHANGE_LOG_PATH).
+        """
+        path = change_log_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(payload + "\n")
+
+    def listen_changes(self, handle, stopped, poll_interval: float) -> None:
+        """Call handle(payload) for each event published after the call until stopped is set."""
+        path = change_log_path()
+        offset = os.path.getsize(path) if os.path.exists(path) else 0
+        pending = b""
+
+        while not stopped.is_set():
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size < offset:
+                # truncated or replaced; start over from the top
+                offset, pending = 0, b""
+            if size > offset:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    pending += f.read(size - offset)
+                offset = size
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    if line:
+                        handle(line.decode("utf-8"))
+            stopped.wait(poll_interval)
+
+
+def season_week_columns(key_columns: List[str]) -> tuple:
+    season_col = next(col for col in key_columns if col.endswith('_season_year'))
+    week_col = next(col for col in key_columns if col.endswith('_week_number'))
+    return season_col, week_col
+
+
+def season_weeks(key_columns: List[str], rows: Iterable[List[Any]]) -> set:
+    """(season, week) pairs present in stat rows laid out as key_columns + data columns."""
+    season_col, week_col = season_week_columns(key_columns)
+    season_index, week_index = key_columns.index(season_col), key_columns.index(week_col)
+    return {(row[season_index], row[week_index]) for row in rows}
+
+
+def change_log_path() -> str:
+    return os.getenv("CHANGE_LOG_PATH", os.path.join(".data", "changes.ndjson"))
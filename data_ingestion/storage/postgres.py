@@ -0,0 +1,886 @@
+from contextlib import contextmanager
+from ..config.settings import settings
+from ..utils.change_events import CHANNEL
+from ..utils.db import execute_pipeline, get_connection, safe_connection
+from .base import DEFENSE_TREND_COLUMNS, DEPTH_CHART_COLUMNS, TASK_COLUMNS, StorageBackend, season_week_columns, season_weeks
+
+PLAYER_UPSERT_QUERY = """
+    insert into refdata.player
+    (
+        player_name,
+        player_first_name,
+        player_last_name,
+        player_team_id,
+        player_position,
+        player_sr_uuid,
+        player_number
+    )
+    values (%s, %s, %s, %s, %s, %s, %s)
+    on conflict (player_sr_uuid) do update set
+        player_name = excluded.player_name,
+        player_first_name = excluded.player_first_name,
+        player_last_name = excluded.player_last_name,
+        player_team_id = coalesce(excluded.player_team_id, refdata.player.player_team_id),
+        player_position = coalesce(excluded.player_position, refdata.player.player_position),
+        player_number = coalesce(excluded.player_number, refdata.player.player_number)
+"""
+
+# Statements below are also EXPLAINed by migrations.migrate check, so the
+# check plans exactly what the backend sends.
+
+TEAM_INSERT_QUERY = """
+    insert into refdata.team
+    (team_sr_uuid, team_name, team_market, team_abbreviation)
+    values (%s, %s, %s, %s)
+    on conflict (team_sr_uuid) do nothing
+"""
+
+TEAM_ID_QUERY = "select team_id from refdata.team where team_sr_uuid = %s"
+
+PLAYER_ID_QUERY = """
+    select player_id
+    from refdata.player
+    where player_sr_uuid = %s
+"""
+
+PLAYER_IDS_QUERY = """
+    select player_sr_uuid, player_id
+    from refdata.player
+    where player_sr_uuid = any(%s)
+"""
+
+WEEK_INSERT_QUERY = """
+    insert into refdata.week
+    (
+        week_sr_uuid,
+        week_season_year,
+        week_season_type,
+        week_number,
+        week_start_date,
+        week_end_date
+    )
+    values (%s, %s, %s, %s, %s, %s)
+    on conflict (week_season_year, week_season_type, week_number) do nothing
+"""
+
+WEEK_IDS_QUERY = """
+    select week_sr_uuid, week_id
+    from refdata.week
+    where week_sr_uuid = any(%s)
+"""
+
+GAME_UPSERT_QUERY = """
+    insert into refdata.game
+    (
+        game_week,
+        game_season_year,
+        game_home_team_id,
+        game_away_team_id,
+        game_date,
+        game_home_score,
+        game_away_score,
+        game_sr_uuid,
+        game_week_id,
+        game_status
+    )
+    values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    on conflict (game_week, game_season_year, game_home_team_id, game_away_team_id) do update
+    set game_date = excluded.game_date,
+        game_status = coalesce(excluded.game_status, refdata.game.game_status)
+    where (refdata.game.game_date, refdata.game.game_status)
+        is distinct from (excluded.game_date, coalesce(excluded.game_status, refdata.game.game_status))
+"""
+
+GAMES_WEEK_QUERY = """
+    select game_sr_uuid, game_id, game_week, game_season_year, game_home_team_id, game_away_team_id
+    from refdata.game
+    where game_week = %s and game_season_year = %s
+    order by game_season_year, game_week
+"""
+
+GAMES_SEASON_QUERY = """
+    select game_sr_uuid, game_id, game_week, game_season_year, game_home_team_id, game_away_team_id
+    from refdata.game
+    where game_season_year = %s
+    order by game_week
+"""
+
+LIVE_GAMES_QUERY = """
+    select game_sr_uuid, game_id, game_week, game_season_year, game_home_team_id, game_away_team_id
+    from refdata.game
+    where game_date <= now()
+    and game_date >= now() - make_interval(hours => %s)
+    and game_status is distinct from 'closed'
+    order by game_date
+"""
+
+DEPTH_CHART_INSERT_QUERY = """
+    insert into refdata.depth_chart_weekly
+    (
+        dc_team_id,
+        dc_season_year,
+        dc_week,
+        dc_player_id,
+        dc_player_position,
+        dc_player_position_alignment,
+        dc_rank
+    )
+    values (%s, %s, %s, %s, %s, %s, %s)
+    on conflict (dc_team_id, dc_season_year, dc_week, dc_player_id,
+        dc_player_position, dc_player_position_alignment) do nothing
+"""
+
+INJURY_INSERT_QUERY = """
+    insert into refdata.injury_weekly
+    (
+        inj_player_id,
+        inj_team_id,
+        inj_season_year,
+        inj_week_number,
+        inj_status,
+        inj_status_date,
+        inj_primary_injury,
+        inj_week_id,
+        inj_practice_participation
+    )
+    values (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    on conflict (inj_player_id, inj_season_year, inj_week_number) do nothing
+"""
+
+START_TASK_QUERY = """
+    update ops.ingest_task
+    set task_status = 'running',
+        task_attempts = task_attempts + 1,
+        task_started_at = %s,
+        task_worker = null,
+        task_heartbeat_at = null,
+        task_finished_at = null,
+        task_seconds = null,
+        task_error = null
+    where task_ingestor = %s
+    and task_key = %s
+"""
+
+CLAIM_TASK_QUERY = """
+    update ops.ingest_task
+    set task_status = 'running',
+        task_worker = %s,
+        task_attempts = task_attempts + 1,
+        task_started_at = %s,
+        task_heartbeat_at = now(),
+        task_finished_at = null,
+        task_seconds = null,
+        task_error = null
+    where task_id = (
+        select task_id
+        from ops.ingest_task
+        where task_ingestor = %s
+        and (task_status = 'pending' or (task_status = 'failed' and task_attempts < %s))
+        order by task_season_year, task_week, task_id
+        limit 1
+        for update skip locked
+    )
+    returning task_key, task_season_year, task_week, task_game_uuid, task_status, task_attempts,
+        task_started_at, task_finished_at, task_seconds, task_error
+"""
+
+HEARTBEAT_TASK_QUERY = """
+    update ops.ingest_task
+    set task_heartbeat_at = now()
+    where task_ingestor = %s
+    and task_key = %s
+    and task_worker = %s
+    and task_status = 'running'
+"""
+
+REQUEUE_STALE_TASKS_QUERY = """
+    update ops.ingest_task
+    set task_status = 'pending',
+        task_worker = null,
+        task_error = 'requeued: no heartbeat from ' || task_worker
+    where task_ingestor = %s
+    and task_status = 'running'
+    and task_heartbeat_at is not null
+    and task_heartbeat_at < now() - make_interval(secs => %s)
+"""
+
+
+def depth_chart_query(by_team):
+    query = f"""
+        select {', '.join(DEPTH_CHART_COLUMNS)}
+        from refdata.depth_chart_as_of(%s, %s)
+    """
+    if by_team:
+        query += " where dc_team_id = %s"
+    return query + " order by dc_team_id, dc_player_position, dc_player_position_alignment, dc_rank"
+
+
+def stats_upsert_query(table_name, key_columns, data_columns, skip_unchanged=False):
+    all_columns = key_columns + data_columns
+    update_clause = ', '.join(f"{col} = EXCLUDED.{col}" for col in data_columns)
+    if skip_unchanged:
+        existing = ', '.join(f"stats.{table_name}.{col}" for col in data_columns)
+        incoming = ', '.join(f"EXCLUDED.{col}" for col in data_columns)
+        update_clause += f" WHERE ROW({existing}) IS DISTINCT FROM ROW({incoming})"
+
+    return f"""
+        INSERT INTO stats.{table_name} ({', '.join(all_columns)})
+        VALUES ({', '.join(['%s'] * len(all_columns))})
+        ON CONFLICT ({', '.join(key_columns)})
+        DO UPDATE SET {update_clause}
+    """
+
+
+def enqueue_tasks_query(reset):
+    on_conflict = """
+        do update set
+            task_status = 'pending',
+            task_attempts = 0,
+            task_started_at = null,
+            task_finished_at = null,
+            task_seconds = null,
+            task_error = null
+    """ if reset else "do nothing"
+
+    return f"""
+        insert into ops.ingest_task
+        (task_ingestor, task_key, task_season_year, task_week, task_game_uuid)
+        values (%s, %s, %s, %s, %s)
+        on conflict (task_ingestor, task_key) {on_conflict}
+    """
+
+
+def get_tasks_query(by_season):
+    query = """
+        select task_key, task_season_year, task_week, task_game_uuid, task_status, task_attempts,
+            task_started_at, task_finished_at, task_seconds, task_error
+        from ops.ingest_task
+        where task_ingestor = %s
+    """
+    if by_season:
+        query += " and task_season_year = %s"
+    return query + " order by task_season_year, task_week, task_id"
+
+
+def finish_task_query(by_worker):
+    query = """
+        update ops.ingest_task
+        set task_status = %s,
+            task_finished_at = %s,
+            task_seconds = %s,
+            task_error = %s
+        where task_ingestor = %s
+        and task_key = %s
+    """
+    if by_worker:
+        query += " and task_worker = %s and task_status = 'running'"
+    return query
+
+
+def player_upsert_params(player_data, team_id):
+    name_parts = player_data["name"].split(' ', 1)
+    first_name = name_parts[0]
+    last_name = name_parts[1] if len(name_parts) > 1 else ''
+
+    return (
+        player_data["name"],
+        first_name,
+        last_name,
+        team_id,
+        player_data.get("position"),
+        player_data["player_sr_uuid"],
+        player_data.get("jersey")
+    )
+
+
+def season_partition(table_name, season_year):
+    return f"{table_name}_y{season_year}"
+
+
+def week_partition(table_name, season_year, week):
+    return f"{table_name}_y{season_year}_w{week:02d}"
+
+
+class PostgresBackend(StorageBackend):
+    name = "postgres"
+
+    def __init__(self):
+        # (table, season, week) combinations whose partitions are known to exist
+        self.partitions = set()
+
+    @contextmanager
+    def connection(self):
+        with safe_connection() as conn:
+            yield conn
+
+    def insert_teams(self, conn, teams):
+        with conn.cursor() as cur:
+            cur.executemany(
+                TEAM_INSERT_QUERY,
+                [(team["id"], team["name"], team["market"], team["alias"]) for team in teams]
+            )
+            return cur.rowcount
+
+    def get_team_map(self, conn):
+        team_map = {}
+        with conn.cursor() as cur:
+            cur.execute("select team_id, team_sr_uuid from refdata.team")
+            for row in cur.fetchall():
+                team_map[row[1]] = row[0]
+        return team_map
+
+    def get_team_id(self, conn, team_uuid):
+        with conn.cursor() as cur:
+            cur.execute(TEAM_ID_QUERY, (team_uuid,))
+            team_row = cur.fetchone()
+            return team_row[0] if team_row else None
+
+    def insert_player(self, conn, player_data, team_id):
+        with conn.cursor() as cur:
+            cur.execute(PLAYER_UPSERT_QUERY + " returning player_id;", player_upsert_params(player_data, team_id))
+            result = cur.fetchone()
+            return result[0] if result else None
+
+    def insert_players(self, conn, players, team_map):
+        execute_pipeline(conn, [
+            (PLAYER_UPSERT_QUERY, player_upsert_params(player_data, team_map.get(player_data.get("team_id"))))
+            for player_data in players
+        ])
+
+    def get_player_id(self, conn, player_uuid):
+        with conn.cursor() as cur:
+            cur.execute(PLAYER_ID_QUERY, (player_uuid,))
+            player_row = cur.fetchone()
+            return player_row[0] if player_row else None
+
+    def get_player_ids(self, conn, player_uuids):
+        with conn.cursor() as cur:
+            cur.execute(PLAYER_IDS_QUERY, (list(player_uuids),))
+            return {row[0]: row[1] for row in cur.fetchall()}
+
+    def insert_weeks(self, conn, week_rows):
+        execute_pipeline(conn, [
+            (
+                WEEK_INSERT_QUERY,
+                (
+                    week_row["week_sr_uuid"],
+                    week_row["week_season_year"],
+                    week_row["week_season_type"],
+                    week_row["week_number"],
+                    week_row["week_start_date"],
+                    week_row["week_end_date"]
+                )
+            )
+            for week_row in week_rows
+        ])
+
+    def get_week_ids(self, conn, week_uuids):
+        with conn.cursor() as cur:
+            cur.execute(WEEK_IDS_QUERY, (list(week_uuids),))
+            return {row[0]: row[1] for row in cur.fetchall()}
+
+    def insert_games(self, conn, game_rows):
+        execute_pipeline(conn, [
+            (
+                GAME_UPSERT_QUERY,
+                (
+                    game_row["game_week"],
+                    game_row["game_season_year"],
+                    game_row["game_home_team_id"],
+                    game_row["game_away_team_id"],
+                    game_row["game_date"],
+                    game_row["game_home_score"],
+                    game_row["game_away_score"],
+                    game_row["game_sr_uuid"],
+                    game_row["game_week_id"],
+                    game_row.get("game_status")
+                )
+            )
+            for game_row in game_rows
+        ])
+
+    def get_games(self, conn, year, week=None):
+        with conn.cursor() as cur:
+            if week is not None:
+                cur.execute(GAMES_WEEK_QUERY, (week, year))
+            else:
+                cur.execute(GAMES_SEASON_QUERY, (year,))
+            return [
+                {'uuid': row[0], 'id': row[1], 'week': row[2], 'year': row[3], 'home_team_id': row[4], 'away_team_id': row[5]}
+                for row in cur.fetchall()
+            ]
+
+    def get_live_games(self, conn, lookback_hours):
+        with conn.cursor() as cur:
+            cur.execute(LIVE_GAMES_QUERY, (lookback_hours,))
+            return [
+                {'uuid': row[0], 'id': row[1], 'week': row[2], 'year': row[3], 'home_team_id': row[4], 'away_team_id': row[5]}
+                for row in cur.fetchall()
+            ]
+
+    def has_upcoming_live_games(self, conn, lookahead_hours, lookback_hours):
+        with conn.cursor() as cur:
+            cur.execute("""
+                select exists (
+                    select 1
+                    from refdata.game
+                    where game_date <= now() + make_interval(hours => %s)
+                    and game_date >= now() - make_interval(hours => %s)
+                    and game_status is distinct from 'closed'
+                )
+            """, (lookahead_hours, lookback_hours))
+            return cur.fetchone()[0]
+
+    def mark_game_final(self, conn, game_id, home_points, away_points):
+        with conn.cursor() as cur:
+            cur.execute("""
+                update refdata.game
+                set game_status = 'closed',
+                    game_home_score = coalesce(%s, game_home_score),
+                    game_away_score = coalesce(%s, game_away_score)
+                where game_id = %s
+            """, (home_points, away_points, game_id))
+
+    def insert_depth_charts(self, conn, depth_chart_rows):
+        execute_pipeline(conn, [
+            (
+                DEPTH_CHART_INSERT_QUERY,
+                (
+                    row["dc_team_id"],
+                    row["dc_season_year"],
+                    row["dc_week"],
+                    row["dc_player_id"],
+                    row["dc_player_position"],
+                    row["dc_player_position_alignment"],
+                    row["dc_rank"]
+                )
+            )
+            for row in depth_chart_rows
+        ])
+
+    def replace_depth_chart_changes(self, conn, season_year, week, team_ids, change_rows):
+        with conn.cursor() as cur:
+            cur.execute("""
+                delete from refdata.depth_chart_change
+                where dcc_season_year = %s
+                and dcc_week = %s
+                and dcc_team_id = any(%s)
+            """, (season_year, week, list(team_ids)))
+            cur.executemany("""
+                insert into refdata.depth_chart_change
+                (
+                    dcc_team_id,
+                    dcc_season_year,
+                    dcc_week,
+                    dcc_player_id,
+                    dcc_player_position,
+                    dcc_player_position_alignment,
+                    dcc_rank
+                )
+                values (%s, %s, %s, %s, %s, %s, %s)
+            """, [
+                (
+                    row["dcc_team_id"],
+                    row["dcc_season_year"],
+                    row["dcc_week"],
+                    row["dcc_player_id"],
+                    row["dcc_player_position"],
+                    row["dcc_player_position_alignment"],
+                    row["dcc_rank"]
+                )
+                for row in change_rows
+            ])
+
+    def get_depth_chart(self, conn, season_year, week, team_id=None):
+        params = [season_year, week]
+        if team_id is not None:
+            params.append(team_id)
+
+        with conn.cursor() as cur:
+            cur.execute(depth_chart_query(team_id is not None), params)
+            return [dict(zip(DEPTH_CHART_COLUMNS, row)) for row in cur.fetchall()]
+
+    def insert_injuries(self, conn, injuries):
+        execute_pipeline(conn, [
+            (
+                INJURY_INSERT_QUERY,
+                (
+                    inj["inj_player_id"],
+                    inj["inj_team_id"],
+                    inj["inj_season_year"],
+                    inj["inj_week"],
+                    inj["inj_status"],
+                    inj["inj_status_date"],
+                    inj["inj_primary_injury"],
+                    inj["inj_week_id"],
+                    inj["inj_practice_participation"]
+                )
+            )
+            for inj in injuries
+        ])
+
+    def relkind(self, cur, relation):
+        cur.execute("""
+            select c.relkind
+            from pg_class c
+            join pg_namespace n on n.oid = c.relnamespace
+            where n.nspname = 'stats'
+            and c.relname = %s
+        """, (relation,))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def ensure_stats_partitions(self, conn, table_name, key_columns, season_weeks):
+        missing = sorted({(season, week) for season, week in season_weeks} - {
+            (season, week) for table, season, week in self.partitions if table == table_name
+        })
+        if not missing:
+            return
+
+        season_col, week_col = season_week_columns(key_columns)
+        with conn.cursor() as cur:
+            if self.relkind(cur, table_name) != 'p':
+                self.partitions.update((table_name, season, week) for season, week in missing)
+                return
+
+            # Serialise with other sessions creating the same table's partitions; held to the caller's commit
+            cur.execute("select pg_advisory_xact_lock(hashtext(%s))", (f"stats.{table_name}",))
+            for season, week in missing:
+                season_table = season_partition(table_name, season)
+                week_table = week_partition(table_name, season, week)
+                kind = self.relkind(cur, season_table)
+                existed = kind == 'r' or (kind == 'p' and self.relkind(cur, week_table) is not None)
+
+                if kind is None:
+                    by_week = f" partition by range ({week_col})" if settings.STATS_WEEK_PARTITIONS else ""
+                    cur.execute(f"""
+                        create table stats.{season_table}
+                        partition of stats.{table_name}
+                        for values from ({int(season)}) to ({int(season) + 1}){by_week}
+                    """)
+                    kind = 'p' if settings.STATS_WEEK_PARTITIONS else 'r'
+
+                if kind == 'p' and not existed:
+                    cur.execute(f"""
+                        create table stats.{week_table}
+                        partition of stats.{season_table}
+                        for values from ({int(week)}) to ({int(week) + 1})
+                    """)
+
+                # Partitions created here are only remembered once a later call finds them
+                # committed, so a rolled-back transaction cannot leave a stale entry
+                if existed:
+                    self.partitions.add((table_name, season, week))
+
+    def insert_stats(self, conn, table_name, key_columns, data_columns, rows, skip_unchanged=False):
+        self.ensure_stats_partitions(conn, table_name, key_columns, season_weeks(key_columns, rows))
+        query = stats_upsert_query(table_name, key_columns, data_columns, skip_unchanged)
+
+        # executemany pipelines the rows and reuses one prepared statement
+        with conn.cursor() as cur:
+            cur.executemany(query, rows)
+            return cur.rowcount
+
+    def bulk_load_stats(self, conn, table_name, key_columns, data_columns, rows):
+        self.ensure_stats_partitions(conn, table_name, key_columns, season_weeks(key_columns, rows))
+        all_columns = ', '.join(key_columns + data_columns)
+        update_clause = ', '.join(f"{col} = EXCLUDED.{col}" for col in data_columns)
+        stage_table = f"{table_name}_stage"
+
+        # COPY into a transaction-scoped staging table, then upsert it in one statement
+        with conn.cursor() as cur:
+            cur.execute(f"drop table if exists pg_temp.{stage_table}")
+            cur.execute(f"""
+                create temp table {stage_table} on commit drop as
+                select {all_columns} from stats.{table_name} with no data
+            """)
+            with cur.copy(f"copy {stage_table} ({all_columns}) from stdin") as copy:
+                for row in rows:
+                    copy.write_row(row)
+            cur.execute(f"""
+                insert into stats.{table_name} ({all_columns})
+                select {all_columns} from {stage_table}
+                on conflict ({', '.join(key_columns)})
+                do update set {update_clause}
+            """)
+            return cur.rowcount
+
+    def reload_stats_week(self, conn, table_name, key_columns, data_columns, season_year, week, rows):
+        self.ensure_stats_partitions(conn, table_name, key_columns, [(season_year, week)])
+        season_col, week_col = season_week_columns(key_columns)
+        all_columns = ', '.join(key_columns + data_columns)
+        season_table = season_partition(table_name, season_year)
+
+        with conn.cursor() as cur:
+            kind = self.relkind(cur, season_table)
+            if kind == 'p':
+                # Load a fresh table off to the side, then swap it in for the week's partition
+                week_table = week_partition(table_name, season_year, week)
+                staging = f"{week_table}_staging"
+                cur.execute(f"drop table if exists stats.{staging}")
+                cur.execute(f"create table stats.{staging} (like stats.{table_name} including defaults)")
+                with cur.copy(f"copy stats.{staging} ({all_columns}) from stdin") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                # Implies the partition bounds, so attach can skip scanning the new rows
+                cur.execute(f"""
+                    alter table stats.{staging} add constraint {staging}_bounds
+                    check ({season_col} = {int(season_year)} and {week_col} = {int(week)})
+                """)
+                cur.execute(f"alter table stats.{season_table} detach partition stats.{week_table}")
+                cur.execute(f"drop table stats.{week_table}")
+                cur.execute(f"alter table stats.{staging} rename to {week_table}")
+                cur.execute(f"""
+                    alter table stats.{season_table}
+                    attach partition stats.{week_table}
+                    for values from ({int(week)}) to ({int(week) + 1})
+                """)
+                # Dropping the old partition fires no delete trigger, so record the week for the export here
+                cur.execute("""
+                    insert into ops.export_deleted_week (edw_table, edw_season_year, edw_week)
+                    values (%s, %s, %s)
+                    on conflict (edw_table, edw_season_year, edw_week) do update
+                    set edw_deleted_at = excluded.edw_deleted_at
+                """, (f"stats.{table_name}", season_year, week))
+            else:
+                # Season partition without week partitions (or an unpartitioned table):
+                # clear the week from it directly and COPY the new rows in
+                target = season_table if kind == 'r' else table_name
+                cur.execute(f"delete from stats.{target} where {season_col} = %s and {week_col} = %s", (season_year, week))
+                with cur.copy(f"copy stats.{table_name} ({all_columns}) from stdin") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+        return len(rows)
+
+    def get_fantasy_points_allowed(self, conn, season_year, week):
+        from ..analytics.fantasy import fantasy_points_allowed_params, fantasy_points_allowed_query
+
+        with conn.cursor() as cur:
+            cur.execute(fantasy_points_allowed_query('%s'), fantasy_points_allowed_params(season_year, week))
+            return cur.fetchall()
+
+    def get_defense_trend_state(self, conn, season_year):
+        with conn.cursor() as cur:
+            cur.execute("""
+                select dvps_defense_team_id, dvps_position, dvps_last_week, dvps_games,
+                       dvps_season_points, dvps_sum_3, dvps_sum_5, dvps_recent_points
+                from stats.def_vs_pos_trend_state
+                where dvps_season_year = %s
+            """, (season_year,))
+            return {
+                (row[0], row[1]): {
+                    'defense_team_id': row[0],
+                    'position': row[1],
+                    'last_week': row[2],
+                    'games': row[3],
+                    'season_points': float(row[4]),
+                    'sum_3': float(row[5]),
+                    'sum_5': float(row[6]),
+                    'recent_points': [float(points) for points in row[7]],
+                }
+                for row in cur.fetchall()
+            }
+
+    def save_defense_trend_state(self, conn, season_year, states):
+        query = """
+            insert into stats.def_vs_pos_trend_state
+            (
+                dvps_defense_team_id,
+                dvps_position,
+                dvps_season_year,
+                dvps_last_week,
+                dvps_games,
+                dvps_season_points,
+                dvps_sum_3,
+                dvps_sum_5,
+                dvps_recent_points
+            )
+            values (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            on conflict (dvps_defense_team_id, dvps_position, dvps_season_year) do update set
+                dvps_last_week = excluded.dvps_last_week,
+                dvps_games = excluded.dvps_games,
+                dvps_season_points = excluded.dvps_season_points,
+                dvps_sum_3 = excluded.dvps_sum_3,
+                dvps_sum_5 = excluded.dvps_sum_5,
+                dvps_recent_points = excluded.dvps_recent_points
+        """
+        with conn.cursor() as cur:
+            cur.executemany(query, [
+                (
+                    state['defense_team_id'],
+                    state['position'],
+                    season_year,
+                    state['last_week'],
+                    state['games'],
+                    state['season_points'],
+                    state['sum_3'],
+                    state['sum_5'],
+                    state['recent_points']
+                )
+                for state in states
+            ])
+
+    def insert_defense_trends(self, conn, trend_rows):
+        key_columns = DEFENSE_TREND_COLUMNS[:4]
+        query = f"""
+            insert into stats.def_vs_pos_trends ({', '.join(DEFENSE_TREND_COLUMNS)})
+            values ({', '.join(['%s'] * len(DEFENSE_TREND_COLUMNS))})
+            on conflict ({', '.join(key_columns)}) do update set
+                {', '.join(f"{col} = excluded.{col}" for col in DEFENSE_TREND_COLUMNS[4:])},
+                dvp_updated_at = now()
+        """
+        with conn.cursor() as cur:
+            cur.executemany(query, [[row[col] for col in DEFENSE_TREND_COLUMNS] for row in trend_rows])
+
+    def get_defense_trends(self, conn, season_year, defense_team_id, position):
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                select {', '.join(DEFENSE_TREND_COLUMNS)}
+                from stats.def_vs_pos_trends
+                where dvp_defense_team_id = %s
+                and dvp_position = %s
+                and dvp_season_year = %s
+                order by dvp_week_number
+            """, (defense_team_id, position, season_year))
+            return [dict(zip(DEFENSE_TREND_COLUMNS, row)) for row in cur.fetchall()]
+
+    def get_season_defense_trends(self, conn, season_year):
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                select {', '.join(DEFENSE_TREND_COLUMNS)}
+                from stats.def_vs_pos_trends
+                where dvp_season_year = %s
+            """, (season_year,))
+            return [dict(zip(DEFENSE_TREND_COLUMNS, row)) for row in cur.fetchall()]
+
+    def delete_defense_trends(self, conn, season_year, from_week=None):
+        with conn.cursor() as cur:
+            cur.execute(
+                "delete from stats.def_vs_pos_trends where dvp_season_year = %s and dvp_week_number >= %s",
+                (season_year, from_week or 0)
+            )
+            cur.execute("delete from stats.def_vs_pos_trend_state where dvps_season_year = %s", (season_year,))
+
+    def enqueue_tasks(self, conn, ingestor, tasks, reset=False):
+        with conn.cursor() as cur:
+            cur.executemany(enqueue_tasks_query(reset), [
+                (ingestor, task["key"], task["season_year"], task.get("week"), task.get("game_uuid"))
+                for task in tasks
+            ])
+
+    def get_tasks(self, conn, ingestor, season_year=None):
+        params = [ingestor]
+        if season_year is not None:
+            params.append(season_year)
+
+        with conn.cursor() as cur:
+            cur.execute(get_tasks_query(season_year is not None), params)
+            return [dict(zip(TASK_COLUMNS, row)) for row in cur.fetchall()]
+
+    def start_task(self, conn, ingestor, task_key, started_at):
+        with conn.cursor() as cur:
+            cur.execute(START_TASK_QUERY, (started_at, ingestor, task_key))
+
+    def finish_task(self, conn, ingestor, task_key, status, finished_at, seconds, error=None, worker_id=None):
+        params = [status, finished_at, seconds, error, ingestor, task_key]
+        if worker_id is not None:
+            params.append(worker_id)
+
+        with conn.cursor() as cur:
+            cur.execute(finish_task_query(worker_id is not None), params)
+            return cur.rowcount == 1
+
+    def claim_task(self, conn, ingestor, worker_id, started_at, max_attempts):
+        with conn.cursor() as cur:
+            cur.execute(CLAIM_TASK_QUERY, (worker_id, started_at, ingestor, max_attempts))
+            row = cur.fetchone()
+            return dict(zip(TASK_COLUMNS, row)) if row else None
+
+    def heartbeat_task(self, conn, ingestor, task_key, worker_id):
+        with conn.cursor() as cur:
+            cur.execute(HEARTBEAT_TASK_QUERY, (ingestor, task_key, worker_id))
+            return cur.rowcount == 1
+
+    def requeue_stale_tasks(self, conn, ingestor, stale_seconds):
+        with conn.cursor() as cur:
+            cur.execute(REQUEUE_STALE_TASKS_QUERY, (ingestor, stale_seconds))
+            return cur.rowcount
+
+    def acquire_rate_token(self, conn, name, rate_per_second, burst):
+        with conn.cursor() as cur:
+            cur.execute("""
+                insert into ops.api_rate_budget (rb_name, rb_tokens)
+                values (%s, %s)
+                on conflict (rb_name) do nothing
+            """, (name, burst))
+            # Refill for the time since the last reservation, then take a token even if
+            # that goes negative: the caller waits out the debt instead of retrying
+            cur.execute("""
+                update ops.api_rate_budget
+                set rb_tokens = least(%s, rb_tokens + extract(epoch from clock_timestamp() - rb_updated_at) * %s) - 1,
+                    rb_updated_at = clock_timestamp()
+                where rb_name = %s
+                returning rb_tokens
+            """, (burst, rate_per_second, name))
+            tokens = cur.fetchone()[0]
+        return max(0.0, -tokens / rate_per_second)
+
+    def get_database_time(self, conn):
+        with conn.cursor() as cur:
+            cur.execute("select clock_timestamp()")
+            return cur.fetchone()[0]
+
+    def get_changed_weeks(self, conn, table, season_column, week_column, updated_column, since=None):
+        with conn.cursor() as cur:
+            if since is None:
+                cur.execute(f"""
+                    select distinct {season_column}, {week_column}
+                    from {table}
+                    order by 1, 2
+                """)
+            else:
+                cur.execute(f"""
+                    select {season_column}, {week_column}
+                    from {table}
+                    where {updated_column} > %s
+                    union
+                    select edw_season_year, edw_week
+                    from ops.export_deleted_week
+                    where edw_table = %s
+                    and edw_deleted_at > %s
+                    order by 1, 2
+                """, (since, table, since))
+            return [tuple(row) for row in cur.fetchall()]
+
+    def get_week_rows(self, conn, table, season_column, week_column, season_year, week):
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                select *
+                from {table}
+                where {season_column} = %s
+                and {week_column} = %s
+            """, (season_year, week))
+            columns = [
+                {
+                    "name": column.name,
+                    "type": conn.adapters.types.get(column.type_code).name if conn.adapters.types.get(column.type_code) else None,
+                    "precision": column.precision,
+                    "scale": column.scale,
+                }
+                for column in cur.description
+            ]
+            return columns, cur.fetchall()
+
+    def publish_change(self, conn, payload):
+        with conn.cursor() as cur:
+            cur.execute("select pg_notify(%s, %s)", (CHANNEL, payload))
+        conn.commit()
+
+    def listen_changes(self, handle, stopped, poll_interval):
+        # LISTEN holds its session, so use a dedicated connection rather than the pool
+        with get_connection() as conn:
+            conn.autocommit = True
+            conn.execute(f"listen {CHANNEL}")
+            while not stopped.is_set():
+                for notify in conn.notifies(timeout=poll_interval):
+                    handle(notify.payload)
@@ -0,0 +1,670 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from threading import RLock
+from ..utils.time import utc_now
+from .base import DEFENSE_TREND_COLUMNS, DEPTH_CHART_COLUMNS, TASK_COLUMNS, StorageBackend, season_week_columns
+
+REFDATA_SCHEMA = """
+    create table if not exists refdata.team (
+        team_id integer primary key,
+        team_sr_uuid text not null unique,
+        team_name text not null,
+        team_market text,
+        team_abbreviation text
+    );
+
+    create table if not exists refdata.player (
+        player_id integer primary key,
+        player_name text not null,
+        player_first_name text,
+        player_last_name text,
+        player_team_id integer,
+        player_position text,
+        player_sr_uuid text not null unique,
+        player_number text
+    );
+
+    create table if not exists refdata.week (
+        week_id integer primary key,
+        week_sr_uuid text not null unique,
+        week_season_year integer not null,
+        week_season_type text not null,
+        week_number integer not null,
+        week_start_date text,
+        week_end_date text,
+        unique (week_season_year, week_season_type, week_number)
+    );
+
+    create table if not exists refdata.game (
+        game_id integer primary key,
+        game_week integer not null,
+        game_season_year integer not null,
+        game_home_team_id integer not null,
+        game_away_team_id integer not null,
+        game_date text,
+        game_home_score integer,
+        game_away_score integer,
+        game_sr_uuid text not null unique,
+        game_week_id integer,
+        game_status text,
+        unique (game_week, game_season_year, game_home_team_id, game_away_team_id)
+    );
+
+    create index if not exists refdata.game_season_week_idx
+        on game (game_season_year, game_week);
+
+    create table if not exists refdata.depth_chart_weekly (
+        dc_id integer primary key,
+        dc_team_id integer,
+        dc_season_year integer not null,
+        dc_week integer not null,
+        dc_player_id integer,
+        dc_player_position text,
+        dc_player_position_alignment text,
+        dc_rank integer,
+        unique (dc_team_id, dc_season_year, dc_week, dc_player_id,
+            dc_player_position, dc_player_position_alignment)
+    );
+
+    create table if not exists refdata.depth_chart_change (
+        dcc_id integer primary key,
+        dcc_team_id integer not null,
+        dcc_season_year integer not null,
+        dcc_week integer not null,
+        dcc_player_id integer not null,
+        dcc_player_position text,
+        dcc_player_position_alignment text,
+        dcc_rank integer,
+        unique (dcc_team_id, dcc_season_year, dcc_week, dcc_player_id,
+            dcc_player_position, dcc_player_position_alignment)
+    );
+
+    create index if not exists refdata.depth_chart_change_season_week_idx
+        on depth_chart_change (dcc_season_year, dcc_week);
+
+    create table if not exists refdata.injury_weekly (
+        inj_id integer primary key,
+        inj_player_id integer not null,
+        inj_team_id integer,
+        inj_season_year integer not null,
+        inj_week_number integer not null,
+        inj_status text,
+        inj_status_date text,
+        inj_primary_injury text,
+        inj_week_id integer,
+        inj_practice_participation text,
+        unique (inj_player_id, inj_season_year, inj_week_number)
+    );
+"""
+
+TRENDS_SCHEMA = """
+    create table if not exists stats.def_vs_pos_trends (
+        dvp_defense_team_id integer not null,
+        dvp_position text not null,
+        dvp_season_year integer not null,
+        dvp_week_number integer not null,
+        dvp_fantasy_points numeric not null,
+        dvp_avg_3 numeric,
+        dvp_avg_5 numeric,
+        dvp_season_avg numeric,
+        dvp_games integer,
+        dvp_season_rank integer,
+        dvp_season_z numeric,
+        dvp_updated_at text default current_timestamp,
+        primary key (dvp_defense_team_id, dvp_position, dvp_season_year, dvp_week_number)
+    );
+
+    create table if not exists stats.def_vs_pos_trend_state (
+        dvps_defense_team_id integer not null,
+        dvps_position text not null,
+        dvps_season_year integer not null,
+        dvps_last_week integer,
+        dvps_games integer not null,
+        dvps_season_points numeric not null,
+        dvps_sum_3 numeric not null,
+        dvps_sum_5 numeric not null,
+        dvps_recent_points text not null,
+        primary key (dvps_defense_team_id, dvps_position, dvps_season_year)
+    );
+"""
+
+OPS_SCHEMA = """
+    create table if not exists ops.ingest_task (
+        task_id integer primary key,
+        task_ingestor text not null,
+        task_key text not null,
+        task_season_year integer not null,
+        task_week integer,
+        task_game_uuid text,
+        task_status text not null default 'pending',
+        task_attempts integer not null default 0,
+        task_started_at text,
+        task_finished_at text,
+        task_seconds numeric,
+        task_error text,
+        task_created_at text default current_timestamp,
+        unique (task_ingestor, task_key)
+    );
+"""
+
+# SQLite caps the number of bound parameters per statement
+MAX_IN_PARAMS = 500
+
+
+def to_sqlite_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Embedded stand-in for PostgresBackend with the same upsert semantics.
+
+    refdata, stats and ops are attached databases, so tables keep their
+    schema-qualified names. The default path keeps everything in memory
+    for profiling and benchmark runs; pass a file path to keep the data.
+    One connection is shared and handed out to one caller at a time.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        for schema in ("refdata", "stats", "ops"):
+            attached = ":memory:" if path == ":memory:" else f"{path}.{schema}"
+            self.conn.execute(f"attach database '{attached}' as {schema}")
+        self.create_schema()
+
+    def create_schema(self):
+        from ..ingestors.player_stats_ingestor import STAT_TABLES, TEAM_STATS_TABLE, stored_data_columns
+
+        self.conn.executescript(REFDATA_SCHEMA)
+
+        for table in list(STAT_TABLES.values()) + [TEAM_STATS_TABLE]:
+            table_name = table['table_name']
+            key_columns = table['key_columns']
+            data_columns = stored_data_columns(table)
+            prefix = table['opp_team_column'][:-len('_opp_team_id')]
+            columns = [f"{prefix}_id integer primary key"]
+            columns += [f"{col} integer" for col in key_columns]
+            columns += [f"{col} numeric" for col in data_columns]
+            columns += [
+                f"{prefix}_created_at text default current_timestamp",
+                f"{prefix}_updated_at text default current_timestamp",
+                f"unique ({', '.join(key_columns)})"
+            ]
+            self.conn.execute(f"create table if not exists stats.{table_name} ({', '.join(columns)})")
+
+            # Files created before a column was added to STAT_CONFIGS
+            existing = {row[1] for row in self.conn.execute(f"pragma stats.table_info({table_name})")}
+            for col in data_columns:
+                if col not in existing:
+                    self.conn.execute(f"alter table stats.{table_name} add column {col} numeric")
+
+            self.conn.execute(
+                f"create index if not exists stats.{table_name}_opp_team_idx "
+                f"on {table_name} ({prefix}_opp_team_id, {prefix}_season_year, {prefix}_week_number)"
+            )
+
+        self.conn.executescript(TRENDS_SCHEMA)
+        self.conn.executescript(OPS_SCHEMA)
+        self.conn.commit()
+
+    @contextmanager
+    def connection(self):
+        with self.lock:
+            try:
+                yield self.conn
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def insert_teams(self, conn, teams):
+        cur = conn.executemany("""
+            insert into refdata.team
+            (team_sr_uuid, team_name, team_market, team_abbreviation)
+            values (?, ?, ?, ?)
+            on conflict (team_sr_uuid) do nothing
+        """, [(team["id"], team["name"], team["market"], team["alias"]) for team in teams])
+        return cur.rowcount
+
+    def get_team_map(self, conn):
+        return {row[1]: row[0] for row in conn.execute("select team_id, team_sr_uuid from refdata.team")}
+
+    def get_team_id(self, conn, team_uuid):
+        row = conn.execute("select team_id from refdata.team where team_sr_uuid = ?", (team_uuid,)).fetchone()
+        return row[0] if row else None
+
+    def player_upsert(self, conn, players_with_team_ids):
+        rows = []
+        for player_data, team_id in players_with_team_ids:
+            name_parts = player_data["name"].split(' ', 1)
+            rows.append((
+                player_data["name"],
+                name_parts[0],
+                name_parts[1] if len(name_parts) > 1 else '',
+                team_id,
+                player_data.get("position"),
+                player_data["player_sr_uuid"],
+                player_data.get("jersey")
+            ))
+
+        conn.executemany("""
+            insert into refdata.player
+            (player_name, player_first_name, player_last_name, player_team_id,
+             player_position, player_sr_uuid, player_number)
+            values (?, ?, ?, ?, ?, ?, ?)
+            on conflict (player_sr_uuid) do update set
+                player_name = excluded.player_name,
+                player_first_name = excluded.player_first_name,
+                player_last_name = excluded.player_last_name,
+                player_team_id = coalesce(excluded.player_team_id, player_team_id),
+                player_position = coalesce(excluded.player_position, player_position),
+                player_number = coalesce(excluded.player_number, player_number)
+        """, rows)
+
+    def insert_player(self, conn, player_data, team_id):
+        self.player_upsert(conn, [(player_data, team_id)])
+        return self.get_player_id(conn, player_data["player_sr_uuid"])
+
+    def insert_players(self, conn, players, team_map):
+        self.player_upsert(conn, [(player_data, team_map.get(player_data.get("team_id"))) for player_data in players])
+
+    def get_player_id(self, conn, player_uuid):
+        row = conn.execute("select player_id from refdata.player where player_sr_uuid = ?", (player_uuid,)).fetchone()
+        return row[0] if row else None
+
+    def select_by_uuids(self, conn, query, uuids):
+        uuids = list(uuids)
+        result = {}
+        for i in range(0, len(uuids), MAX_IN_PARAMS):
+            chunk = uuids[i:i + MAX_IN_PARAMS]
+            placeholders = ', '.join('?' * len(chunk))
+            for row in conn.execute(query.format(placeholders=placeholders), chunk):
+                result[row[0]] = row[1]
+        return result
+
+    def get_player_ids(self, conn, player_uuids):
+        return self.select_by_uuids(
+            conn,
+            "select player_sr_uuid, player_id from refdata.player where player_sr_uuid in ({placeholders})",
+            player_uuids
+        )
+
+    def insert_weeks(self, conn, week_rows):
+        conn.executemany("""
+            insert into refdata.week
+            (week_sr_uuid, week_season_year, week_season_type, week_number, week_start_date, week_end_date)
+            values (?, ?, ?, ?, ?, ?)
+            on conflict (week_season_year, week_season_type, week_number) do nothing
+        """, [
+            (
+                week_row["week_sr_uuid"],
+                week_row["week_season_year"],
+                week_row["week_season_type"],
+                week_row["week_number"],
+                to_sqlite_value(week_row["week_start_date"]),
+                to_sqlite_value(week_row["week_end_date"])
+            )
+            for week_row in week_rows
+        ])
+
+    def get_week_ids(self, conn, week_uuids):
+        return self.select_by_uuids(
+            conn,
+            "select week_sr_uuid, week_id from refdata.week where week_sr_uuid in ({placeholders})",
+            week_uuids
+        )
+
+    def insert_games(self, conn, game_rows):
+        conn.executemany("""
+            insert into refdata.game
+            (game_week, game_season_year, game_home_team_id, game_away_team_id, game_date,
+             game_home_score, game_away_score, game_sr_uuid, game_week_id, game_status)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            on conflict (game_week, game_season_year, game_home_team_id, game_away_team_id) do update
+            set game_date = excluded.game_date,
+                game_status = coalesce(excluded.game_status, game_status)
+        """, [
+            (
+                game_row["game_week"],
+                game_row["game_season_year"],
+                game_row["game_home_team_id"],
+                game_row["game_away_team_id"],
+                to_sqlite_value(game_row["game_date"]),
+                game_row["game_home_score"],
+                game_row["game_away_score"],
+                game_row["game_sr_uuid"],
+                game_row["game_week_id"],
+                game_row.get("game_status")
+            )
+            for game_row in game_rows
+        ])
+
+    def get_games(self, conn, year, week=None):
+        if week is not None:
+            rows = conn.execute("""
+                select game_sr_uuid, game_id, game_week, game_season_year, game_home_team_id, game_away_team_id
+                from refdata.game
+                where game_week = ? and game_season_year = ?
+                order by game_season_year, game_week
+            """, (week, year))
+        else:
+            rows = conn.execute("""
+                select game_sr_uuid, game_id, game_week, game_season_year, game_home_team_id, game_away_team_id
+                from refdata.game
+                where game_season_year = ?
+                order by game_week
+            """, (year,))
+        return [{'uuid': row[0], 'id': row[1], 'week': row[2], 'year': row[3], 'home_team_id': row[4], 'away_team_id': row[5]} for row in rows]
+
+    def get_live_games(self, conn, lookback_hours):
+        now = utc_now()
+        rows = conn.execute("""
+            select game_sr_uuid, game_id, game_week, game_season_year, game_home_team_id, game_away_team_id
+            from refdata.game
+            where game_date <= ?
+            and game_date >= ?
+            and game_status is not 'closed'
+            order by game_date
+        """, (now.isoformat(), (now - timedelta(hours=lookback_hours)).isoformat()))
+        return [{'uuid': row[0], 'id': row[1], 'week': row[2], 'year': row[3], 'home_team_id': row[4], 'away_team_id': row[5]} for row in rows]
+
+    def has_upcoming_live_games(self, conn, lookahead_hours, lookback_hours):
+        now = utc_now()
+        row = conn.execute("""
+            select exists (
+                select 1
+                from refdata.game
+                where game_date <= ?
+                and game_date >= ?
+                and game_status is not 'closed'
+            )
+        """, ((now + timedelta(hours=lookahead_hours)).isoformat(),
+              (now - timedelta(hours=lookback_hours)).isoformat())).fetchone()
+        return bool(row[0])
+
+    def mark_game_final(self, conn, game_id, home_points, away_points):
+        conn.execute("""
+            update refdata.game
+            set game_status = 'closed',
+                game_home_score = coalesce(?, game_home_score),
+                game_away_score = coalesce(?, game_away_score)
+            where game_id = ?
+        """, (home_points, away_points, game_id))
+
+    def insert_depth_charts(self, conn, depth_chart_rows):
+        conn.executemany("""
+            insert into refdata.depth_chart_weekly
+            (dc_team_id, dc_season_year, dc_week, dc_player_id,
+             dc_player_position, dc_player_position_alignment, dc_rank)
+            values (?, ?, ?, ?, ?, ?, ?)
+            on conflict (dc_team_id, dc_season_year, dc_week, dc_player_id,
+                dc_player_position, dc_player_position_alignment) do nothing
+        """, [
+            (
+                row["dc_team_id"],
+                row["dc_season_year"],
+                row["dc_week"],
+                row["dc_player_id"],
+                row["dc_player_position"],
+                row["dc_player_position_alignment"],
+                row["dc_rank"]
+            )
+            for row in depth_chart_rows
+        ])
+
+    def replace_depth_chart_changes(self, conn, season_year, week, team_ids, change_rows):
+        for team_id in team_ids:
+            conn.execute("""
+                delete from refdata.depth_chart_change
+                where dcc_season_year = ? and dcc_week = ? and dcc_team_id = ?
+            """, (season_year, week, team_id))
+        conn.executemany("""
+            insert into refdata.depth_chart_change
+            (dcc_team_id, dcc_season_year, dcc_week, dcc_player_id,
+             dcc_player_position, dcc_player_position_alignment, dcc_rank)
+            values (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                row["dcc_team_id"],
+                row["dcc_season_year"],
+                row["dcc_week"],
+                row["dcc_player_id"],
+                row["dcc_player_position"],
+                row["dcc_player_position_alignment"],
+                row["dcc_rank"]
+            )
+            for row in change_rows
+        ])
+
+    def get_depth_chart(self, conn, season_year, week, team_id=None):
+        # No distinct on in SQLite: keep the latest change per entry with row_number()
+        team_filter = "and dcc_team_id = ?" if team_id is not None else ""
+        params = (week, season_year, week) + ((team_id,) if team_id is not None else ())
+        rows = conn.execute(f"""
+            select dcc_team_id, dcc_season_year, ?, dcc_player_id,
+                dcc_player_position, dcc_player_position_alignment, dcc_rank
+            from (
+                select *, row_number() over (
+                    partition by dcc_team_id, dcc_player_id, dcc_player_position, dcc_player_position_alignment
+                    order by dcc_week desc
+                ) as latest
+                from refdata.depth_chart_change
+                where dcc_season_year = ?
+                and dcc_week <= ?
+                {team_filter}
+            )
+            where latest = 1
+            and dcc_rank is not null
+            order by dcc_team_id, dcc_player_position, dcc_player_position_alignment, dcc_rank
+        """, params)
+        return [dict(zip(DEPTH_CHART_COLUMNS, row)) for row in rows]
+
+    def insert_injuries(self, conn, injuries):
+        conn.executemany("""
+            insert into refdata.injury_weekly
+            (inj_player_id, inj_team_id, inj_season_year, inj_week_number, inj_status,
+             inj_status_date, inj_primary_injury, inj_week_id, inj_practice_participation)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            on conflict (inj_player_id, inj_season_year, inj_week_number) do nothing
+        """, [
+            (
+                inj["inj_player_id"],
+                inj["inj_team_id"],
+                inj["inj_season_year"],
+                inj["inj_week"],
+                inj["inj_status"],
+                to_sqlite_value(inj["inj_status_date"]),
+                inj["inj_primary_injury"],
+                inj["inj_week_id"],
+                inj["inj_practice_participation"]
+            )
+            for inj in injuries
+        ])
+
+    def insert_stats(self, conn, table_name, key_columns, data_columns, rows, skip_unchanged=False):
+        all_columns = key_columns + data_columns
+        update_clause = ', '.join(f"{col} = excluded.{col}" for col in data_columns)
+        if skip_unchanged:
+            update_clause += " where " + " or ".join(f"{col} is not excluded.{col}" for col in data_columns)
+
+        cur = conn.executemany(f"""
+            insert into stats.{table_name} ({', '.join(all_columns)})
+            values ({', '.join('?' * len(all_columns))})
+            on conflict ({', '.join(key_columns)})
+            do update set {update_clause}
+        """, rows)
+        return cur.rowcount
+
+    def reload_stats_week(self, conn, table_name, key_columns, data_columns, season_year, week, rows):
+        season_col, week_col = season_week_columns(key_columns)
+        all_columns = key_columns + data_columns
+
+        conn.execute(f"delete from stats.{table_name} where {season_col} = ? and {week_col} = ?", (season_year, week))
+        conn.executemany(f"""
+            insert into stats.{table_name} ({', '.join(all_columns)})
+            values ({', '.join('?' * len(all_columns))})
+        """, rows)
+        return len(rows)
+
+    def get_fantasy_points_allowed(self, conn, season_year, week):
+        from ..analytics.fantasy import fantasy_points_allowed_params, fantasy_points_allowed_query
+
+        return conn.execute(fantasy_points_allowed_query('?'), fantasy_points_allowed_params(season_year, week)).fetchall()
+
+    def get_defense_trend_state(self, conn, season_year):
+        rows = conn.execute("""
+            select dvps_defense_team_id, dvps_position, dvps_last_week, dvps_games,
+                   dvps_season_points, dvps_sum_3, dvps_sum_5, dvps_recent_points
+            from stats.def_vs_pos_trend_state
+            where dvps_season_year = ?
+        """, (season_year,))
+        return {
+            (row[0], row[1]): {
+                'defense_team_id': row[0],
+                'position': row[1],
+                'last_week': row[2],
+                'games': row[3],
+                'season_points': float(row[4]),
+                'sum_3': float(row[5]),
+                'sum_5': float(row[6]),
+                'recent_points': json.loads(row[7]),
+            }
+            for row in rows
+        }
+
+    def save_defense_trend_state(self, conn, season_year, states):
+        conn.executemany("""
+            insert into stats.def_vs_pos_trend_state
+            (dvps_defense_team_id, dvps_position, dvps_season_year, dvps_last_week, dvps_games,
+             dvps_season_points, dvps_sum_3, dvps_sum_5, dvps_recent_points)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            on conflict (dvps_defense_team_id, dvps_position, dvps_season_year) do update set
+                dvps_last_week = excluded.dvps_last_week,
+                dvps_games = excluded.dvps_games,
+                dvps_season_points = excluded.dvps_season_points,
+                dvps_sum_3 = excluded.dvps_sum_3,
+                dvps_sum_5 = excluded.dvps_sum_5,
+                dvps_recent_points = excluded.dvps_recent_points
+        """, [
+            (
+                state['defense_team_id'],
+                state['position'],
+                season_year,
+                state['last_week'],
+                state['games'],
+                state['season_points'],
+                state['sum_3'],
+                state['sum_5'],
+                json.dumps(state['recent_points'])
+            )
+            for state in states
+        ])
+
+    def insert_defense_trends(self, conn, trend_rows):
+        key_columns = DEFENSE_TREND_COLUMNS[:4]
+        conn.executemany(f"""
+            insert into stats.def_vs_pos_trends ({', '.join(DEFENSE_TREND_COLUMNS)})
+            values ({', '.join('?' * len(DEFENSE_TREND_COLUMNS))})
+            on conflict ({', '.join(key_columns)}) do update set
+                {', '.join(f"{col} = excluded.{col}" for col in DEFENSE_TREND_COLUMNS[4:])},
+                dvp_updated_at = current_timestamp
+        """, [[row[col] for col in DEFENSE_TREND_COLUMNS] for row in trend_rows])
+
+    def get_defense_trends(self, conn, season_year, defense_team_id, position):
+        rows = conn.execute(f"""
+            select {', '.join(DEFENSE_TREND_COLUMNS)}
+            from stats.def_vs_pos_trends
+            where dvp_defense_team_id = ?
+            and dvp_position = ?
+            and dvp_season_year = ?
+            order by dvp_week_number
+        """, (defense_team_id, position, season_year))
+        return [dict(zip(DEFENSE_TREND_COLUMNS, row)) for row in rows]
+
+    def get_season_defense_trends(self, conn, season_year):
+        rows = conn.execute(f"""
+            select {', '.join(DEFENSE_TREND_COLUMNS)}
+            from stats.def_vs_pos_trends
+            where dvp_season_year = ?
+        """, (season_year,))
+        return [dict(zip(DEFENSE_TREND_COLUMNS, row)) for row in rows]
+
+    def delete_defense_trends(self, conn, season_year, from_week=None):
+        conn.execute(
+            "delete from stats.def_vs_pos_trends where dvp_season_year = ? and dvp_week_number >= ?",
+            (season_year, from_week or 0)
+        )
+        conn.execute("delete from stats.def_vs_pos_trend_state where dvps_season_year = ?", (season_year,))
+
+    def enqueue_tasks(self, conn, ingestor, tasks, reset=False):
+        on_conflict = """
+            do update set
+                task_status = 'pending',
+                task_attempts = 0,
+                task_started_at = null,
+                task_finished_at = null,
+                task_seconds = null,
+                task_error = null
+        """ if reset else "do nothing"
+
+        conn.executemany(f"""
+            insert into ops.ingest_task
+            (task_ingestor, task_key, task_season_year, task_week, task_game_uuid)
+            values (?, ?, ?, ?, ?)
+            on conflict (task_ingestor, task_key) {on_conflict}
+        """, [
+            (ingestor, task["key"], task["season_year"], task.get("week"), task.get("game_uuid"))
+            for task in tasks
+        ])
+
+    def get_tasks(self, conn, ingestor, season_year=None):
+        query = """
+            select task_key, task_season_year, task_week, task_game_uuid, task_status, task_attempts,
+                task_started_at, task_finished_at, task_seconds, task_error
+            from ops.ingest_task
+            where task_ingestor = ?
+        """
+        params = [ingestor]
+        if season_year is not None:
+            query += " and task_season_year = ?"
+            params.append(season_year)
+        query += " order by task_season_year, task_week, task_id"
+        return [dict(zip(TASK_COLUMNS, row)) for row in conn.execute(query, params)]
+
+    def start_task(self, conn, ingestor, task_key, started_at):
+        conn.execute("""
+            update ops.ingest_task
+            set task_status = 'running',
+                task_attempts = task_attempts + 1,
+                task_started_at = ?,
+                task_finished_at = null,
+                task_seconds = null,
+                task_error = null
+            where task_ingestor = ?
+            and task_key = ?
+        """, (to_sqlite_value(started_at), ingestor, task_key))
+
+    def finish_task(self, conn, ingestor, task_key, status, finished_at, seconds, error=None, worker_id=None):
+        query = """
+            update ops.ingest_task
+            set task_status = ?,
+                task_finished_at = ?,
+                task_seconds = ?,
+                task_error = ?
+            where task_ingestor = ?
+            and task_key = ?
+        """
+        params = [status, to_sqlite_value(finished_at), seconds, error, ingestor, task_key]
+        if worker_id is not None:
+            query += " and task_worker = ? and task_status = 'running'"
+            params.append(worker_id)
+
+        return conn.execute(query, params).rowcount == 1
@@ -0,0 +1,130 @@
+import json
+import logging
+from collections import namedtuple
+from threading import Event, Lock, Thread
+from typing import Callable, Iterable, List, Optional
+
+CHANNEL = "data_changes"
+
+# One committed write: table is schema-qualified, week is None for season-wide changes
+ChangeEvent = namedtuple("ChangeEvent", ["table", "season", "week", "team_ids"])
+
+_subscribers: List[Callable[[ChangeEvent], None]] = []
+_lock = Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def encode_event(event: ChangeEvent) -> str:
+    return json.dumps({
+        "table": event.table,
+        "season": event.season,
+        "week": event.week,
+        "team_ids": list(event.team_ids),
+    }, separators=(",", ":"))
+
+
+def decode_event(payload: str) -> ChangeEvent:
+    data = json.loads(payload)
+    return ChangeEvent(data["table"], data["season"], data.get("week"), tuple(data.get("team_ids", ())))
+
+
+def subscribe(callback: Callable[[ChangeEvent], None]) -> None:
+    """Call callback with each ChangeEvent published by this process."""
+    with _lock:
+        _subscribers.append(callback)
+
+
+def unsubscribe(callback: Callable[[ChangeEvent], None]) -> None:
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+
+def deliver(event: ChangeEvent) -> None:
+    with _lock:
+        subscribers = list(_subscribers)
+
+    for callback in subscribers:
+        try:
+            callback(event)
+        except Exception as e:
+            logger.error(f"Change subscriber {callback} failed: {e}")
+
+
+def publish_change(storage, conn, table: str, season: Optional[int], week: Optional[int] = None, team_ids: Iterable[int] = ()) -> ChangeEvent:
+    """
+    Announce a committed write to subscribers in this and other processes.
+
+    Call only once the transaction that wrote the change has committed.
+    Local subscribers are called directly; other processes receive the
+    event through the storage backend's transport (NOTIFY on Postgres,
+    the shared change log file otherwise).
+    """
+    event = ChangeEvent(table, season, week, tuple(sorted({team_id for team_id in team_ids if team_id is not None})))
+    deliver(event)
+
+    try:
+        storage.publish_change(conn, encode_event(event))
+    except Exception as e:
+        logger.error(f"Failed to publish change event for {table}: {e}")
+    return event
+
+
+class ChangeListener:
+    """
+    Background thread delivering change events published by any process.
+
+    Pass tables to receive only events for those tables. Events published
+    by this process also arrive here, after the local subscribers have
+    seen them; handlers should be idempotent. Events sent while the
+    listener is reconnecting are lost, so on_gap is called after each
+    reconnect for callers that need to drop everything they cached.
+    """
+
+    def __init__(
+        self,
+        storage,
+        callback: Callable[[ChangeEvent], None],
+        tables: Optional[Iterable[str]] = None,
+        poll_interval: float = 1.0,
+        on_gap: Optional[Callable[[], None]] = None
+    ):
+        self.storage = storage
+        self.callback = callback
+        self.on_gap = on_gap
+        self.tables = set(tables) if tables else None
+        self.poll_interval = poll_interval
+        self.stopped = Event()
+        self.thread = Thread(target=self.run, name="change-listener", daemon=True)
+
+    def start(self) -> "ChangeListener":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def handle(self, payload: str) -> None:
+        try:
+            event = decode_event(payload)
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed change event {payload!r}: {e}")
+            return
+
+        if self.tables is None or event.table in self.tables:
+            try:
+                self.callback(event)
+            except Exception as e:
+                logger.error(f"Change listener callback failed for {event}: {e}")
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                self.storage.listen_changes(self.handle, self.stopped, self.poll_interval)
+            except Exception as e:
+                logger.error(f"Change listener failed, reconnecting: {e}")
+                self.stopped.wait(self.poll_interval)
+                if self.on_gap:
+                    self.on_gap()
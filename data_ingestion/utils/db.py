@@ -1,29 +1,88 @@
 import sys
 from contextlib import contextmanager
+from threading import Lock
 from psycopg import connect
+from psycopg_pool import ConnectionPool
 from data_ingestion.config.settings import settings
 
+_pool = None
+_pool_lock = Lock()
+
+
+def get_conninfo():
+    return {
+        "host": settings.DB_HOST,
+        "port": settings.DB_PORT,
+        "dbname": settings.DB_NAME,
+        "user": settings.DB_USER,
+        "password": settings.DB_PASSWORD,
+    }
+
+
 def get_connection():
-    return connect(
-        host=settings.DB_HOST,
-        port=settings.DB_PORT,
-        dbname=settings.DB_NAME,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-    )
+    return connect(**get_conninfo())
+
+
+def require_prod_authorization():
+    if settings.ENVIRONMENT.upper() == "PROD" and not settings.ALLOW_PROD:
+        print("Refusing to run against PROD. Set ALLOW_PROD=true to authorize.")
+        sys.exit(1)
+
+
+def configure_session(conn):
+    with conn.cursor() as cur:
+        cur.execute("select set_config('synchronous_commit', %s, false)", (settings.DB_SYNCHRONOUS_COMMIT,))
+        cur.execute("select set_config('statement_timeout', %s, false)", (str(settings.DB_STATEMENT_TIMEOUT_MS),))
+    conn.commit()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            require_prod_authorization()
+            _pool = ConnectionPool(
+                kwargs=get_conninfo(),
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                configure=configure_session,
+                open=True,
+            )
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def execute_pipeline(conn, statements):
+    """
+    Send a batch of (query, params) pairs without waiting for each reply.
+
+    The statements go out in psycopg pipeline mode as server-side prepared
+    statements, so a batch costs one round trip instead of one per row and
+    each distinct query is parsed and planned once per connection. An error
+    in any statement raises when the pipeline syncs and leaves the
+    transaction failed, as a sequence of plain execute() calls would.
+    """
+    with conn.pipeline(), conn.cursor() as cur:
+        for query, params in statements:
+            cur.execute(query, params, prepare=True)
 
 
 @contextmanager
 def safe_connection():
-    if settings.ENVIRONMENT.upper() == "PROD":
-        confirm = input("Running against PROD. Type 'yes' to continue: ")
-        if confirm.lower() != "yes":
-            print("Aborted.")
-            sys.exit(1)
-
-    conn = get_connection()
-    try:
+    """
+    Borrow a connection from the shared pool.
+
+    Safe to call from any number of worker threads; callers block once
+    DB_POOL_MAX_SIZE connections are checked out. The connection is
+    returned to the pool on exit, committing if the block succeeded and
+    rolling back if it raised.
+    """
+    with get_pool().connection() as conn:
         yield conn
-    finally:
-        conn.close()
-        conn.close()
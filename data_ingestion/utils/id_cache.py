@@ -0,0 +1,72 @@
+from threading import Lock
+from typing import Callable, Dict, Iterable
+
+
+class IdCache:
+    """
+    Team and player id lookups kept warm across runs of a long-lived process.
+
+    Player ids are cached only once they are known to be committed. An id
+    for a player inserted during the current run could belong to a
+    transaction that is later rolled back, so such players are looked up
+    in the database until begin_run() starts the next run. The team map
+    is dropped when a refdata.team change event arrives.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.team_map = None
+        self.player_ids: Dict[str, int] = {}
+        self.uncommitted = set()
+        self.hits = 0
+        self.misses = 0
+
+    def begin_run(self) -> None:
+        with self.lock:
+            self.uncommitted.clear()
+
+    def get_team_map(self, load: Callable[[], Dict[str, int]]) -> Dict[str, int]:
+        with self.lock:
+            if self.team_map is None:
+                self.team_map = load()
+            return self.team_map
+
+    def get_player_ids(self, player_uuids: Iterable[str], load: Callable[[set], Dict[str, int]]) -> Dict[str, int]:
+        player_uuids = set(player_uuids)
+        with self.lock:
+            found = {uuid: self.player_ids[uuid] for uuid in player_uuids if uuid in self.player_ids}
+            self.hits += len(found)
+
+        missing = player_uuids - found.keys()
+        if missing:
+            loaded = load(missing)
+            found.update(loaded)
+            with self.lock:
+                self.misses += len(missing)
+                self.player_ids.update(
+                    (uuid, player_id) for uuid, player_id in loaded.items() if uuid not in self.uncommitted
+                )
+        return found
+
+    def mark_inserted(self, player_uuids: Iterable[str]) -> None:
+        with self.lock:
+            self.uncommitted.update(uuid for uuid in player_uuids if uuid not in self.player_ids)
+
+    def invalidate(self, event) -> None:
+        if event.table == 'refdata.team':
+            with self.lock:
+                self.team_map = None
+
+    def clear(self) -> None:
+        with self.lock:
+            self.team_map = None
+            self.player_ids.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'teams_cached': self.team_map is not None,
+                'players_cached': len(self.player_ids),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
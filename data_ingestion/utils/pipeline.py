@@ -0,0 +1,208 @@
+import logging
+import time
+from contextlib import nullcontext
+from queue import Queue
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Put once per worker of a stage after its last item
+DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+
+    fn is called with each item and returns the item for the next stage;
+    with a context factory, every worker enters context() once and fn is
+    called as fn(resource, item), e.g. with storage.connection for a
+    connection per worker thread. An ordered stage sees items in the
+    order they were fed, whatever order the stages before it finish them
+    in; it runs with one worker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        workers: int = 1,
+        queue_size: Optional[int] = None,
+        context: Optional[Callable] = None,
+        ordered: bool = False
+    ):
+        if ordered and workers != 1:
+            raise ValueError(f"Ordered stage {name} runs with one worker, not {workers}")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.queue_size = queue_size or settings.PIPELINE_QUEUE_SIZE
+        self.context = context
+        self.ordered = ordered
+        self.index = 0
+        self.finished = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.starved_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+
+class Pipeline:
+    """
+    Stages running side by side in threads, connected by bounded queues.
+
+    Every stage has its own workers reading from its inbox, a queue of at
+    most queue_size items, so the stages overlap: while the writer commits
+    one item the fetchers are already waiting on the next responses. A
+    full inbox blocks the stage before it, so a slow stage holds the
+    others back instead of letting work pile up in memory, and a run
+    takes about as long as its slowest stage rather than the sum of them.
+
+    The first exception raised by a stage stops the run: nothing more is
+    fed, the failed stage and those before it discard what they still
+    hold, and the items already past it are finished, so a failed fetch
+    does not throw away the payloads fetched ahead of it. run() raises
+    the exception once every thread has finished. Stages that want to
+    carry on past a bad item should catch the error and pass it along for
+    a later stage to record, as the ingestors do with failed tasks.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: List[Stage] = []
+        self.lock = Lock()
+        self.error = None
+        self.failed_index = None
+
+    def stage(self, name: str, fn: Callable, workers: int = 1, queue_size: Optional[int] = None,
+              context: Optional[Callable] = None, ordered: bool = False) -> "Pipeline":
+        self.stages.append(Stage(name, fn, workers, queue_size, context, ordered))
+        return self
+
+    def run(self, items: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """Feed items through every stage and wait for them; returns per-stage timings."""
+        if not self.stages:
+            raise ValueError(f"Pipeline {self.name} has no stages")
+        self.error = None
+        self.failed_index = None
+        inboxes = [Queue(maxsize=stage.queue_size) for stage in self.stages]
+        outboxes = inboxes[1:] + [None]
+
+        threads = []
+        for index, stage in enumerate(self.stages):
+            stage.index = index
+            stage.finished = stage.items = 0
+            stage.busy_seconds = stage.starved_seconds = stage.blocked_seconds = 0.0
+            following = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            for number in range(stage.workers):
+                thread = Thread(
+                    target=self.work, args=(stage, inboxes[index], outboxes[index], following),
+                    name=f"{self.name}-{stage.name}-{number}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        started = time.perf_counter()
+        fed = 0
+        try:
+            for sequence, item in enumerate(items):
+                if self.error is not None:
+                    break
+                inboxes[0].put((sequence, item))
+                fed += 1
+        except BaseException as e:
+            self.fail("feed", -1, e)
+        finally:
+            for _ in range(self.stages[0].workers):
+                inboxes[0].put(DONE)
+
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+
+        timings = {
+            stage.name: {
+                "workers": stage.workers,
+                "items": stage.items,
+                "busy_seconds": round(stage.busy_seconds, 3),
+                "starved_seconds": round(stage.starved_seconds, 3),
+                "blocked_seconds": round(stage.blocked_seconds, 3),
+            }
+            for stage in self.stages
+        }
+        logger.info(
+            f"Pipeline {self.name}: {fed} items in {seconds:.2f}s; " + ", ".join(
+                f"{name} {timing['busy_seconds']:.2f}s busy over {timing['workers']} workers"
+                f" ({timing['blocked_seconds']:.2f}s blocked)"
+                for name, timing in timings.items()
+            )
+        )
+        if self.error is not None:
+            raise self.error
+        return timings
+
+    def work(self, stage: Stage, inbox: Queue, outbox: Optional[Queue], following: Optional[Stage]) -> None:
+        pending = {}
+        next_sequence = 0
+        drained = False
+        try:
+            with stage.context() if stage.context else nullcontext() as resource:
+                while True:
+                    waited = time.perf_counter()
+                    message = inbox.get()
+                    with self.lock:
+                        stage.starved_seconds += time.perf_counter() - waited
+                    if message is DONE:
+                        drained = True
+                        break
+
+                    if not stage.ordered:
+                        self.process(stage, resource, outbox, *message)
+                        continue
+                    # Hold items that overtook an earlier one until it arrives
+                    pending[message[0]] = message[1]
+                    while next_sequence in pending:
+                        self.process(stage, resource, outbox, next_sequence, pending.pop(next_sequence))
+                        next_sequence += 1
+        except BaseException as e:
+            # Raised entering or leaving the context; keep draining so the stages before this one finish
+            self.fail(stage.name, stage.index, e)
+            while not drained and inbox.get() is not DONE:
+                pass
+        finally:
+            with self.lock:
+                stage.finished += 1
+                last = stage.finished == stage.workers
+            if last and outbox is not None:
+                for _ in range(following.workers):
+                    outbox.put(DONE)
+
+    def process(self, stage: Stage, resource: Any, outbox: Optional[Queue], sequence: int, item: Any) -> None:
+        if self.error is not None and stage.index <= self.failed_index:
+            return
+
+        started = time.perf_counter()
+        try:
+            result = stage.fn(resource, item) if stage.context else stage.fn(item)
+        except BaseException as e:
+            self.fail(stage.name, stage.index, e)
+            return
+        finally:
+            with self.lock:
+                stage.items += 1
+                stage.busy_seconds += time.perf_counter() - started
+
+        if outbox is not None:
+            waited = time.perf_counter()
+            outbox.put((sequence, result))
+            with self.lock:
+                stage.blocked_seconds += time.perf_counter() - waited
+
+    def fail(self, stage_name: str, index: int, error: BaseException) -> None:
+        with self.lock:
+            if self.error is None:
+                logger.error(f"Pipeline {self.name} stopped: {stage_name} stage failed: {error}")
+                self.failed_index = index
+                self.error = error
@@ -0,0 +1,191 @@
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from threading import Event, Lock, Thread, get_ident
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages, in the order the summary lists them; other names sort after these
+STAGES = ("fetch", "decode", "archive", "transform", "resolve", "write", "trends")
+
+
+def profile_stage(name: str):
+    """Method decorator for ingestors: run the method inside self.stage(name)."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.stage(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_profile_arguments(parser) -> None:
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile each pipeline stage and write .prof files, collapsed stacks and a '
+                             'hot function summary next to the log file')
+    parser.add_argument('--profile-top', type=int, default=25,
+                        help='Functions per stage in the --profile summary')
+
+
+def profile_dir(log_filename: str) -> str:
+    return f"{os.path.splitext(log_filename)[0]}_profile"
+
+
+class StageProfiler:
+    """
+    Per-stage profiles of one ingestor run.
+
+    Code run inside stage(name) is profiled with a cProfile.Profile of its
+    own, so each stage gets a .prof file. Stages nest, and time is charged
+    to the innermost one. For example, resolve_player_ids called from
+    insert_stats counts as resolve, not write. A background thread also
+    samples the stack of every thread inside a stage every
+    sample_interval seconds. The samples are written as collapsed stacks,
+    rooted at the stage name, for flamegraph.pl, speedscope or inferno.
+    On stop, the output directory gets:
+
+        <stage>.prof       cProfile stats, for pstats or snakeviz
+        stacks.collapsed   "stage;caller;...;callee count" lines
+        summary.txt        seconds per stage and the top functions of each by own time
+    """
+
+    def __init__(self, output_dir: str, top: int = 25, sample_interval: float = 0.005):
+        self.output_dir = output_dir
+        self.top = top
+        self.sample_interval = sample_interval
+        self.profiles = {}
+        self.active = {}
+        self.seconds = defaultdict(float)
+        self.calls = Counter()
+        self.stacks = Counter()
+        self.lock = Lock()
+        self.stopped = Event()
+        self.sampler = None
+        self.started = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self) -> "StageProfiler":
+        self.started = time.perf_counter()
+        self.stopped.clear()
+        self.sampler = Thread(target=self.sample, name="stage-profiler", daemon=True)
+        self.sampler.start()
+        return self
+
+    @contextmanager
+    def stage(self, name: str):
+        thread_id = get_ident()
+        stack = self.active.setdefault(thread_id, [])
+        with self.lock:
+            profile = self.profiles.setdefault((name, thread_id), cProfile.Profile())
+            self.calls[name] += 1
+
+        # A thread has one profile hook, so the enclosing stage pauses while this one runs
+        if stack:
+            stack[-1][1].disable()
+        frame = [name, profile, time.perf_counter(), 0.0]
+        stack.append(frame)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            stack.pop()
+            elapsed = time.perf_counter() - frame[2]
+            with self.lock:
+                self.seconds[name] += elapsed - frame[3]
+            if stack:
+                stack[-1][3] += elapsed
+                stack[-1][1].enable()
+
+    def sample(self) -> None:
+        while not self.stopped.wait(self.sample_interval):
+            frames = sys._current_frames()
+            for thread_id, stack in list(self.active.items()):
+                frame = frames.get(thread_id)
+                try:
+                    stage = stack[-1][0]
+                except IndexError:
+                    continue
+                if frame is None:
+                    continue
+
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{frame.f_globals.get('__name__', '?')}.{code.co_qualname}")
+                    frame = frame.f_back
+                names.append(stage)
+                with self.lock:
+                    self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self) -> None:
+        if self.sampler is None:
+            return
+        self.stopped.set()
+        self.sampler.join()
+        self.sampler = None
+        wall = time.perf_counter() - self.started
+        self.write(wall)
+
+    def stage_stats(self):
+        """{stage: pstats.Stats} with each stage's per-thread profiles merged."""
+        merged = {}
+        with self.lock:
+            profiles = list(self.profiles.items())
+        for (name, _), profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if name in merged:
+                merged[name].add(profile)
+            else:
+                merged[name] = pstats.Stats(profile)
+        return merged
+
+    def write(self, wall: float) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stats = self.stage_stats()
+        order = sorted(self.calls, key=lambda name: (STAGES.index(name) if name in STAGES else len(STAGES), name))
+
+        for name, stage_stats in stats.items():
+            stage_stats.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+
+        with open(os.path.join(self.output_dir, "stacks.collapsed"), "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+        lines = [f"{'stage':<12} {'seconds':>10} {'share':>7} {'entries':>9}"]
+        for name in order:
+            share = self.seconds[name] / wall if wall else 0.0
+            lines.append(f"{name:<12} {self.seconds[name]:>10.3f} {share:>7.1%} {self.calls[name]:>9}")
+        staged = sum(self.seconds.values())
+        lines.append(f"{'(run)':<12} {wall:>10.3f}   {'':>5} {'':>9}  wall time; stages on other threads may overlap")
+        lines.append(f"{'(unstaged)':<12} {max(0.0, wall - staged):>10.3f}")
+
+        with open(os.path.join(self.output_dir, "summary.txt"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+            for name in order:
+                if name not in stats:
+                    continue
+                stream = io.StringIO()
+                stats[name].stream = stream
+                stats[name].sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+                f.write(f"\n=== {name}: top {self.top} functions by own time ===\n")
+                f.write(stream.getvalue())
+
+        logger.info("Stage profile:\n" + "\n".join(lines))
+        logger.info(f"Profiles, collapsed stacks and summary written to {self.output_dir}")
+
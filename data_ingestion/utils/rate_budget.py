@@ -0,0 +1,41 @@
+import logging
+import time
+from threading import Lock
+from typing import Optional
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateBudget:
+    """
+    One API request quota shared by every process that uses the same database.
+
+    Each acquire() reserves a token from the ops.api_rate_budget bucket
+    in one statement and sleeps until the reservation comes due, so the
+    fleet's combined request rate stays at rate_per_second however many
+    workers are running. The reservation is made on its own pooled
+    connection and committed straight away, independent of the caller's
+    transaction.
+    """
+
+    def __init__(self, storage, name: str = "sportradar", rate_per_second: Optional[float] = None, burst: Optional[int] = None):
+        self.storage = storage
+        self.name = name
+        self.rate_per_second = rate_per_second or settings.API_RATE_PER_SECOND
+        self.burst = burst or settings.API_RATE_BURST
+        self.lock = Lock()
+        self.requests = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self) -> None:
+        with self.storage.connection() as conn:
+            wait = self.storage.acquire_rate_token(conn, self.name, self.rate_per_second, self.burst)
+            conn.commit()
+
+        with self.lock:
+            self.requests += 1
+            self.waited_seconds += wait
+        if wait > 0:
+            logger.debug(f"Waiting {wait:.2f}s for {self.name} rate budget")
+            time.sleep(wait)
@@ -0,0 +1,203 @@
+import argparse
+import fcntl
+import glob
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+from .time import utc_now
+
+# week, game uuid, segment offset, compressed length, archived-at (epoch microseconds)
+INDEX_RECORD = struct.Struct("<h36sQIQ")
+
+IndexEntry = namedtuple("IndexEntry", ["week", "game_uuid", "offset", "length", "archived_at"])
+
+
+def payload_line(payload):
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class RawArchive:
+    """
+    Append-only archive of raw API payloads.
+
+    Payloads are grouped per endpoint and season into a segment file,
+    <root>/<endpoint>/<season>.ndjson.gz, where every payload is written as
+    its own gzip member holding one JSON line. The segment is therefore a
+    valid multi-member gzip stream (zcat prints it as NDJSON), and any
+    single payload can be decompressed from its offset alone.
+
+    Next to each segment, <season>.idx holds fixed-size INDEX_RECORD
+    entries (week, game uuid, offset, length, timestamp) that are read
+    through mmap, so finding a payload never scans the segment.
+    """
+
+    def __init__(self, root=".data"):
+        self.root = root
+
+    def paths(self, endpoint, season):
+        folder = os.path.join(self.root, endpoint)
+        name = str(season) if season is not None else "all"
+        return (
+            os.path.join(folder, f"{name}.ndjson.gz"),
+            os.path.join(folder, f"{name}.idx"),
+        )
+
+    def append(self, endpoint, payload, season=None, week=None, game_uuid=None):
+        segment_path, index_path = self.paths(endpoint, season)
+        os.makedirs(os.path.dirname(segment_path), exist_ok=True)
+
+        member = gzip.compress(payload_line(payload))
+
+        with open(segment_path, "ab") as segment, open(index_path, "ab") as index:
+            # Concurrent writers (threads or worker processes) serialize on the segment
+            fcntl.flock(segment.fileno(), fcntl.LOCK_EX)
+            try:
+                offset = segment.seek(0, os.SEEK_END)
+                segment.write(member)
+                segment.flush()
+                index.write(INDEX_RECORD.pack(
+                    week if week is not None else -1,
+                    (game_uuid or "").encode("ascii"),
+                    offset,
+                    len(member),
+                    int(utc_now().timestamp() * 1_000_000),
+                ))
+                index.flush()
+            finally:
+                fcntl.flock(segment.fileno(), fcntl.LOCK_UN)
+
+        return segment_path, offset
+
+    def entries(self, endpoint, season):
+        _, index_path = self.paths(endpoint, season)
+        if not os.path.exists(index_path) or os.path.getsize(index_path) == 0:
+            return
+
+        with open(index_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # A torn trailing record from an interrupted append is ignored
+            for position in range(0, len(mm) - INDEX_RECORD.size + 1, INDEX_RECORD.size):
+                week, game_uuid, offset, length, archived_at = INDEX_RECORD.unpack_from(mm, position)
+                yield IndexEntry(
+                    week if week != -1 else None,
+                    game_uuid.rstrip(b"\x00").decode("ascii") or None,
+                    offset,
+                    length,
+                    archived_at,
+                )
+
+    def find(self, endpoint, season, week=None, game_uuid=None):
+        """Return the most recently archived entry matching week and/or game uuid."""
+        match = None
+        for entry in self.entries(endpoint, season):
+            if week is not None and entry.week != week:
+                continue
+            if game_uuid is not None and entry.game_uuid != game_uuid:
+                continue
+            match = entry
+        return match
+
+    def read_line(self, endpoint, season, entry):
+        """The entry's payload as the JSON line it was archived as."""
+        segment_path, _ = self.paths(endpoint, season)
+        with open(segment_path, "rb") as segment:
+            segment.seek(entry.offset)
+            return gzip.decompress(segment.read(entry.length))
+
+    def read_entry(self, endpoint, season, entry):
+        return json.loads(self.read_line(endpoint, season, entry))
+
+    def read(self, endpoint, season, week=None, game_uuid=None):
+        entry = self.find(endpoint, season, week=week, game_uuid=game_uuid)
+        return self.read_entry(endpoint, season, entry) if entry else None
+
+    def latest_entries(self, endpoint, season):
+        """Latest entry per (week, game uuid), in first-archived order."""
+        latest = {}
+        for entry in self.entries(endpoint, season):
+            latest[(entry.week, entry.game_uuid)] = entry
+        return list(latest.values())
+
+    def seasons(self, endpoint):
+        return sorted(
+            os.path.basename(path)[:-len(".idx")]
+            for path in glob.glob(os.path.join(self.root, endpoint, "*.idx"))
+        )
+
+
+def legacy_metadata(folder_name, payload):
+    """Best-effort (season, week, game uuid) for a payload saved by the old per-call dumps."""
+    if folder_name == "game_stats":
+        summary = payload.get("summary", {})
+        return (
+            summary.get("season", {}).get("year"),
+            summary.get("week", {}).get("sequence"),
+            payload.get("id"),
+        )
+    if folder_name in ("depth_charts", "injuries"):
+        return (
+            payload.get("season", {}).get("year"),
+            payload.get("week", {}).get("sequence"),
+            None,
+        )
+    if folder_name == "games":
+        return payload.get("year"), None, None
+    return None, None, None
+
+
+def import_legacy_dumps(archive, root=".data"):
+    """
+    Fold <root>/<folder>/<folder>_<timestamp>.json dumps into the archive, oldest first.
+
+    A dump identical to the latest payload archived for its endpoint,
+    season, week and game is skipped, so importing again adds nothing.
+    Returns (imported, skipped).
+    """
+    imported = skipped = 0
+    # (endpoint, season) -> {(week, game uuid): sha256 of the latest archived line}
+    digests = {}
+    for path in sorted(glob.glob(os.path.join(root, "*", "*_*.json")), key=os.path.getmtime):
+        folder_name = os.path.basename(os.path.dirname(path))
+        with open(path) as f:
+            payload = json.load(f)
+        season, week, game_uuid = legacy_metadata(folder_name, payload)
+
+        segment = (folder_name, season)
+        if segment not in digests:
+            digests[segment] = {
+                (entry.week, entry.game_uuid): hashlib.sha256(archive.read_line(folder_name, season, entry)).digest()
+                for entry in archive.latest_entries(folder_name, season)
+            }
+        digest = hashlib.sha256(payload_line(payload)).digest()
+        if digests[segment].get((week, game_uuid)) == digest:
+            skipped += 1
+            continue
+
+        archive.append(folder_name, payload, season=season, week=week, game_uuid=game_uuid)
+        digests[segment][(week, game_uuid)] = digest
+        imported += 1
+    return imported, skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Inspect or populate the raw payload archive')
+    parser.add_argument('command', choices=['list', 'import-legacy'],
+                        help='list (print index entries), import-legacy (archive old per-call JSON dumps)')
+    parser.add_argument('--root', default='.data', help='Archive root directory')
+    parser.add_argument('--endpoint', help='Endpoint folder to list, e.g. game_stats')
+    parser.add_argument('--season', help='Season to list')
+    args = parser.parse_args()
+
+    archive = RawArchive(args.root)
+
+    if args.command == 'list':
+        if not args.endpoint or not args.season:
+            parser.error("--endpoint and --season are required for list")
+        for entry in archive.entries(args.endpoint, args.season):
+            print(f"week={entry.week} game={entry.game_uuid} offset={entry.offset} length={entry.length}")
+    elif args.command == 'import-legacy':
+        imported, skipped = import_legacy_dumps(archive, args.root)
+        print(f"Imported {imported} payloads, skipped {skipped} already archived")
@@ -0,0 +1,149 @@
+import argparse
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from .time import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+def task_key(season_year: int, week: Optional[int] = None, game_uuid: Optional[str] = None) -> str:
+    parts = [str(season_year)]
+    if week is not None:
+        parts.append(f"{week:02d}")
+    if game_uuid is not None:
+        parts.append(game_uuid)
+    return "/".join(parts)
+
+
+def make_task(season_year: int, week: Optional[int] = None, game_uuid: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "key": task_key(season_year, week, game_uuid),
+        "season_year": season_year,
+        "week": week,
+        "game_uuid": game_uuid,
+    }
+
+
+class LeaseLost(Exception):
+    """A claimed task was requeued and may belong to another worker by now."""
+
+
+class TaskQueue:
+    """
+    Durable record of the work items in one ingestor's season or week run.
+
+    plan() records the run's tasks in ops.ingest_task. A fresh run resets
+    them to pending; a resumed run keeps the stored statuses, so tasks
+    already done are skipped. done() must be called before the commit
+    that writes a task's rows, which makes the task's status exactly as
+    durable as its data. start() and failed() commit on their own.
+
+    A task claimed by a worker is only finished while that worker still
+    holds it. If it was requeued in the meantime, done() rolls back the
+    task's writes and raises LeaseLost, and failed() records nothing.
+    """
+
+    def __init__(self, storage, ingestor: str):
+        self.storage = storage
+        self.ingestor = ingestor
+        self.started = {}
+        self.counts = Counter()
+
+    def plan(self, conn, tasks: List[Dict[str, Any]], resume: bool = False) -> List[Dict[str, Any]]:
+        """Record tasks and return them with their stored status and attempts, in the order given."""
+        self.counts.clear()
+        self.storage.enqueue_tasks(conn, self.ingestor, tasks, reset=not resume)
+        conn.commit()
+
+        seasons = {task["season_year"] for task in tasks}
+        stored = {
+            row["key"]: row
+            for season_year in seasons
+            for row in self.storage.get_tasks(conn, self.ingestor, season_year)
+        }
+        conn.commit()
+
+        planned = [dict(task, **stored[task["key"]]) for task in tasks]
+        done = sum(1 for task in planned if task["status"] == "done")
+        if resume and done:
+            logger.info(f"Resuming {self.ingestor}: {done} of {len(planned)} tasks already done")
+        return planned
+
+    def skip(self, task: Dict[str, Any]) -> bool:
+        if task["status"] == "done":
+            self.counts["skipped"] += 1
+            return True
+        return False
+
+    def start(self, conn, task: Dict[str, Any]) -> None:
+        self.storage.start_task(conn, self.ingestor, task["key"], utc_now())
+        conn.commit()
+        self.started[task["key"]] = time.perf_counter()
+
+    def claim(self, conn, worker_id: str, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """Take the next task another worker has not claimed (see ingestors.worker); commits the claim."""
+        task = self.storage.claim_task(conn, self.ingestor, worker_id, utc_now(), max_attempts)
+        conn.commit()
+        if task is not None:
+            task["worker"] = worker_id
+            self.started[task["key"]] = time.perf_counter()
+        return task
+
+    def done(self, conn, task: Dict[str, Any]) -> None:
+        if not self.finish(conn, task, "done"):
+            conn.rollback()
+            raise LeaseLost(f"{self.ingestor} task {task['key']} was requeued while {task['worker']} was running it")
+
+    def failed(self, conn, task: Dict[str, Any], error: Any) -> None:
+        """Record a failure after the task's own writes have been rolled back."""
+        if not self.finish(conn, task, "failed", str(error)):
+            logger.warning(f"Not recording failure of {self.ingestor} task {task['key']}: {task['worker']} no longer holds it")
+        conn.commit()
+
+    def finish(self, conn, task: Dict[str, Any], status: str, error: Optional[str] = None) -> bool:
+        """Record the task's outcome; False if it was claimed by a worker that no longer holds it."""
+        started = self.started.pop(task["key"], None)
+        seconds = round(time.perf_counter() - started, 3) if started is not None else None
+        worker_id = task.get("worker")
+        finished = self.storage.finish_task(conn, self.ingestor, task["key"], status, utc_now(), seconds, error, worker_id)
+        if worker_id is not None and not finished:
+            return False
+        self.counts[status] += 1
+        return True
+
+    def log_summary(self) -> None:
+        logger.info(
+            f"{self.ingestor} tasks: {self.counts['done']} done, {self.counts['failed']} failed, "
+            f"{self.counts['skipped']} skipped as already done"
+        )
+
+
+if __name__ == "__main__":
+    from ..storage import get_storage_backend
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Show recorded ingestion tasks')
+    parser.add_argument('ingestor', help='Ingestor name, e.g. player_stats or depth_charts')
+    parser.add_argument('--year', type=int, help='Only show tasks for this season')
+    parser.add_argument('--incomplete', action='store_true', help='Only show tasks that are not done')
+    args = parser.parse_args()
+
+    storage = get_storage_backend()
+    with storage.connection() as conn:
+        tasks = storage.get_tasks(conn, args.ingestor, args.year)
+
+    for task in tasks:
+        if args.incomplete and task["status"] == "done":
+            continue
+        seconds = f"{float(task['seconds']):.3f}s" if task["seconds"] is not None else "-"
+        error = f"  {task['error']}" if task["error"] else ""
+        print(f"{task['key']:<48} {task['status']:<8} attempts={task['attempts']} {seconds}{error}")
+
+    statuses = Counter(task["status"] for task in tasks)
+    print(", ".join(f"{count} {status}" for status, count in sorted(statuses.items())) or "no tasks")